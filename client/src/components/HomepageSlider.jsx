@@ -4,6 +4,7 @@ import Slider from 'react-slick';
 import { motion, AnimatePresence } from 'framer-motion';
 import { Box, Typography, Button, Container, CircularProgress, Stack, keyframes, useTheme, useMediaQuery } from '@mui/material';
 import { Link as RouterLink } from 'react-router-dom';
+import { toSrcSet } from '../utils/srcset';
 
 import "slick-carousel/slick/slick.css";
 import "slick-carousel/slick/slick-theme.css";
@@ -78,6 +79,8 @@ const HomepageSlider = () => {
                 <Box
                   component="img"
                   src={slide.ImagePath}
+                  srcSet={toSrcSet(slide.srcset) || undefined}
+                  sizes="100vw"
                   alt={slide.Title}
                   sx={{
                     width: "100%",
@@ -18,9 +18,14 @@ const BRAND = {
 };
 
 const CATEGORIES = ["Latest News", "Financial Reports", "Announcement", "Upcoming Event"];
+const API = "https://mufate-g-sacco.onrender.com";
+// Reports show their full text on the card; other tabs load it on "Read More"
+const REPORT_FIELDS = "Title,CoverImage,DatePosted,Category,Content";
 
 const NewsFeed = () => {
     const [posts, setPosts] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [activeTab, setActiveTab] = useState(0);
     const [contact, setContact] = useState("");
     const [isSubmitting, setIsSubmitting] = useState(false);
@@ -35,10 +40,20 @@ const NewsFeed = () => {
         window.scrollTo({ top: 0, behavior: 'smooth' });
     };
 
-    const fetchPosts = (category) => {
-        axios.get(`https://mufate-g-sacco.onrender.com/news/posts?category=${category}`)
-            .then(res => setPosts(res.data.posts || []))
-            .catch(err => console.error(err));
+    const fetchPosts = (category, cursor = null) => {
+        const params = { category };
+        if (cursor) params.cursor = cursor;
+        if (category === CATEGORIES[1]) params.fields = REPORT_FIELDS;
+
+        if (cursor) setLoadingMore(true);
+        axios.get(`${API}/news/posts`, { params })
+            .then(res => {
+                const page = res.data.posts || [];
+                setPosts(prev => (cursor ? [...prev, ...page] : page));
+                setNextCursor(res.data.next_cursor || null);
+            })
+            .catch(err => console.error(err))
+            .finally(() => setLoadingMore(false));
     };
 
     const formatDate = (dateString) => {
@@ -70,8 +85,18 @@ const NewsFeed = () => {
 
     const PostCard = ({ post }) => {
         const [expanded, setExpanded] = useState(false);
+        const [content, setContent] = useState(post.Content);
         const isReport = activeTab === 1;
 
+        const toggleExpanded = () => {
+            if (!expanded && content === undefined) {
+                axios.get(`${API}/news/posts/${post.PostID}`)
+                    .then(res => setContent(res.data.post.Content))
+                    .catch(err => console.error(err));
+            }
+            setExpanded(!expanded);
+        };
+
         return (
             <Grid item xs={12} sm={6} xl={4}>
                 <motion.div
@@ -96,7 +121,7 @@ const NewsFeed = () => {
                         }
                     }}>
                         <CardActionArea 
-                            onClick={() => !isReport && setExpanded(!expanded)} 
+                            onClick={() => !isReport && toggleExpanded()} 
                             sx={{ alignItems: 'flex-start' }}
                         >
                             <CardMedia
@@ -130,7 +155,9 @@ const NewsFeed = () => {
                                     WebkitBoxOrient: 'vertical',
                                     overflow: 'hidden',
                                 }}>
-                                    {post.Content.replace(/<[^>]*>/g, '')}
+                                    {(expanded || isReport) && content !== undefined
+                                        ? content.replace(/<[^>]*>/g, '')
+                                        : post.Excerpt}
                                 </Typography>
 
                                 {isReport ? (
@@ -213,6 +240,24 @@ const NewsFeed = () => {
                             ))}
                         </AnimatePresence>
                     </Grid>
+
+                    {nextCursor && (
+                        <Box sx={{ textAlign: 'center', mt: 4 }}>
+                            <Button
+                                variant="outlined"
+                                onClick={() => fetchPosts(CATEGORIES[activeTab], nextCursor)}
+                                disabled={loadingMore}
+                                sx={{
+                                    color: BRAND.gold,
+                                    borderColor: BRAND.gold,
+                                    fontWeight: 800,
+                                    '&:hover': { borderColor: '#FFF', color: '#FFF' }
+                                }}
+                            >
+                                {loadingMore ? <CircularProgress size={20} sx={{ color: BRAND.gold }} /> : "Load More"}
+                            </Button>
+                        </Box>
+                    )}
                 </Box>
 
                 <Box sx={{
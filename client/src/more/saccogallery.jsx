@@ -23,6 +23,7 @@ import {
   ExpandLess as ExpandLessIcon 
 } from "@mui/icons-material";
 import { styled } from "@mui/material/styles";
+import { toSrcSet } from "../utils/srcset";
 
 const BRAND = {
   gold: "#EC9B14",
@@ -176,6 +177,8 @@ const SaccoGallery = () => {
                         <CardMedia
                           component="img"
                           image={photo.ImageURL}
+                          srcSet={toSrcSet(photo.srcset) || undefined}
+                          sizes="(min-width: 900px) 33vw, (min-width: 600px) 50vw, 100vw"
                           alt={photo.Title}
                           sx={{ height: "100%", width: "100%", objectFit: "cover", transition: "0.8s ease" }}
                         />
@@ -12,6 +12,7 @@ import {
 } from '@mui/material';
 import { motion } from 'framer-motion';
 import Footer from '../../components/Footer';
+import { toSrcSet } from '../../utils/srcset';
 
 const BoardOfDirectors = () => {
   const [bodList, setBodList] = useState([]);
@@ -125,6 +126,8 @@ const BoardOfDirectors = () => {
                       <CardMedia
                         component="img"
                         image={member.ImageURL}
+                        srcSet={toSrcSet(member.srcset) || undefined}
+                        sizes="(min-width: 900px) 25vw, (min-width: 600px) 33vw, 50vw"
                         alt={member.Name}
                         sx={{
                           height: { xs: 180, sm: 250, md: 320 },
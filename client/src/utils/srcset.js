@@ -0,0 +1,2 @@
+// "url 320w, url 640w, ..." from the API's srcset list (empty for non-Cloudinary images)
+export const toSrcSet = (variants) => (variants || []).map((v) => `${v.url} ${v.width}w`).join(', ');
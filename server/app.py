@@ -1,24 +1,24 @@
 # app.py
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, current_app, request
 from flask_cors import CORS
 from flask_mail import Mail
 from dotenv import load_dotenv
 from sqlalchemy import text, create_engine
 import os
-
-from models.models import db, IsActive, FeedbackStatus
-from cloudinary_config import cloudinary
-from routes.routes import routes, bcrypt, jwt, register_mail_instance
+import sys
+from datetime import date
 
 # -----------------------------
 # Load environment variables
 # -----------------------------
+# Before the project imports below: services read their settings
+# (METRICS_TOKEN, MAIL_QUEUE_*, RESPONSE_CACHE_*, ...) at import time.
 load_dotenv(dotenv_path=".mufate_env")
 
-# -----------------------------
-# Create Flask app
-# -----------------------------
-app = Flask(__name__)
+from models.models import db, IsActive, FeedbackStatus, PublicHoliday  # noqa: E402
+from routes.routes import routes, bcrypt, jwt, register_mail_instance  # noqa: E402
+from services import instrumentation, mail_queue, newsletter, upload_jobs  # noqa: E402
+from services.db_engine import engine_options, warm_up  # noqa: E402
 
 # CORS: allow Vercel frontend and main site to call this backend
 # 1. Define your allowed origins clearly
@@ -30,51 +30,158 @@ ALLOWED_ORIGINS = [
     "http://localhost:3000"
 ]
 
-# 2. Perfected CORS Configuration
-CORS(
-    app,
-    resources={
-        r"/*": {
-            "origins": ALLOWED_ORIGINS,
-            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": [
-                "Content-Type", 
-                "Authorization", 
-                "Access-Control-Allow-Origin"
-            ],
-            "expose_headers": ["Content-Type", "Authorization"],
-            "supports_credentials": True,
-            "max_age": 3600 # Cache pre-flight response for 1 hour to improve performance
-        }
-    }
-)
-
-# -----------------------------
-# Core config
-# -----------------------------
 DATABASE_URL = os.getenv("DATABASE_URL")
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# Under gunicorn --preload (gunicorn.conf.py) this module is imported once in
+# the master; per-process work (queue/upload threads, DB warm-up) runs in
+# post_fork.
+PRELOADED = os.getenv("GUNICORN_PRELOADED") == "True"
+
+# Lazy initialisation (default): clients most requests never touch are
+# created on first use instead of at startup - Flask-Migrate/Alembic only
+# for the `flask db` CLI, Cloudinary on the first upload
+# (cloudinary_config.get_uploader), the numpy loan engine on the first
+# calculation. The pooled mail transport is already lazy: it opens its
+# first SMTP connection on the first send. APP_LAZY_INIT=False loads all
+# of it up front (gunicorn.conf.py does so when preloading, so workers
+# share the imports copy-on-write). bench/startup.py measures both modes.
+LAZY_INIT = os.getenv("APP_LAZY_INIT", "True") == "True"
 
-app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URL
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY")
-app.config["JWT_IDENTITY_CLAIM"] = "identity"
 
-# Mail config
-app.config["MAIL_SERVER"] = os.getenv("MAIL_SERVER")
-app.config["MAIL_PORT"] = int(os.getenv("MAIL_PORT", "587"))
-app.config["MAIL_USE_TLS"] = os.getenv("MAIL_USE_TLS", "True") == "True"
-app.config["MAIL_USERNAME"] = os.getenv("MAIL_USERNAME")
-app.config["MAIL_PASSWORD"] = os.getenv("MAIL_PASSWORD")
-app.config["MAIL_DEFAULT_SENDER"] = os.getenv("MAIL_DEFAULT_SENDER")
+def _running_flask_cli():
+    return os.path.basename(sys.argv[0]) in ("flask", "flask.exe") or \
+        sys.argv[0].endswith(os.path.join("flask", "__main__.py"))
+
+
+def init_migrations(app):
+    """Register Flask-Migrate (Alembic) on app, once."""
+    if "migrate" not in app.extensions:
+        from flask_migrate import Migrate
+        Migrate(app, db, directory=MIGRATIONS_DIR)
+
+
+def preload_heavy_modules():
+    """Import everything lazy mode defers until first use."""
+    from cloudinary_config import get_uploader
+    get_uploader()
+    import services.loan_engine  # noqa: F401  (numpy)
+    import services.loan_cents  # noqa: F401
+
 
 # -----------------------------
-# Init extensions
+# App factory
 # -----------------------------
-db.init_app(app)
-mail = Mail(app)
-bcrypt.init_app(app)   # ✅ correct
-jwt.init_app(app)
-register_mail_instance(mail)
+def start_background(app):
+    """
+    This process's mail-queue and upload threads, then the DB pool and
+    loan-table warm-up. Only for processes that serve traffic.
+    """
+    mail_queue.start_worker()      # background sender for queued emails
+    upload_jobs.start_workers()    # background Cloudinary uploads
+    # Only opens DB_WARMUP_CONNECTIONS logins (bounded by DB_CONNECT_TIMEOUT);
+    # a failure is logged and the app still starts.
+    warm_up(app)
+    if not LAZY_INIT:
+        from services import loan_tables
+        loan_tables.warm_up(app)   # per-product payment factors (numpy)
+
+
+def create_app(config=None, start_workers=False):
+    """
+    Build the Flask app. `config` overrides the env-derived settings
+    (bench/ uses it); gunicorn and passenger_wsgi use the module-level
+    `app` below, which calls this on first access.
+
+    start_workers=True also runs start_background() (not under gunicorn
+    --preload, where post_fork does it per worker). Off by default so
+    `flask db upgrade`, bench/ and one-off scripts never start threads
+    against a database that may not have its tables yet.
+    """
+    app = Flask(__name__)
+
+    # 2. Perfected CORS Configuration
+    CORS(
+        app,
+        resources={
+            r"/*": {
+                "origins": ALLOWED_ORIGINS,
+                "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+                "allow_headers": [
+                    "Content-Type", 
+                    "Authorization", 
+                    "Access-Control-Allow-Origin"
+                ],
+                "expose_headers": ["Content-Type", "Authorization"],
+                "supports_credentials": True,
+                "max_age": 3600 # Cache pre-flight response for 1 hour to improve performance
+            }
+        }
+    )
+
+    # -----------------------------
+    # Core config
+    # -----------------------------
+    app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URL
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY")
+    app.config["JWT_IDENTITY_CLAIM"] = "identity"
+
+    # Mail config
+    app.config["MAIL_SERVER"] = os.getenv("MAIL_SERVER")
+    app.config["MAIL_PORT"] = int(os.getenv("MAIL_PORT", "587"))
+    app.config["MAIL_USE_TLS"] = os.getenv("MAIL_USE_TLS", "True") == "True"
+    app.config["MAIL_USERNAME"] = os.getenv("MAIL_USERNAME")
+    app.config["MAIL_PASSWORD"] = os.getenv("MAIL_PASSWORD")
+    app.config["MAIL_DEFAULT_SENDER"] = os.getenv("MAIL_DEFAULT_SENDER")
+
+    if config:
+        app.config.update(config)
+    # pool sizing / recycle / pre-ping / timeouts from env (services/db_engine.py)
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS",
+                          engine_options(app.config["SQLALCHEMY_DATABASE_URI"]))
+
+    # -----------------------------
+    # Init extensions
+    # -----------------------------
+    db.init_app(app)
+    # Server-Timing, per-request JSON logs, /_metrics (services/instrumentation.py)
+    instrumentation.init_app(app)
+    # Schema changes ship as Alembic migrations (server/migrations):
+    #   flask --app app db upgrade
+    if not LAZY_INIT or _running_flask_cli():
+        init_migrations(app)
+    mail = Mail(app)
+    bcrypt.init_app(app)   # ✅ correct
+    jwt.init_app(app)
+
+    mail_transport = register_mail_instance(mail)   # pooled SMTP connections
+    app.extensions["mail_transport"] = mail_transport
+    mail_queue.init_app(app, mail_transport, start=False)  # queued emails
+    newsletter.init_app(app, mail_transport)               # bulk newsletter campaigns
+    upload_jobs.init_app(app, start=False)                 # Cloudinary upload jobs
+
+    # -----------------------------
+    # Blueprints
+    # -----------------------------
+    app.register_blueprint(routes)
+    register_core_routes(app)
+
+    if not LAZY_INIT:
+        preload_heavy_modules()
+
+    # ❌ IMPORTANT:
+    # We NO LONGER call init_database_once() here at import time.
+    # That was causing timeouts on Render.
+
+    # -----------------------------
+    # Background threads + warm-up before this worker takes traffic
+    # -----------------------------
+    if start_workers and not PRELOADED:
+        start_background(app)
+
+    return app
+
 
 # -----------------------------
 # Helper: ensure DB + tables exist (for LOCAL USE)
@@ -83,8 +190,9 @@ def init_database_once():
     """
     1. Connect to server-level 'master' DB.
     2. Create MUFATE_G_SACCO_WEB if it doesn't exist.
-    3. Create all tables from SQLAlchemy models.
-    4. Seed IsActive and FeedbackStatus if empty.
+    3. Create all tables from SQLAlchemy models, then apply migrations
+       (indexes etc. on tables that already existed).
+    4. Seed IsActive, FeedbackStatus and PublicHoliday if empty.
 
     ⚠️ This is meant for local/dev use.
        DO NOT run on Render at import time (too slow, causes timeouts).
@@ -136,6 +244,12 @@ def init_database_once():
     db.create_all()
     print("✅ All tables are created / already present.")
 
+    # Migrations skip whatever create_all() already built
+    from flask_migrate import upgrade
+    init_migrations(current_app)
+    upgrade()
+    print("✅ Migrations applied.")
+
     # 3️⃣ Seed reference data if needed
     if not IsActive.query.first():
         db.session.add_all([
@@ -151,40 +265,71 @@ def init_database_once():
         ])
         print("🌱 Seeded FeedbackStatus")
 
+    if not PublicHoliday.query.first():
+        # Fixed-date Kenyan public holidays; add moveable ones (Good Friday,
+        # Easter Monday, Idd-ul-Fitr) per year with IsRecurring=False.
+        db.session.add_all([
+            PublicHoliday(HolidayName=name, HolidayDate=date(2000, m, d), IsRecurring=True)
+            for name, m, d in [
+                ("New Year's Day", 1, 1),
+                ("Labour Day", 5, 1),
+                ("Madaraka Day", 6, 1),
+                ("Mashujaa Day", 10, 20),
+                ("Jamhuri Day", 12, 12),
+                ("Christmas Day", 12, 25),
+                ("Boxing Day", 12, 26),
+            ]
+        ])
+        print("🌱 Seeded PublicHoliday")
+
     db.session.commit()
     print("✅ Seeding completed (if required).")
 
 
-# -----------------------------
-# Blueprints
-# -----------------------------
-app.register_blueprint(routes)
-
-# ❌ IMPORTANT:
-# We NO LONGER call init_database_once() here at import time.
-# That was causing timeouts on Render.
-
-
-# -----------------------------
-# Health endpoint to confirm DB connectivity
-# -----------------------------
-@app.get("/_health/db")
-def db_health():
-    try:
-        # lightweight ping
-        with db.engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        return jsonify(ok=True), 200
-    except Exception as e:
-        return jsonify(ok=False, error=str(e)), 500
+def register_core_routes(app):
+    # -----------------------------
+    # Health endpoint to confirm DB connectivity
+    # -----------------------------
+    @app.get("/_health/db")
+    def db_health():
+        try:
+            # lightweight ping
+            with db.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return jsonify(ok=True), 200
+        except Exception as e:
+            return jsonify(ok=False, error=str(e)), 500
+
+    # -----------------------------
+    # Prometheus scrape endpoint
+    # -----------------------------
+    @app.get("/_metrics")
+    def metrics():
+        if not instrumentation.authorized(request.headers.get("Authorization")):
+            return jsonify({'error': '❌ Unauthorized'}), 401
+        return Response(instrumentation.render(instrumentation.collect()),
+                        mimetype="text/plain; version=0.0.4")
+
+    # -----------------------------
+    # Root route
+    # -----------------------------
+    @app.get("/")
+    def index():
+        return "Hello MUFATE G SACCO"
 
 
 # -----------------------------
-# Root route
+# Module-level app (gunicorn app:app, passenger_wsgi, flask --app app)
 # -----------------------------
-@app.get("/")
-def index():
-    return "Hello MUFATE G SACCO"
+# Built on first access rather than at import, so `from app import
+# create_app` stays cheap for scripts that want their own app. Servers
+# get the background workers; the flask CLI (db upgrade, shell) does not.
+def __getattr__(name):
+    if name == "app":
+        global app
+        app = create_app(start_workers=not _running_flask_cli())
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # -----------------------------
@@ -192,9 +337,11 @@ def index():
 # -----------------------------
 if __name__ == "__main__":
     print("➡ Using DATABASE_URL:", os.getenv("DATABASE_URL"))
+    app = create_app()
     with app.app_context():
         # ✅ Only run heavy DB init when you run locally
         init_database_once()
         print("✅ DB initialization completed (local).")
+    start_background(app)   # after the tables exist
 
     app.run(host="0.0.0.0", port=int(os.getenv("PORT", "5000")))
@@ -0,0 +1,272 @@
+# =========================
+# API LATENCY / THROUGHPUT BENCHMARK
+# =========================
+# Drives the public API's hot routes (news list and detail, gallery,
+# slider, loan products, /loan/calc and its batch form, the admin
+# feedback list) and reports per route:
+#
+#   n, errors, p50 / p95 / p99 latency (ms), mean, throughput (req/s)
+#
+# Modes:
+#   client  (default) seeds a throwaway SQLite DB with realistic volumes
+#           (--posts, --photos, --feedback) and calls the routes through
+#           the Flask test client, one at a time: no network, no server,
+#           so it isolates the app's own cost.
+#   http    sends the same requests to a running server (--url) from
+#           --concurrency threads over keep-alive connections. Seed a DB
+#           for it with --seed-only and point the server at it:
+#
+#     cd server && python -m bench.load --seed-only --db /tmp/mufate_load.sqlite
+#     DATABASE_URL=sqlite:////tmp/mufate_load.sqlite gunicorn -c gunicorn.conf.py app:app
+#     python -m bench.load --mode http --url http://localhost:5000 --concurrency 8
+#
+#   The scenarios are also a locust file (bench/locustfile.py) for ramped
+#   multi-user runs.
+#
+# Baselines: --save results.json writes the run; --compare results.json
+# prints each route's change against it and exits with status 1 if any
+# p95 is more than --threshold percent slower, so a change to
+# loan_calc_schedule, get_gallery_photos or get_posts can be checked
+# before and after:
+#
+#     git stash && python -m bench.load --save /tmp/before.json
+#     git stash pop && python -m bench.load --compare /tmp/before.json
+#
+# The response cache is bypassed (RESPONSE_CACHE_BACKEND=none) unless
+# --cache is given, so the numbers are for the route's real work.
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from bench.seed import make_app, admin_headers, seed_lookups, seed_rows
+
+# (name, method, path, JSON body, needs admin token)
+SCENARIOS = [
+    ('news list', 'GET', '/news/posts', None, False),
+    ('news tab', 'GET', '/news/posts?category=Financial%20Reports', None, False),
+    ('news detail', 'GET', '/news/posts/1', None, False),
+    ('hero posts', 'GET', '/posts/hero', None, False),
+    ('gallery', 'GET', '/gallery', None, False),
+    ('slider', 'GET', '/slider/view', None, False),
+    ('loan products', 'GET', '/loan/products', None, False),
+    ('loan calc 24m', 'POST', '/loan/calc',
+     {'product_key': 'development', 'principal': 250000, 'term_months': 24,
+      'start_date': '2025-01-15'}, False),
+    ('loan calc 120m', 'POST', '/loan/calc',
+     {'product_key': 'development', 'principal': 2500000, 'term_months': 120,
+      'start_date': '2025-01-31'}, False),
+    ('loan calc emi', 'POST', '/loan/calc',
+     {'product_key': 'emergency', 'principal': 60000, 'term_months': 36,
+      'start_date': '2025-03-01'}, False),
+    ('loan batch x50', 'POST', '/loan/calc/batch',
+     {'scenarios': [{'product_key': 'development', 'principal': 100000 + 10000 * i,
+                     'term_months': 12 + i} for i in range(50)]}, False),
+    ('admin feedbacks', 'GET', '/admin/feedbacks', None, True),
+]
+
+
+def seed(app, posts, photos, feedback):
+    """Lookups plus the listed volumes of posts, gallery photos, feedback and slides."""
+    from models.models import Posts, GalleryPhoto, Feedback, HomepageSlider
+    seed_lookups(app)
+    seed_rows(app, Posts, posts)
+    seed_rows(app, GalleryPhoto, photos)
+    seed_rows(app, Feedback, feedback)
+    seed_rows(app, HomepageSlider, 8)
+
+
+# ---- stats ----
+
+def summarize(samples, errors, wall):
+    """Latency percentiles (ms) and throughput for one scenario."""
+    ordered = sorted(samples)
+    if len(ordered) > 1:
+        cuts = statistics.quantiles(ordered, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = ordered[0] if ordered else 0.0
+    return {
+        'n': len(samples),
+        'errors': errors,
+        'p50': p50,
+        'p95': p95,
+        'p99': p99,
+        'mean': statistics.fmean(ordered) if ordered else 0.0,
+        'rps': len(samples) / wall if wall else 0.0,
+    }
+
+
+def report(results):
+    print(f"{'scenario':<18} {'n':>6} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} "
+          f"{'mean':>8} {'req/s':>9}   (ms)")
+    for name, r in results.items():
+        print(f"{name:<18} {r['n']:>6} {r['errors']:>4} {r['p50']:>8.2f} {r['p95']:>8.2f} "
+              f"{r['p99']:>8.2f} {r['mean']:>8.2f} {r['rps']:>9.1f}")
+
+
+def compare(results, baseline, threshold):
+    """Print the change against a saved run; returns the number of p95 regressions."""
+    regressions = 0
+    print(f"\n{'scenario':<18} {'p50 was':>8} {'now':>8} {'Δ':>7}   {'p95 was':>8} {'now':>8} {'Δ':>7}")
+    for name, r in results.items():
+        old = baseline['results'].get(name)
+        if not old:
+            print(f"{name:<18} (not in baseline)")
+            continue
+        d50 = _change(old['p50'], r['p50'])
+        d95 = _change(old['p95'], r['p95'])
+        flag = ''
+        if d95 > threshold:
+            flag = '  SLOWER'
+            regressions += 1
+        elif d95 < -threshold:
+            flag = '  faster'
+        print(f"{name:<18} {old['p50']:>8.2f} {r['p50']:>8.2f} {d50:>+6.1f}%   "
+              f"{old['p95']:>8.2f} {r['p95']:>8.2f} {d95:>+6.1f}%{flag}")
+    return regressions
+
+
+def _change(old, new):
+    return (new - old) / old * 100 if old else 0.0
+
+
+# ---- runners ----
+
+def run_client(app, requests, warmup):
+    client = app.test_client()
+    headers = admin_headers(app)
+    results = {}
+    for name, method, path, body, admin in SCENARIOS:
+        kwargs = {'json': body, 'headers': headers if admin else None}
+        for _ in range(warmup):
+            client.open(path, method=method, **kwargs)
+        samples, errors = [], 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            t = time.perf_counter()
+            resp = client.open(path, method=method, **kwargs)
+            samples.append((time.perf_counter() - t) * 1000)
+            if resp.status_code >= 400:
+                errors += 1
+        results[name] = summarize(samples, errors, time.perf_counter() - started)
+    return results
+
+
+def run_http(url, requests, warmup, concurrency, token=None):
+    target = urlsplit(url)
+    connection_class = (http.client.HTTPSConnection if target.scheme == 'https'
+                        else http.client.HTTPConnection)
+    local = threading.local()
+
+    def send(method, path, body, admin):
+        conn = getattr(local, 'conn', None)
+        if conn is None:
+            conn = local.conn = connection_class(target.netloc, timeout=60)
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        if admin:
+            headers['Authorization'] = f'Bearer {token}'
+        payload = json.dumps(body) if body is not None else None
+        t = time.perf_counter()
+        try:
+            conn.request(method, target.path.rstrip('/') + path, body=payload, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            status = resp.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            local.conn = None
+            status = 599
+        return (time.perf_counter() - t) * 1000, status
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for name, method, path, body, admin in SCENARIOS:
+            if admin and not token:
+                continue
+            list(pool.map(lambda _: send(method, path, body, admin), range(warmup)))
+            started = time.perf_counter()
+            outcomes = list(pool.map(lambda _: send(method, path, body, admin), range(requests)))
+            wall = time.perf_counter() - started
+            samples = [ms for ms, _ in outcomes]
+            errors = sum(1 for _, status in outcomes if status >= 400)
+            results[name] = summarize(samples, errors, wall)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=['client', 'http'], default='client')
+    parser.add_argument('--url', default='http://localhost:5000', help='server for --mode http')
+    parser.add_argument('--token', help='admin JWT for admin scenarios in --mode http')
+    parser.add_argument('--requests', type=int, default=200, help='measured requests per scenario')
+    parser.add_argument('--warmup', type=int, default=10, help='unmeasured requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=4, help='threads for --mode http')
+    parser.add_argument('--db', help='SQLite file to seed (default: a temp file)')
+    parser.add_argument('--posts', type=int, default=500)
+    parser.add_argument('--photos', type=int, default=300)
+    parser.add_argument('--feedback', type=int, default=2000)
+    parser.add_argument('--seed-only', action='store_true', help='seed --db and exit')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache on')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON from an earlier --save')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='p95 slowdown in percent that fails --compare')
+    args = parser.parse_args(argv)
+
+    if args.mode == 'client' or args.seed_only:
+        if not args.cache:
+            # first import decides the backend
+            os.environ['RESPONSE_CACHE_BACKEND'] = 'none'
+        db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='mufate_load_'), 'load.sqlite')
+        app = make_app(db_path)
+        seed(app, args.posts, args.photos, args.feedback)
+        if args.seed_only:
+            print(f"✅ Seeded {db_path}")
+            return 0
+        results = run_client(app, args.requests, args.warmup)
+    else:
+        results = run_http(args.url, args.requests, args.warmup, args.concurrency, args.token)
+
+    report(results)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'mode': args.mode,
+                    'requests': args.requests,
+                    'concurrency': args.concurrency if args.mode == 'http' else 1,
+                    'rows': {'posts': args.posts, 'photos': args.photos,
+                             'feedback': args.feedback},
+                    'python': platform.python_version(),
+                    'at': datetime.now().isoformat(timespec='seconds'),
+                },
+                'results': results,
+            }, f, indent=2)
+        print(f"\n💾 Saved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {regressions} scenario(s) more than {args.threshold:g}% slower at p95.")
+            return 1
+        print(f"\n✅ No scenario more than {args.threshold:g}% slower at p95.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
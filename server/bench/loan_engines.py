@@ -0,0 +1,272 @@
+# =========================
+# LOAN ENGINE MICROBENCHMARKS + EQUIVALENCE CHECK
+# =========================
+# Two jobs for the /loan/calc engines:
+#
+#   check  runs every candidate engine over a grid of cases and compares
+#          each schedule row (date, principal, interest, total, balance)
+#          and the rounded totals with a reference. Amounts must agree to
+#          within --tolerance currency units after rounding (default 0:
+#          identical to the shilling). Exits 1 on any mismatch.
+#            --reference rows   the row-by-row float engines in routes.py
+#                               (_schedule_equal_principal / _schedule_emi)
+#            --reference exact  the same arithmetic in fractions: what the
+#                               float engines approximate (the cents
+#                               engine matches this one, not the rows)
+#   time   timeit figures (median µs per call) for _add_months,
+#          _round_unit, the reference engines and every candidate, for
+#          terms from 1 to 360 months.
+#
+#     cd server && python -m bench.loan_engines [check|time|both]
+#         [--engine cents] [--reference rows|exact] [--all-terms]
+#         [--tolerance 0] [--repeat 3]
+#
+# The grid covers both methods, every rounding unit in UNITS (0 is the
+# "2 decimal places" path), both first-due rules, the three holiday
+# rules, zero and non-zero rates, and start dates on month ends, 29 Feb
+# and weekends. --all-terms checks every term 1..360 instead of TERMS.
+# The reference engines only know weekends, so candidates are compared
+# with no public holidays.
+#
+# A new engine is checked by adding it to ENGINES: a callable with the
+# reference signature
+#
+#   engine(method, P, r_m, n, start_date, unit, first_due_rule, holiday_rule)
+#       -> (rows, total_principal, total_interest)
+
+import argparse
+import itertools
+import statistics
+import sys
+import timeit
+from datetime import date
+
+TERMS = (1, 2, 3, 6, 11, 12, 13, 24, 36, 48, 59, 60, 84, 120, 180, 240, 300, 359, 360)
+TIMING_TERMS = (1, 12, 60, 120, 360)
+UNITS = (0, 0.01, 1, 5, 10, 50, 100, 1000)
+METHODS = ('equal_principal', 'emi')
+FIRST_DUE_RULES = ('same_day_next_month', 'end_of_month')
+HOLIDAY_RULES = ('next_business_day', 'previous_business_day', 'exact')
+RATES = (0.0, 0.012, 0.015, 0.035)
+PRINCIPALS = (1000, 250000, 1234567.89)
+START_DATES = (date(2025, 1, 15), date(2025, 1, 31), date(2024, 2, 29),
+               date(2025, 6, 14), date(2025, 11, 30))
+
+AMOUNTS = ('principal', 'interest', 'total', 'balance')
+
+
+# ---- engines ----
+
+def reference(method, P, r_m, n, start_date, unit, first_due_rule, holiday_rule):
+    from routes.routes import _schedule_emi, _schedule_equal_principal
+    engine = _schedule_emi if method == 'emi' else _schedule_equal_principal
+    return engine(P, r_m, n, start_date, unit, first_due_rule, holiday_rule)
+
+
+def exact(method, P, r_m, n, start_date, unit, first_due_rule, holiday_rule):
+    """
+    The reference's arithmetic in exact fractions (cent principal,
+    millionth rate), each cell rounded half-to-even once: what a
+    fixed-point engine should reproduce. Slow; dates from the reference.
+    """
+    from fractions import Fraction
+    from routes.routes import _add_months, _adjust_business_day
+    P = Fraction(round(float(P) * 100), 100)
+    r = Fraction(round(float(r_m) * 10 ** 6), 10 ** 6)
+    step = float(unit or 1)
+    step = Fraction(round(step * 100), 100) if step > 0 else Fraction(1, 100)
+    if method == 'emi':
+        installment = P / n if r == 0 else P * r / (1 - (1 + r) ** -n)
+    bal = P
+    rows, total_i = [], Fraction(0)
+    for k in range(1, n + 1):
+        interest = bal * r
+        if k == n:
+            principal = bal
+        else:
+            principal = installment - interest if method == 'emi' else P / n
+        bal -= principal
+        total_i += interest
+        due = _adjust_business_day(_add_months(start_date, k, first_due_rule), holiday_rule)
+        rows.append({'period': k, 'date': due.isoformat(), **{
+            key: float(round(value / step) * step) for key, value in (
+                ('principal', principal), ('interest', interest),
+                ('total', principal + interest), ('balance', bal))}})
+    return rows, float(P), float(total_i)
+
+
+def numpy_engine(method, P, r_m, n, start_date, unit, first_due_rule, holiday_rule):
+    from services.loan_engine import build_schedule
+    return build_schedule(method, P, r_m, n, start_date, unit, first_due_rule, holiday_rule)
+
+
+def cents_engine(method, P, r_m, n, start_date, unit, first_due_rule, holiday_rule):
+    from services.loan_cents import build_schedule
+    return build_schedule(method, P, r_m, n, start_date, unit, first_due_rule, holiday_rule)
+
+
+def cents_cold(*case):
+    from services.loan_cents import rounded_columns
+    rounded_columns.cache_clear()
+    return cents_engine(*case)
+
+
+# name -> engine checked and timed against a reference
+ENGINES = {
+    'numpy': numpy_engine,
+    'cents': cents_engine,
+}
+# timed only: the same engine without its memo
+TIMED_ONLY = {
+    'cents': {'cents cold': cents_cold},
+}
+REFERENCES = {
+    'rows': reference,
+    'exact': exact,
+}
+
+
+# ---- equivalence ----
+
+def cases(terms=TERMS, dates=True):
+    """
+    Every (method, P, r_m, n, start, unit, first_due_rule, holiday_rule)
+    in the grid; dates=False keeps one start date and rule pair.
+    """
+    date_axes = (START_DATES, FIRST_DUE_RULES, HOLIDAY_RULES) if dates else (
+        START_DATES[:1], FIRST_DUE_RULES[:1], ('exact',))
+    start_dates, first_due_rules, holiday_rules = date_axes
+    return itertools.product(METHODS, PRINCIPALS, RATES, terms, start_dates,
+                             UNITS, first_due_rules, holiday_rules)
+
+
+def _round_unit(x, unit):
+    from routes.routes import _round_unit
+    return _round_unit(x, unit)
+
+
+def diff(expected, actual, unit, tolerance=0):
+    """First difference between two engine results as a string, or None."""
+    rows_e, tp_e, ti_e = expected
+    rows_a, tp_a, ti_a = actual
+    if len(rows_e) != len(rows_a):
+        return f"{len(rows_a)} rows, expected {len(rows_e)}"
+    # float noise below a millionth of a unit is not a difference
+    slack = tolerance + 1e-6 * max(float(unit or 0.01), 0.01)
+    for e, a in zip(rows_e, rows_a):
+        if e['date'] != a['date']:
+            return f"period {e['period']}: date {a['date']}, expected {e['date']}"
+        for key in AMOUNTS:
+            if abs(e[key] - a[key]) > slack:
+                return f"period {e['period']}: {key} {a[key]!r}, expected {e[key]!r}"
+    for label, e, a in (('total principal', tp_e, tp_a), ('total interest', ti_e, ti_a)):
+        if abs(_round_unit(e, unit) - _round_unit(a, unit)) > slack:
+            return f"{label} {_round_unit(a, unit)!r}, expected {_round_unit(e, unit)!r}"
+    return None
+
+
+def check(engines, terms, tolerance, against='rows', limit=10):
+    """Compare each engine with a reference over the grid; returns the mismatch count."""
+    expected_for = REFERENCES[against]
+    checked = 0
+    mismatched = dict.fromkeys(engines, 0)
+    # exact arithmetic gives the same dates as the rows; sweep the amounts only
+    for case in cases(terms, dates=against == 'rows'):
+        method, P, r_m, n, start, unit, first_due_rule, holiday_rule = case
+        expected = expected_for(*case)
+        checked += 1
+        for name, engine in engines.items():
+            problem = diff(expected, engine(*case), unit, tolerance)
+            if problem:
+                mismatched[name] += 1
+                if mismatched[name] <= limit:
+                    print(f"  ❌ {name}: {method} P={P} r={r_m} n={n} start={start} "
+                          f"unit={unit} {first_due_rule}/{holiday_rule}: {problem}")
+    for name, count in mismatched.items():
+        status = '✅' if not count else '❌'
+        print(f"{status} {name}: {checked - count}/{checked} schedules identical "
+              f"to the {against} reference (tolerance {tolerance:g})")
+    return sum(mismatched.values())
+
+
+# ---- timing ----
+
+def _median_us(func, repeat):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    runs = timer.repeat(repeat=repeat, number=number)
+    return statistics.median(runs) / number * 1e6
+
+
+def time_helpers(repeat):
+    from routes.routes import _add_months, _adjust_business_day, _round_unit as round_unit
+    start = date(2025, 1, 31)
+    print(f"{'helper':<44} {'µs/call':>10}")
+    rows = [
+        ('_add_months same_day_next_month',
+         lambda: _add_months(start, 13, 'same_day_next_month')),
+        ('_add_months end_of_month', lambda: _add_months(start, 13, 'end_of_month')),
+        ('_adjust_business_day next_business_day',
+         lambda: _adjust_business_day(date(2025, 6, 14), 'next_business_day')),
+    ]
+    rows += [(f'_round_unit unit={unit}', lambda unit=unit: round_unit(123456.789, unit))
+             for unit in (0, 0.01, 1, 100)]
+    for label, func in rows:
+        print(f"{label:<44} {_median_us(func, repeat):>10.3f}")
+
+
+def time_engines(engines, terms, repeat):
+    from services.due_dates import due_dates
+    start = date(2025, 1, 31)
+    contenders = {'reference': reference}
+    for name, engine in engines.items():
+        contenders[name] = engine
+        contenders.update(TIMED_ONLY.get(name, {}))
+    print(f"\n{'engine':<12} {'method':<16} {'rule':<22}"
+          + ''.join(f"{f'n={n}':>11}" for n in terms) + "   (µs/schedule)")
+    for method in METHODS:
+        for holiday_rule in ('next_business_day', 'exact'):
+            for name, engine in contenders.items():
+                cells = []
+                for n in terms:
+                    cells.append(_median_us(
+                        lambda: engine(method, 250000, 0.012, n, start, 1,
+                                       'same_day_next_month', holiday_rule), repeat))
+                print(f"{name:<12} {method:<16} {holiday_rule:<22}"
+                      + ''.join(f"{c:>11.1f}" for c in cells))
+    # the numpy engine's due dates are memoised; this is the cost of a miss
+    print(f"{'(due dates uncached)':<51}" + ''.join(
+        f"{_median_us(lambda: (due_dates.cache_clear(), due_dates(start, n)), repeat):>11.1f}"
+        for n in terms))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('job', nargs='?', choices=['check', 'time', 'both'], default='both')
+    parser.add_argument('--engine', action='append', choices=sorted(ENGINES),
+                        help='candidate(s) to check/time (default: all)')
+    parser.add_argument('--all-terms', action='store_true', help='check every term 1..360')
+    parser.add_argument('--reference', choices=sorted(REFERENCES), default='rows',
+                        help='rows: routes.py engines (default); exact: fractions')
+    parser.add_argument('--tolerance', type=float, default=0.0,
+                        help='allowed difference in currency units after rounding')
+    parser.add_argument('--repeat', type=int, default=3, help='timeit repeats per figure')
+    args = parser.parse_args(argv)
+
+    engines = {name: ENGINES[name] for name in (args.engine or ENGINES)}
+
+    if args.job in ('time', 'both'):
+        time_helpers(args.repeat)
+        time_engines(engines, TIMING_TERMS, args.repeat)
+        print()
+
+    if args.job in ('check', 'both'):
+        terms = range(1, 361) if args.all_terms else TERMS
+        if check(engines, terms, args.tolerance, args.reference):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+# =========================
+# LOCUST LOAD TEST
+# =========================
+# The bench/load.py scenarios as a locust user, for ramped multi-user
+# runs with locust's live percentiles (`pip install locust`; it is not an
+# app dependency). Seed and start a server as in bench/load.py, then:
+#
+#     cd server && locust -f bench/locustfile.py --host http://localhost:5000
+#     locust -f bench/locustfile.py --host http://localhost:5000 \
+#         --headless -u 50 -r 5 -t 2m --csv /tmp/mufate_locust
+#
+# Each scenario is a task of equal weight; admin scenarios run only with
+# BENCH_ADMIN_TOKEN set to an admin JWT for the server.
+
+import os
+import sys
+
+from locust import HttpUser, between
+
+# locust puts bench/ on sys.path, not server/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench.load import SCENARIOS  # noqa: E402
+
+ADMIN_TOKEN = os.getenv("BENCH_ADMIN_TOKEN")
+
+
+def _task(name, method, path, body, admin):
+    headers = {"Authorization": f"Bearer {ADMIN_TOKEN}"} if admin else None
+
+    def run(user):
+        user.client.request(method, path, json=body, headers=headers, name=name)
+    return run
+
+
+class SaccoVisitor(HttpUser):
+    wait_time = between(0.5, 2)
+    tasks = [_task(name, method, path, body, admin)
+             for name, method, path, body, admin in SCENARIOS
+             if ADMIN_TOKEN or not admin]
@@ -0,0 +1,74 @@
+# =========================
+# SQL QUERY COUNTER
+# =========================
+# Counts the statements sent to the database while a block runs, per
+# thread, so a check can see how many round trips one request costs:
+#
+#     with count_queries() as log:
+#         client.get('/admin/feedbacks', headers=...)
+#     log.count, log.statements
+#
+# A list endpoint should cost the same number of queries for 5 rows and
+# for 50; if the count grows with the rows, something is lazy-loading a
+# relationship per row (N+1). Lazy loads of small lookup tables
+# (FeedbackStatus, IsActive, PostsCategory) are partly hidden by the
+# identity map, so forbid_lazy_loads() makes any lazy relationship load
+# raise instead. bench/query_counts.py runs both checks over the list
+# routes.
+
+import threading
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, raiseload
+
+_local = threading.local()
+
+
+class QueryLog:
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    for log in getattr(_local, "active", ()):
+        log.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    """Record every statement this thread executes inside the block."""
+    log = QueryLog()
+    active = getattr(_local, "active", None)
+    if active is None:
+        active = _local.active = []
+    active.append(log)
+    try:
+        yield log
+    finally:
+        active.remove(log)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _forbid_lazy(orm_execute_state):
+    if (getattr(_local, "forbid_lazy", 0) and orm_execute_state.is_select
+            and not orm_execute_state.is_relationship_load
+            and not orm_execute_state.is_column_load):
+        # relationships not eagerly loaded by the query raise on access
+        orm_execute_state.statement = orm_execute_state.statement.options(raiseload("*"))
+
+
+@contextmanager
+def forbid_lazy_loads():
+    """Inside the block, touching a relationship the query did not eager-load raises."""
+    _local.forbid_lazy = getattr(_local, "forbid_lazy", 0) + 1
+    try:
+        yield
+    finally:
+        _local.forbid_lazy -= 1
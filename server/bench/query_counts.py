@@ -0,0 +1,123 @@
+# =========================
+# N+1 QUERY CHECK FOR LIST ROUTES
+# =========================
+# Serves every list route twice, once with SMALL rows per table and
+# once with LARGE, and counts the SQL statements each request sends
+# (bench/query_counter.py). A route whose count grows with the row
+# count is lazy-loading something per row. The large run also forbids
+# lazy relationship loads outright, which catches lookups the identity
+# map would otherwise hide. The fix is usually a joinedload() or
+# selectinload() option on the route's query, or selecting the joined
+# column directly.
+#
+#     cd server && python -m bench.query_counts [--small 3] [--large 30] [-v]
+#
+# Exits with status 1 if any route scales, so it can gate CI.
+
+import argparse
+import os
+import sys
+import tempfile
+
+from bench.seed import make_app, admin_headers, seed_lookups, seed_rows
+
+# (path, models whose rows the route lists, needs admin token)
+LIST_ROUTES = [
+    ('/careers', ['Career'], False),
+    ('/corevalues', ['CoreValue'], False),
+    ('/resources', ['Resources'], False),
+    ('/resources/recent', ['Resources'], False),
+    ('/faqs', ['FAQ'], False),
+    ('/mobile-banking', ['MobileBankingInfo'], False),
+    ('/operation-hours', ['OperationTimeline'], False),
+    ('/partnerships', ['Partnership'], False),
+    ('/news/posts', ['Posts'], False),
+    ('/news/posts?fields=Title,Category,Content', ['Posts'], False),
+    ('/posts/hero', ['Posts'], False),
+    ('/products', ['Product'], False),
+    ('/branches', ['SaccoBranch'], False),
+    ('/services', ['Service'], False),
+    ('/clients', ['SaccoClient'], False),
+    ('/slider/view', ['HomepageSlider'], False),
+    ('/bod/view', ['BOD'], False),
+    ('/management/view', ['Management'], False),
+    ('/gallery', ['GalleryPhoto'], False),
+    ('/videos', ['SaccoVideo'], False),
+    ('/asset-financing', ['AssetFinancing'], False),
+    ('/loan/products', [], False),
+    ('/admin/feedbacks', ['Feedback'], True),
+    ('/admin/newsletter/campaigns', ['NewsletterCampaign'], True),
+]
+
+
+def _measure(app, headers, rows, strict=False):
+    """{path: (status, query count, statements)} with `rows` rows in every listed table."""
+    from contextlib import nullcontext
+    from models import models
+    from bench.query_counter import count_queries, forbid_lazy_loads
+
+    seeded = set()
+    for _, names, _ in LIST_ROUTES:
+        for name in names:
+            if name not in seeded:
+                seed_rows(app, getattr(models, name), rows)
+                seeded.add(name)
+
+    client = app.test_client()
+    results = {}
+    for path, _, admin in LIST_ROUTES:
+        # the response cache would turn the second run into a 0-query hit
+        with count_queries() as log, (forbid_lazy_loads() if strict else nullcontext()):
+            resp = client.get(path, headers=headers if admin else None)
+        results[path] = (resp.status_code, log.count, log.statements)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--small', type=int, default=3)
+    parser.add_argument('--large', type=int, default=30)
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='print the statements of scaling routes')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='mufate_qc_')
+    # first import decides the backend: keep every request a cache miss
+    os.environ['RESPONSE_CACHE_BACKEND'] = 'none'
+    app = make_app(os.path.join(workdir, 'small.sqlite'))
+    headers = admin_headers(app)
+
+    seed_lookups(app)
+    small = _measure(app, headers, args.small)
+    # top the same tables up to the large size
+    large = _measure(app, headers, args.large - args.small, strict=True)
+
+    failures = 0
+    print(f"{'route':<45} {'status':>6} {args.small:>5} rows {args.large:>5} rows")
+    for path, _, _ in LIST_ROUTES:
+        status, q_small, _ = small[path]
+        status_large, q_large, statements = large[path]
+        flag = ''
+        if status != 200:
+            flag = '  ERROR'
+            failures += 1
+        elif status_large != 200:
+            flag = '  LAZY LOAD' if status_large == 500 else '  ERROR'
+            failures += 1
+        elif q_large > q_small:
+            flag = '  N+1'
+            failures += 1
+        print(f"{path:<45} {status_large:>6} {q_small:>10} {q_large:>10}{flag}")
+        if flag and args.verbose:
+            for statement in statements:
+                print('      ' + ' '.join(statement.split())[:160])
+
+    if failures:
+        print(f"\n❌ {failures} route(s) failed the query-count check.")
+        return 1
+    print("\n✅ Query counts are flat in the row count for every list route.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
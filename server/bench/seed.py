@@ -0,0 +1,142 @@
+# =========================
+# BENCH / CHECK FIXTURES
+# =========================
+# Builds the real Flask app against a throwaway SQLite file and fills it
+# with synthetic rows, so scripts in bench/ can drive the routes through
+# the test client without SQL Server, SMTP or Cloudinary.
+#
+#     from bench.seed import make_app, seed_lookups, seed_rows
+#     app = make_app("/tmp/mufate_bench.sqlite")
+#
+# make_app() must run before anything imports app.py: app.py reads
+# DATABASE_URL from the environment at import time.
+
+import os
+import sys
+from datetime import datetime, date, time, timedelta
+from decimal import Decimal
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BENCH_ENV = {
+    "JWT_SECRET_KEY": "bench-secret-key-bench-secret-key",
+    "MAIL_SERVER": "localhost",
+    "MAIL_PORT": "1025",
+    "MAIL_USE_TLS": "False",
+    "MAIL_USERNAME": "noreply@example.com",
+    "MAIL_PASSWORD": "",
+    "MAIL_DEFAULT_SENDER": "noreply@example.com",
+    "MAIL_QUEUE_ENABLED": "False",
+    "CLOUDINARY_CLOUD_NAME": "demo",
+    "CLOUDINARY_API_KEY": "0",
+    "CLOUDINARY_API_SECRET": "bench",
+    "MEDIA_STORAGE_BACKEND": "local",
+    "REQUEST_LOG": "off",
+}
+
+BASE_TIME = datetime(2025, 1, 1, 8, 0, 0)
+
+
+def make_app(db_path, fresh=True, **env):
+    """Import app.py against SQLite at db_path; returns the Flask app."""
+    if fresh and os.path.exists(db_path):
+        os.remove(db_path)
+    # set explicitly: load_dotenv() in app.py never overrides existing vars
+    os.environ.update(BENCH_ENV)
+    os.environ.update({k: str(v) for k, v in env.items()})
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(db_path)}"
+    if SERVER_DIR not in sys.path:
+        sys.path.insert(0, SERVER_DIR)
+
+    from app import create_app
+    from models.models import db
+    app = create_app()
+    app.config["MAIL_SUPPRESS_SEND"] = True
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def admin_headers(app):
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        token = create_access_token(identity={'user_id': 1, 'role': 'admin'})
+    return {'Authorization': 'Bearer ' + token}
+
+
+# ---- data ----
+
+def seed_lookups(app):
+    """IsActive, FeedbackStatus, the news categories and two loan products."""
+    from models.models import db, IsActive, FeedbackStatus, PostsCategory, LoanProduct
+    with app.app_context():
+        db.session.add_all([IsActive(ID=1, Status='Active'), IsActive(ID=2, Status='Inactive')])
+        db.session.add_all([FeedbackStatus(StatusID=1, StatusName='Unread'),
+                            FeedbackStatus(StatusID=2, StatusName='Read')])
+        db.session.add_all([
+            PostsCategory(PostsCategoryID=i, Category=name) for i, name in enumerate(
+                ['Latest News', 'Financial Reports', 'Announcement', 'Upcoming Event', 'HeroImage'], 1)
+        ])
+        db.session.add_all([
+            LoanProduct(ProductKey='development', LoanName='Development Loan',
+                        InterestType='equal_principal', MonthlyInterestRate=Decimal('0.012'),
+                        DefaultTermMonths=48, MinTermMonths=1, MaxTermMonths=120,
+                        MinPrincipal=Decimal('1000'), MaxPrincipal=Decimal('10000000'),
+                        RoundingUnit=Decimal('1')),
+            LoanProduct(ProductKey='emergency', LoanName='Emergency Loan',
+                        InterestType='emi', MonthlyInterestRate=Decimal('0.015'),
+                        DefaultTermMonths=12, MinTermMonths=1, MaxTermMonths=36,
+                        RoundingUnit=Decimal('1')),
+        ])
+        db.session.commit()
+
+
+def _fake_value(column, i):
+    name = column.name
+    kind = column.type.__class__.__name__
+    if name in ('IsActiveID', 'isActiveID'):
+        return 1
+    if name == 'PostsCategoryID':
+        return i % 4 + 1                 # the four public news tabs
+    if name == 'StatusID':
+        return i % 2 + 1
+    if kind == 'Enum':
+        return column.type.enums[0]
+    if kind == 'Boolean':
+        return True
+    if kind == 'Integer':
+        return i + 1
+    if kind == 'Numeric':
+        return Decimal(i + 1)
+    if kind == 'DateTime':
+        return BASE_TIME + timedelta(hours=i)
+    if kind == 'Date':
+        return date(2030, 1, 1)
+    if kind == 'Time':
+        return time(8, 0)
+    if 'URL' in name or 'Url' in name or 'Path' in name or 'Image' in name:
+        return f"https://res.cloudinary.com/demo/image/upload/v1/bench/{name.lower()}_{i}.jpg"
+    if kind == 'Text':
+        return f"<p>{name} {i}. " + "Lorem ipsum dolor sit amet. " * 40 + "</p>"
+    if 'Email' in name:
+        return f"user{i}@example.com"
+    text = f"{name} {i}"
+    length = getattr(column.type, 'length', None)
+    return text[:length] if length else text
+
+
+def fake_row(model, i):
+    """A model instance with every non-key column filled."""
+    values = {}
+    for column in model.__table__.columns:
+        if column.primary_key:
+            continue
+        values[column.key] = _fake_value(column, i)
+    return model(**values)
+
+
+def seed_rows(app, model, n, start=0):
+    from models.models import db
+    with app.app_context():
+        db.session.add_all([fake_row(model, i) for i in range(start, start + n)])
+        db.session.commit()
@@ -0,0 +1,102 @@
+# =========================
+# STARTUP TIME BENCHMARK
+# =========================
+# Starts a fresh Python process per run, against a seeded SQLite copy of
+# the app, and times what a new worker pays before it serves traffic:
+#
+#   import    `import app` (models, routes, extensions, services)
+#   create    app.create_app()
+#   GET /     the first request
+#   loan/calc the first loan calculation (numpy engine in lazy mode)
+#
+# once with APP_LAZY_INIT=True (default) and once with False, and prints
+# the median of each over --runs processes.
+#
+#     cd server && python -m bench.startup [--runs 5] [--mode lazy|eager|both]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.seed import BENCH_ENV, SERVER_DIR, make_app, seed_lookups
+
+STEPS = ['import', 'create', 'GET /', 'loan/calc']
+
+LOAN_CALC = {'product_key': 'development', 'principal': 250000,
+             'term_months': 24, 'start_date': '2025-01-15'}
+
+
+def _child():
+    """Runs in the measured process: one JSON line of timings (ms) on stdout."""
+    timings = {}
+
+    started = time.perf_counter()
+    import app as app_module
+    timings['import'] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    app = app_module.create_app()
+    timings['create'] = (time.perf_counter() - started) * 1000
+
+    client = app.test_client()
+    started = time.perf_counter()
+    resp = client.get('/')
+    timings['GET /'] = (time.perf_counter() - started) * 1000
+    assert resp.status_code == 200, resp.status_code
+
+    started = time.perf_counter()
+    resp = client.post('/loan/calc', json=LOAN_CALC)
+    timings['loan/calc'] = (time.perf_counter() - started) * 1000
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+
+    print(json.dumps(timings))
+
+
+def _run(db_path, lazy):
+    env = dict(os.environ, **BENCH_ENV)
+    env.update(DATABASE_URL=f"sqlite:///{db_path}", APP_LAZY_INIT=str(lazy),
+               RESPONSE_CACHE_BACKEND='none', DB_WARMUP_CONNECTIONS='0')
+    env.pop('GUNICORN_PRELOADED', None)
+
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, '-m', 'bench.startup', '--child'],
+                         cwd=SERVER_DIR, env=env, capture_output=True, text=True)
+    total = (time.perf_counter() - started) * 1000
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip() or out.stdout.strip())
+    timings = json.loads(out.stdout.strip().splitlines()[-1])
+    timings['process'] = total
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--mode', choices=['lazy', 'eager', 'both'], default='both')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child()
+        return 0
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='mufate_startup_'), 'startup.sqlite')
+    seed_lookups(make_app(db_path))
+
+    modes = {'lazy': [True], 'eager': [False], 'both': [True, False]}[args.mode]
+    columns = STEPS + ['process']
+    print(f"{'mode':<8}" + ''.join(f"{c:>12}" for c in columns) + "   (median ms)")
+    for lazy in modes:
+        runs = [_run(db_path, lazy) for _ in range(args.runs)]
+        medians = [statistics.median(r[c] for r in runs) for c in columns]
+        print(f"{'lazy' if lazy else 'eager':<8}" + ''.join(f"{m:>12.1f}" for m in medians))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,12 +1,28 @@
 import os
-import cloudinary
-from dotenv import load_dotenv
+import threading
 
-# Load environment variables from .mufate_env
-load_dotenv(dotenv_path=".mufate_env")
+# Cloudinary is configured on the first upload, not at import: the SDK
+# (and its HTTP stack) costs every worker startup time, while most
+# requests never upload anything. app.py loads .mufate_env before any
+# upload can run.
 
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET")
-)
+_uploader = None
+_lock = threading.Lock()
+
+
+def get_uploader():
+    """The configured cloudinary.uploader module (imported on first call)."""
+    global _uploader
+    if _uploader is None:
+        with _lock:
+            if _uploader is None:
+                import cloudinary
+                import cloudinary.uploader
+
+                cloudinary.config(
+                    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
+                    api_key=os.getenv("CLOUDINARY_API_KEY"),
+                    api_secret=os.getenv("CLOUDINARY_API_SECRET")
+                )
+                _uploader = cloudinary.uploader
+    return _uploader
@@ -0,0 +1,222 @@
+# gunicorn.conf.py
+# Run with:  gunicorn -c gunicorn.conf.py app:app
+#
+# Workers/threads are sized from the CPUs and memory the container is
+# actually given (cgroup limits on Render/Docker, else the host), and can
+# be pinned with env vars:
+#
+#   PORT                          bind port (default 5000)
+#   GUNICORN_WORKER_CLASS         gthread (default) | sync | gevent
+#   GUNICORN_WORKERS / WEB_CONCURRENCY   worker processes (default: sized)
+#   GUNICORN_THREADS              threads per gthread worker (default 4)
+#   GUNICORN_WORKER_CONNECTIONS   greenlets per gevent worker (default 100)
+#   GUNICORN_WORKER_MEMORY_MB     RAM budget per worker for sizing (default 160)
+#   GUNICORN_MAX_WORKERS          upper bound for sizing (default 8)
+#   GUNICORN_PRELOAD              "True" imports the app once in the master (default)
+#   APP_LAZY_INIT                 app.py's lazy clients; defaults to False when
+#                                 preloading so workers inherit the imports
+#   GUNICORN_TIMEOUT              worker timeout, seconds (default 120: uploads)
+#   GUNICORN_MAX_REQUESTS         recycle a worker after N requests (default 1000)
+#   GUNICORN_LOG_EVERY            log a worker's request count every N (default 500)
+#   METRICS_DIR                   where workers share /_metrics snapshots
+#                                 (default: a temp dir per port when workers > 1)
+#   RESPONSE_CACHE_BACKEND        forced to "file" (unless "none") when workers > 1,
+#                                 so an admin write invalidates every worker's
+#                                 copy; RESPONSE_CACHE_DIR defaults per port
+#
+# gthread suits this app: most slow routes wait on Cloudinary, SMTP or SQL
+# Server, and pyodbc releases the GIL while it waits. gevent only helps
+# the HTTP-bound calls (pyodbc is not cooperative) and needs `pip install
+# gevent`; without it the gthread worker is used.
+
+import os
+import tempfile
+import time
+
+from dotenv import load_dotenv
+
+# Same env file as app.py, loaded before anything below (or the hooks'
+# imports in the master) reads a setting: services read theirs at import
+load_dotenv(dotenv_path=".mufate_env")
+
+
+def _cgroup_cpus():
+    # cgroup v2 "quota period" / v1 cfs quota+period
+    try:
+        quota, period = open("/sys/fs/cgroup/cpu.max").read().split()
+        if quota != "max":
+            return float(quota) / float(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int(open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read())
+        period = int(open("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read())
+        if quota > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def cpu_count():
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpus()
+    if quota:
+        cpus = min(cpus, quota)
+    return max(1, int(round(cpus)))
+
+
+def memory_mb():
+    for path in ("/sys/fs/cgroup/memory.max",
+                 "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            raw = open(path).read().strip()
+            if raw != "max" and int(raw) < 1 << 50:     # v1 "unlimited" is huge
+                return int(raw) // (1024 * 1024)
+        except (OSError, ValueError):
+            continue
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def sized_workers():
+    explicit = os.getenv("GUNICORN_WORKERS") or os.getenv("WEB_CONCURRENCY")
+    if explicit:
+        return max(1, int(explicit))
+    by_cpu = 2 * cpu_count() + 1
+    budget = memory_mb()
+    by_memory = budget // int(os.getenv("GUNICORN_WORKER_MEMORY_MB", "160")) if budget else by_cpu
+    return max(1, min(by_cpu, by_memory, int(os.getenv("GUNICORN_MAX_WORKERS", "8"))))
+
+
+# -----------------------------
+# Server socket / workers
+# -----------------------------
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread").lower()
+if worker_class == "gevent":
+    try:
+        # patch before the app (and its sockets/locks) is preloaded
+        from gevent import monkey
+        monkey.patch_all()
+    except ImportError:
+        print("⚠️ gevent is not installed; falling back to gthread workers")
+        worker_class = "gthread"
+
+workers = sized_workers()
+threads = int(os.getenv("GUNICORN_THREADS", "4")) if worker_class == "gthread" else 1
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "100"))
+
+# One DB connection per concurrent request in a worker, unless set explicitly
+# (read by services/db_engine.py when the app is imported below)
+os.environ.setdefault("DB_POOL_SIZE", str(threads if worker_class == "gthread" else 5))
+
+# /_metrics sums every worker's snapshot (services/instrumentation.py)
+if workers > 1:
+    os.environ.setdefault("METRICS_DIR", os.path.join(
+        tempfile.gettempdir(), f"mufate_metrics_{os.getenv('PORT', '5000')}"))
+
+# A per-process (memory) response cache would only be invalidated in the
+# worker that handled the admin write; the others would serve the old
+# page until the TTL runs out (services/response_cache.py)
+if workers > 1:
+    cache_backend = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+    if cache_backend not in ("file", "none"):
+        if "RESPONSE_CACHE_BACKEND" in os.environ:
+            print(f"⚠️ RESPONSE_CACHE_BACKEND={cache_backend} is per process; "
+                  f"using the file backend for {workers} workers")
+        os.environ["RESPONSE_CACHE_BACKEND"] = "file"
+    os.environ.setdefault("RESPONSE_CACHE_DIR", os.path.join(
+        tempfile.gettempdir(), f"mufate_response_cache_{os.getenv('PORT', '5000')}"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+
+# -----------------------------
+# Preload: import app.py once in the master, fork copy-on-write workers
+# -----------------------------
+preload_app = os.getenv("GUNICORN_PRELOAD", "True") == "True"
+if preload_app:
+    # app.py defers its per-process work (queue/upload threads, DB warm-up) to post_fork
+    os.environ["GUNICORN_PRELOADED"] = "True"
+    # import Cloudinary/numpy once in the master instead of in every worker
+    os.environ.setdefault("APP_LAZY_INIT", "False")
+
+LOG_EVERY = int(os.getenv("GUNICORN_LOG_EVERY", "500"))
+
+
+# -----------------------------
+# Hooks
+# -----------------------------
+def on_starting(server):
+    from services.instrumentation import reset_dir
+    reset_dir(os.getenv("METRICS_DIR"))   # counters restart with the server
+    from services import response_cache
+    if response_cache.backend is not None:
+        response_cache.backend.clear()     # nothing cached by a previous deploy
+    server.log.info(
+        f"🚀 {workers} {worker_class} worker(s) x {threads} thread(s), "
+        f"{cpu_count()} CPU(s), {memory_mb()} MB, preload={preload_app}"
+    )
+
+
+def post_fork(server, worker):
+    worker.request_count = 0
+    worker.started_at = time.monotonic()
+    if not preload_app:
+        return
+
+    from app import app
+    from models.models import db
+    from services import instrumentation, mail_queue, upload_jobs
+
+    mail_transport = app.extensions["mail_transport"]
+
+    # connections opened by the master must never be shared with a child
+    with app.app_context():
+        db.engine.dispose(close=False)
+    if hasattr(mail_transport, "after_fork"):
+        mail_transport.after_fork()
+    mail_queue.start_worker()
+    upload_jobs.start_workers()
+    instrumentation.registry.clear()   # anything the master recorded while preloading
+
+
+def post_worker_init(worker):
+    if preload_app:
+        from app import app
+        from services import loan_tables
+        from services.db_engine import warm_up
+        warm_up(app)
+        loan_tables.warm_up(app)
+
+
+def pre_request(worker, req):
+    worker.request_count = getattr(worker, "request_count", 0) + 1
+    if LOG_EVERY and worker.request_count % LOG_EVERY == 0:
+        uptime = time.monotonic() - getattr(worker, "started_at", time.monotonic())
+        worker.log.info(
+            f"📈 worker {worker.pid}: {worker.request_count} requests in {uptime:.0f}s"
+        )
+
+
+def worker_exit(server, worker):
+    from services.instrumentation import flush
+    flush()
+    uptime = time.monotonic() - getattr(worker, "started_at", time.monotonic())
+    server.log.info(
+        f"👋 worker {worker.pid} exiting after "
+        f"{getattr(worker, 'request_count', 0)} requests in {uptime:.0f}s"
+    )
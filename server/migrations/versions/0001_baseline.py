@@ -0,0 +1,25 @@
+"""baseline: schema as built by db.create_all()
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing databases were created by db.create_all(); nothing to do.
+    pass
+
+
+def downgrade():
+    pass
@@ -0,0 +1,86 @@
+"""service tables: public holidays, mail queue, newsletter campaigns
+
+Revision ID: 0002_service_tables
+Revises: 0001_baseline
+Create Date: 2026-10-18 09:05:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_service_tables'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+
+def _missing(table):
+    return not sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade():
+    if _missing('PublicHolidays'):
+        op.create_table(
+            'PublicHolidays',
+            sa.Column('HolidayID', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('HolidayName', sa.String(length=100), nullable=False),
+            sa.Column('HolidayDate', sa.Date(), nullable=False),
+            sa.Column('IsRecurring', sa.Boolean(), nullable=False, server_default=sa.false()),
+            sa.Column('IsActive', sa.Boolean(), nullable=False, server_default=sa.true()),
+            sa.Column('CreatedAt', sa.DateTime()),
+        )
+
+    if _missing('OutboundEmail'):
+        op.create_table(
+            'OutboundEmail',
+            sa.Column('EmailID', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('Subject', sa.String(length=255)),
+            sa.Column('Sender', sa.String(length=255)),
+            sa.Column('Recipients', sa.Text(), nullable=False),
+            sa.Column('Body', sa.Text()),
+            sa.Column('Html', sa.Text()),
+            sa.Column('Status', sa.String(length=20), nullable=False, server_default='queued'),
+            sa.Column('Attempts', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('NextAttemptAt', sa.DateTime(), nullable=False),
+            sa.Column('LastError', sa.String(length=1000)),
+            sa.Column('CreatedAt', sa.DateTime()),
+            sa.Column('SentAt', sa.DateTime()),
+        )
+
+    if _missing('NewsletterCampaign'):
+        op.create_table(
+            'NewsletterCampaign',
+            sa.Column('CampaignID', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('Subject', sa.String(length=255), nullable=False),
+            sa.Column('Body', sa.Text(), nullable=False),
+            sa.Column('Html', sa.Text()),
+            sa.Column('Status', sa.String(length=20), nullable=False, server_default='draft'),
+            sa.Column('LastSubID', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('SentCount', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('FailedCount', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('SkippedCount', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('CreatedAt', sa.DateTime()),
+            sa.Column('StartedAt', sa.DateTime()),
+            sa.Column('CompletedAt', sa.DateTime()),
+            sa.Column('HeartbeatAt', sa.DateTime()),
+        )
+
+    if _missing('NewsletterDelivery'):
+        op.create_table(
+            'NewsletterDelivery',
+            sa.Column('DeliveryID', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('CampaignID', sa.Integer(), sa.ForeignKey('NewsletterCampaign.CampaignID'), nullable=False),
+            sa.Column('SubID', sa.Integer(), sa.ForeignKey('NewsletterSubscription.SubID'), nullable=False),
+            sa.Column('Status', sa.String(length=20), nullable=False),
+            sa.Column('Error', sa.String(length=500)),
+            sa.Column('AttemptedAt', sa.DateTime()),
+            sa.UniqueConstraint('CampaignID', 'SubID', name='UQ_NewsletterDelivery_Campaign_Sub'),
+        )
+
+
+def downgrade():
+    for table in ('NewsletterDelivery', 'NewsletterCampaign', 'OutboundEmail', 'PublicHolidays'):
+        if not _missing(table):
+            op.drop_table(table)
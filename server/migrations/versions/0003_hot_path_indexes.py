@@ -0,0 +1,64 @@
+"""indexes for the filter + order patterns of the list routes
+
+Revision ID: 0003_hot_path_indexes
+Revises: 0002_service_tables
+Create Date: 2026-10-18 09:10:00
+
+Each public list filters on IsActiveID/IsActive (or a category/status)
+and sorts on a date, so each index leads with the filter column and
+continues with the sort column. On SQL Server the columns the list
+returns are INCLUDEd where that keeps the scan inside the index.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_hot_path_indexes'
+down_revision = '0002_service_tables'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns, SQL Server INCLUDE columns)
+INDEXES = [
+    ('IX_Posts_Category_DatePosted', 'Posts', ['PostsCategoryID', 'DatePosted', 'PostID'], ['Title', 'CoverImage']),
+    ('IX_GalleryPhotos_IsActive_UploadedAt', 'GalleryPhotos', ['IsActive', 'UploadedAt'], ['Title', 'ImageURL']),
+    ('IX_Resources_IsActiveID_UploadedAt', 'Resources', ['IsActiveID', 'UploadedAt'], ['Title', 'FilePath']),
+    ('IX_Feedback_Status_SubmittedAt', 'Feedback', ['StatusID', 'SubmittedAt'], None),
+    ('IX_Feedback_SubmittedAt', 'Feedback', ['SubmittedAt', 'FeedbackID'], None),
+    ('IX_FAQs_IsActiveID_CreatedDate', 'FAQs', ['IsActiveID', 'CreatedDate'], None),
+    ('IX_Partnership_IsActiveID_CreatedAt', 'Partnership', ['IsActiveID', 'CreatedAt'], None),
+    ('IX_SaccoVideo_IsActiveID_CreatedAt', 'SaccoVideo', ['IsActiveID', 'CreatedAt'], None),
+    ('IX_SaccoClients_IsActiveID_CreatedAt', 'Sacco_Clients', ['IsActiveID', 'CreatedAt'], None),
+    ('IX_MobileBanking_IsActiveID_CreatedAt', 'Mobile_Banking_Info', ['IsActiveID', 'CreatedAt'], None),
+    ('IX_CoreValues_IsActiveID', 'Core_Values', ['IsActiveID'], None),
+    ('IX_Career_IsActiveID', 'Career', ['IsActiveID'], None),
+    ('IX_HolidayMessages_Month_Day', 'HolidayMessages', ['Month', 'Day', 'IsActive'], None),
+    ('IX_OutboundEmail_Status_NextAttemptAt', 'OutboundEmail', ['Status', 'NextAttemptAt'], None),
+]
+
+
+def _existing(inspector, table):
+    if not inspector.has_table(table):
+        return None
+    return {ix['name'] for ix in inspector.get_indexes(table)}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns, include in INDEXES:
+        existing = _existing(inspector, table)
+        if existing is None or name in existing:
+            continue
+        kwargs = {'mssql_include': include} if include else {}
+        op.create_index(name, table, columns, **kwargs)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    for name, table, _, _ in reversed(INDEXES):
+        existing = _existing(inspector, table)
+        if existing and name in existing:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,51 @@
+"""background upload jobs
+
+Revision ID: 0004_upload_jobs
+Revises: 0003_hot_path_indexes
+Create Date: 2026-10-18 13:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_upload_jobs'
+down_revision = '0003_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+
+def _missing(table):
+    return not sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade():
+    if _missing('UploadJob'):
+        op.create_table(
+            'UploadJob',
+            sa.Column('JobID', sa.String(length=32), primary_key=True),
+            sa.Column('Kind', sa.String(length=20), nullable=False),
+            sa.Column('Status', sa.String(length=20), nullable=False, server_default='queued'),
+            sa.Column('FileName', sa.String(length=255), nullable=False),
+            sa.Column('SizeBytes', sa.BigInteger()),
+            sa.Column('SpoolPath', sa.String(length=500)),
+            sa.Column('Host', sa.String(length=255), nullable=False),
+            sa.Column('TargetModel', sa.String(length=50)),
+            sa.Column('TargetColumn', sa.String(length=50)),
+            sa.Column('TargetID', sa.Integer()),
+            sa.Column('Payload', sa.Text()),
+            sa.Column('ResultURL', sa.String(length=500)),
+            sa.Column('Error', sa.String(length=1000)),
+            sa.Column('Attempts', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('NextAttemptAt', sa.DateTime(), nullable=False),
+            sa.Column('CreatedAt', sa.DateTime()),
+            sa.Column('CompletedAt', sa.DateTime()),
+        )
+        op.create_index('IX_UploadJob_Host_Status_NextAttemptAt', 'UploadJob',
+                        ['Host', 'Status', 'NextAttemptAt'])
+
+
+def downgrade():
+    if not _missing('UploadJob'):
+        op.drop_table('UploadJob')
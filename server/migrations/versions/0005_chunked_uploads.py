@@ -0,0 +1,42 @@
+"""chunked upload offsets on UploadJob
+
+Revision ID: 0005_chunked_uploads
+Revises: 0004_upload_jobs
+Create Date: 2026-10-18 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_chunked_uploads'
+down_revision = '0004_upload_jobs'
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    sa.Column('ReceivedBytes', sa.BigInteger(), nullable=False, server_default='0'),
+    sa.Column('UploadedBytes', sa.BigInteger(), nullable=False, server_default='0'),
+    sa.Column('RemoteUploadID', sa.String(length=64)),
+]
+
+
+def _existing_columns():
+    return {c['name'] for c in sa.inspect(op.get_bind()).get_columns('UploadJob')}
+
+
+def upgrade():
+    existing = _existing_columns()
+    with op.batch_alter_table('UploadJob') as batch:
+        for column in COLUMNS:
+            if column.name not in existing:
+                batch.add_column(column.copy())
+
+
+def downgrade():
+    existing = _existing_columns()
+    with op.batch_alter_table('UploadJob') as batch:
+        for column in COLUMNS:
+            if column.name in existing:
+                batch.drop_column(column.name)
@@ -0,0 +1,36 @@
+"""claim tokens on OutboundEmail and UploadJob
+
+Revision ID: 0006_claim_tokens
+Revises: 0005_chunked_uploads
+Create Date: 2026-10-18 18:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_claim_tokens'
+down_revision = '0005_chunked_uploads'
+branch_labels = None
+depends_on = None
+
+TABLES = ('OutboundEmail', 'UploadJob')
+
+
+def _has_token(table):
+    return 'ClaimToken' in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    for table in TABLES:
+        if not _has_token(table):
+            with op.batch_alter_table(table) as batch:
+                batch.add_column(sa.Column('ClaimToken', sa.String(length=32)))
+
+
+def downgrade():
+    for table in TABLES:
+        if _has_token(table):
+            with op.batch_alter_table(table) as batch:
+                batch.drop_column('ClaimToken')
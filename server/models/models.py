@@ -53,6 +53,10 @@ class CoreValue(db.Model):
     is_active = db.relationship('IsActive', backref='core_values')
     CreatedAt = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('IX_CoreValues_IsActiveID', 'IsActiveID'),
+    )
+
 
 class MobileBankingInfo(db.Model):
     __tablename__ = 'Mobile_Banking_Info'
@@ -66,6 +70,10 @@ class MobileBankingInfo(db.Model):
     is_active = db.relationship('IsActive', backref='mobile_banking')
     CreatedAt = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('IX_MobileBanking_IsActiveID_CreatedAt', 'IsActiveID', 'CreatedAt'),
+    )
+
 
 class SaccoBranch(db.Model):
     __tablename__ = 'Sacco_Branch'
@@ -136,6 +144,10 @@ class Partnership(db.Model):
     is_active = db.relationship('IsActive', backref='partnerships')
     CreatedAt = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('IX_Partnership_IsActiveID_CreatedAt', 'IsActiveID', 'CreatedAt'),
+    )
+
 
 class Membership(db.Model):
     __tablename__ = 'Membership'
@@ -215,6 +227,12 @@ class Feedback(db.Model):
     status = db.relationship('FeedbackStatus', backref='feedbacks')
     SubmittedAt = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Admin inbox: filter by status, newest first (or all statuses)
+    __table_args__ = (
+        db.Index('IX_Feedback_Status_SubmittedAt', 'StatusID', 'SubmittedAt'),
+        db.Index('IX_Feedback_SubmittedAt', 'SubmittedAt', 'FeedbackID'),
+    )
+
 
 class FAQ(db.Model):
     __tablename__ = 'FAQs'
@@ -226,6 +244,10 @@ class FAQ(db.Model):
     IsActiveID = db.Column(db.Integer, db.ForeignKey('IsActive.ID'))
     is_active = db.relationship('IsActive', backref='faqs')
 
+    __table_args__ = (
+        db.Index('IX_FAQs_IsActiveID_CreatedDate', 'IsActiveID', 'CreatedDate'),
+    )
+
 
 class IsActive(db.Model):
     __tablename__ = 'IsActive'
@@ -248,6 +270,10 @@ class Career(db.Model):
     is_active = db.relationship('IsActive', backref='careers')
     PostedDate = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('IX_Career_IsActiveID', 'IsActiveID'),
+    )
+
 
 class Resources(db.Model):
     __tablename__ = 'Resources'
@@ -259,6 +285,12 @@ class Resources(db.Model):
     is_active = db.relationship('IsActive', backref='resources')
     UploadedAt = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Covers /resources and /resources/recent without touching the table
+    __table_args__ = (
+        db.Index('IX_Resources_IsActiveID_UploadedAt', 'IsActiveID', 'UploadedAt',
+                 mssql_include=['Title', 'FilePath']),
+    )
+
 
 class Posts(db.Model):
     __tablename__ = "Posts"
@@ -271,6 +303,14 @@ class Posts(db.Model):
     PostsCategoryID = db.Column(db.Integer, db.ForeignKey('PostsCategory.PostsCategoryID'), nullable=False)
     isActiveID = db.Column(db.Integer)
 
+    # Keyset pagination of /news/posts: per-category, newest first; the
+    # card columns are included so a list page without Content never
+    # leaves the index
+    __table_args__ = (
+        db.Index('IX_Posts_Category_DatePosted', 'PostsCategoryID', 'DatePosted', 'PostID',
+                 mssql_include=['Title', 'CoverImage']),
+    )
+
 
 class SaccoClient(db.Model):
     __tablename__ = 'Sacco_Clients'
@@ -283,6 +323,10 @@ class SaccoClient(db.Model):
     is_active = db.relationship('IsActive', backref='clients')
     CreatedAt = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('IX_SaccoClients_IsActiveID_CreatedAt', 'IsActiveID', 'CreatedAt'),
+    )
+
 
 class BOD(db.Model):
     __tablename__ = 'BOD'
@@ -311,6 +355,22 @@ class HolidayMessage(db.Model):
     Month = db.Column(db.Integer, nullable=False)
     Day = db.Column(db.Integer, nullable=False)
 
+    __table_args__ = (
+        db.Index('IX_HolidayMessages_Month_Day', 'Month', 'Day', 'IsActive'),
+    )
+
+
+class PublicHoliday(db.Model):
+    __tablename__ = 'PublicHolidays'
+
+    HolidayID = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    HolidayName = db.Column(db.String(100), nullable=False)
+    HolidayDate = db.Column(db.Date, nullable=False)
+    # Recurring holidays repeat every year on HolidayDate's month/day
+    IsRecurring = db.Column(db.Boolean, nullable=False, default=False)
+    IsActive = db.Column(db.Boolean, nullable=False, default=True)
+    CreatedAt = db.Column(db.DateTime, default=datetime.utcnow)
+
 
 class GalleryPhoto(db.Model):
     __tablename__ = 'GalleryPhotos'
@@ -322,6 +382,12 @@ class GalleryPhoto(db.Model):
     UploadedAt = db.Column(db.DateTime, default=datetime.utcnow)
     IsActive = db.Column(db.Boolean, default=True)
 
+    # /gallery: COUNT(*) and the page seek both stay inside this index
+    __table_args__ = (
+        db.Index('IX_GalleryPhotos_IsActive_UploadedAt', 'IsActive', 'UploadedAt',
+                 mssql_include=['Title', 'ImageURL']),
+    )
+
 
 class LoanProduct(db.Model):
     __tablename__ = 'LoanProduct'
@@ -410,6 +476,112 @@ class NewsletterSubscription(db.Model):
     ContactInfo = db.Column(db.String(100), nullable=False, unique=True) # Email or Phone
     SubscribedAt = db.Column(db.DateTime, default=datetime.utcnow)
 
+class OutboundEmail(db.Model):
+    __tablename__ = 'OutboundEmail'
+
+    EmailID = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    Subject = db.Column(db.String(255))
+    Sender = db.Column(db.String(255))          # JSON: "addr" or ["Name", "addr"]
+    Recipients = db.Column(db.Text, nullable=False)  # JSON list
+    Body = db.Column(db.Text)
+    Html = db.Column(db.Text)
+    # 'queued' | 'sending' | 'sent' | 'dead'
+    Status = db.Column(db.String(20), nullable=False, default='queued')
+    Attempts = db.Column(db.Integer, nullable=False, default=0)
+    # next retry time; while 'sending' it is the lease expiry
+    NextAttemptAt = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # uuid4 hex of the worker cycle that last claimed the row
+    ClaimToken = db.Column(db.String(32))
+    LastError = db.Column(db.String(1000))
+    CreatedAt = db.Column(db.DateTime, default=datetime.utcnow)
+    SentAt = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('IX_OutboundEmail_Status_NextAttemptAt', 'Status', 'NextAttemptAt'),
+    )
+
+
+class NewsletterCampaign(db.Model):
+    __tablename__ = "NewsletterCampaign"
+
+    CampaignID = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    Subject = db.Column(db.String(255), nullable=False)
+    Body = db.Column(db.Text, nullable=False)
+    Html = db.Column(db.Text)
+    # 'draft' | 'running' | 'completed'
+    Status = db.Column(db.String(20), nullable=False, default='draft')
+    # Keyset cursor: every subscriber with SubID <= LastSubID has been handled
+    LastSubID = db.Column(db.Integer, nullable=False, default=0)
+    SentCount = db.Column(db.Integer, nullable=False, default=0)
+    FailedCount = db.Column(db.Integer, nullable=False, default=0)
+    SkippedCount = db.Column(db.Integer, nullable=False, default=0)
+    CreatedAt = db.Column(db.DateTime, default=datetime.utcnow)
+    StartedAt = db.Column(db.DateTime)
+    CompletedAt = db.Column(db.DateTime)
+    # Touched after every page; a 'running' campaign with a stale heartbeat
+    # lost its sender (restart/crash) and may be resumed by any worker
+    HeartbeatAt = db.Column(db.DateTime)
+
+
+class NewsletterDelivery(db.Model):
+    __tablename__ = "NewsletterDelivery"
+
+    DeliveryID = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    CampaignID = db.Column(db.Integer, db.ForeignKey('NewsletterCampaign.CampaignID'), nullable=False)
+    SubID = db.Column(db.Integer, db.ForeignKey('NewsletterSubscription.SubID'), nullable=False)
+    # 'sent' | 'failed' | 'skipped' (phone-only subscribers)
+    Status = db.Column(db.String(20), nullable=False)
+    Error = db.Column(db.String(500))
+    AttemptedAt = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('CampaignID', 'SubID', name='UQ_NewsletterDelivery_Campaign_Sub'),
+    )
+
+
+class UploadJob(db.Model):
+    __tablename__ = "UploadJob"
+
+    # uuid4 hex: the id is handed to the uploader to poll /uploads/<JobID>
+    JobID = db.Column(db.String(32), primary_key=True)
+    # 'image' | 'resource' (services/media_storage.py)
+    Kind = db.Column(db.String(20), nullable=False)
+    # 'receiving' (chunked upload still arriving) | 'queued' | 'uploading'
+    # | 'done' | 'failed'
+    Status = db.Column(db.String(20), nullable=False, default='queued')
+    FileName = db.Column(db.String(255), nullable=False)
+    SizeBytes = db.Column(db.BigInteger)
+    # bytes spooled from the client / sent on to the media store; both are
+    # resume offsets after an interruption
+    ReceivedBytes = db.Column(db.BigInteger, nullable=False, default=0)
+    UploadedBytes = db.Column(db.BigInteger, nullable=False, default=0)
+    # X-Unique-Upload-Id of a part-wise upload to Cloudinary
+    RemoteUploadID = db.Column(db.String(64))
+    # spooled copy on the local disk of Host; removed once the job finishes
+    SpoolPath = db.Column(db.String(500))
+    Host = db.Column(db.String(255), nullable=False)
+    # row that receives the URL: updated if TargetID is set, else inserted
+    # from Payload (JSON column values) and TargetID filled in
+    TargetModel = db.Column(db.String(50))
+    TargetColumn = db.Column(db.String(50))
+    TargetID = db.Column(db.Integer)
+    Payload = db.Column(db.Text)
+    ResultURL = db.Column(db.String(500))
+    Error = db.Column(db.String(1000))
+    Attempts = db.Column(db.Integer, nullable=False, default=0)
+    # next retry time; while 'uploading' it is the lease expiry, while
+    # 'receiving' the time an abandoned chunked upload is discarded
+    NextAttemptAt = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # uuid4 hex of the worker that last claimed the job
+    ClaimToken = db.Column(db.String(32))
+    CreatedAt = db.Column(db.DateTime, default=datetime.utcnow)
+    CompletedAt = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('IX_UploadJob_Host_Status_NextAttemptAt', 'Host', 'Status', 'NextAttemptAt'),
+    )
+
+
 class SaccoVideo(db.Model):
     __tablename__ = 'SaccoVideo'
 
@@ -423,6 +595,10 @@ class SaccoVideo(db.Model):
     is_active = db.relationship('IsActive', backref='sacco_videos')
     CreatedAt = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('IX_SaccoVideo_IsActiveID_CreatedAt', 'IsActiveID', 'CreatedAt'),
+    )
+
 
 class AssetFinancing(db.Model):
     __tablename__ = 'AssetFinancing'
@@ -1,17 +1,26 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, url_for
 from flask_cors import CORS
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from flask_mail import Message
 from datetime import datetime
-from models.models import db, User, Career, CoreValue, FAQ, HolidayMessage, Feedback, MobileBankingInfo, OperationTimeline, Partnership, Posts, Product, SaccoBranch, SaccoProfile, Service, SaccoClient, SaccoStatistics, HomepageSlider, Membership, BOD, Management, Resources, GalleryPhoto, LoanProduct, SupportTicket, PostsCategory, NewsletterSubscription, SaccoVideo,AssetFinancing 
-import cloudinary.uploader
+from models.models import db, User, OutboundEmail, UploadJob, Career, CoreValue, FAQ, HolidayMessage, Feedback, FeedbackStatus, MobileBankingInfo, OperationTimeline, Partnership, Posts, Product, SaccoBranch, SaccoProfile, Service, SaccoClient, SaccoStatistics, HomepageSlider, Membership, BOD, Management, Resources, GalleryPhoto, SupportTicket, PostsCategory, NewsletterSubscription, NewsletterCampaign, SaccoVideo,AssetFinancing 
+import os
 import re
+import base64
 import traceback
 from datetime import date, timedelta
 from calendar import monthrange
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 import traceback
+from services import loan_catalogue
+from services.response_cache import cached_response, invalidates, conditional_response
+from services import mail_queue
+from services import newsletter
+from services.mail_pool import PooledMail, POOL_ENABLED as MAIL_POOL_ENABLED
+from services import upload_jobs
+from services.image_variants import srcset, HERO, PORTRAIT
 
 
 
@@ -20,6 +29,9 @@ import traceback
 routes = Blueprint('routes', __name__)
 #CORS(routes)
 
+# ✅ ETag + 304 Not Modified for every GET on this blueprint
+routes.after_request(conditional_response)
+
 bcrypt = Bcrypt()
 jwt = JWTManager()
 
@@ -29,10 +41,11 @@ mail = None
 mail = None
 
 
-# ✅ Register mail instance
+# ✅ Register mail instance (wrapped in the pooled SMTP transport)
 def register_mail_instance(mail_instance):
     global mail
-    mail = mail_instance
+    mail = PooledMail(mail_instance) if MAIL_POOL_ENABLED else mail_instance
+    return mail
 
 # ✅ Test route
 
@@ -74,6 +87,7 @@ def login():
 
 @routes.route('/careers/create', methods=['POST'])
 @jwt_required()
+@invalidates('careers')
 def create_career():
     try:
         current_user = get_jwt_identity()
@@ -122,6 +136,7 @@ def create_career():
 
 @routes.route('/careers/update/<int:career_id>', methods=['PUT'])
 @jwt_required()
+@invalidates('careers')
 def update_career(career_id):
     try:
         # Authenticate and authorize
@@ -180,6 +195,7 @@ def update_career(career_id):
 
 # ✅ Public route to view all active career posts
 @routes.route('/careers', methods=['GET'])
+@cached_response('careers', ttl=300)
 def view_careers():
     try:
         careers = Career.query.filter_by(
@@ -211,6 +227,7 @@ def view_careers():
 # ✅ Admin-only Core Value creation route
 @routes.route('/corevalues/create', methods=['POST'])
 @jwt_required()
+@invalidates('corevalues')
 def create_core_value():
     try:
         current_user = get_jwt_identity()
@@ -250,6 +267,7 @@ def create_core_value():
 # Route for viewing the core_values
 # ✅ Public route to view all active core values
 @routes.route('/corevalues', methods=['GET'])
+@cached_response('corevalues', ttl=3600)
 def view_core_values():
     try:
         core_values = CoreValue.query.filter_by(
@@ -280,12 +298,13 @@ def view_core_values():
 def upload_image():
     try:
         file = request.files['image']
-        upload_result = cloudinary.uploader.upload(file)
-        image_url = upload_result['secure_url']
+        job = upload_jobs.submit(file, 'image')
+        if job.Status != 'done':
+            return jsonify({'message': '⏳ Image upload started.', **_upload_accepted(job)}), 202
 
         return jsonify({
             'message': '✅ Image uploaded successfully!',
-            'image_url': image_url
+            'image_url': job.ResultURL
         }), 201
 
     except Exception as e:
@@ -293,10 +312,34 @@ def upload_image():
         traceback.print_exc()
         return jsonify({'message': '❌ Failed to upload image.', 'error': str(e)}), 500
 
+
+def _upload_accepted(job):
+    return {
+        'job_id': job.JobID,
+        'status': job.Status,
+        'status_url': url_for('routes.upload_status', job_id=job.JobID),
+    }
+
+
+# Poll a background upload (services/upload_jobs.py)
+@routes.route('/uploads/<job_id>', methods=['GET'])
+def upload_status(job_id):
+    try:
+        job = db.session.get(UploadJob, job_id)
+        if not job:
+            return jsonify({'message': '❌ Upload job not found.'}), 404
+        return jsonify(upload_jobs.progress(job)), 200
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'message': '❌ Failed to fetch upload status.', 'error': str(e)}), 500
+
+
 # upload a resource.
 
 
 @routes.route('/resources/upload', methods=['POST'])
+@invalidates('resources')
 def upload_resource():
     try:
         title = request.form.get('Title')
@@ -306,54 +349,119 @@ def upload_resource():
         if not title or not file or not is_active_id:
             return jsonify({'message': '❌ Title, file, and IsActiveID are required!'}), 400
 
-        filename = file.filename
-        extension = filename.split('.')[-1].lower()
+        # Spool the file and let an upload worker create the Resources row
+        # (with its Cloudinary download URL) once the transfer is done
+        job = upload_jobs.submit(file, 'resource', target=('Resources', 'FilePath'),
+                                 values={'Title': title, 'IsActiveID': is_active_id})
+        if job.Status != 'done':
+            return jsonify({'message': '⏳ Resource upload started.', **_upload_accepted(job)}), 202
 
-        # FIX: Use auto resource type
-        upload_result = cloudinary.uploader.upload(
-            file,
-            resource_type="auto",
-            overwrite=True,
-            use_filename=True,
-            unique_filename=False
-        )
+        return jsonify({
+            'message': '✅ Resource uploaded successfully!',
+            'file_url': job.ResultURL
+        }), 201
 
-        # Defensive check
-        if "public_id" not in upload_result:
-            return jsonify({
-                'message': '❌ Upload failed.',
-                'cloudinary_response': upload_result
-            }), 500
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'message': '❌ Failed to upload resource.', 'error': str(e)}), 500
 
-        public_id = upload_result["public_id"]
-        format = upload_result.get("format", extension)
+# Large resource files: start a chunked upload, then PUT the parts to
+# /uploads/<job_id> (see services/upload_jobs.py)
+@routes.route('/resources/upload/chunked', methods=['POST'])
+@jwt_required()
+def start_chunked_resource_upload():
+    current_user = get_jwt_identity()
+    if current_user['role'].lower() != 'admin':
+        return jsonify({'message': '❌ Access denied. Admins only!'}), 403
 
-        # Force download URL
-        file_url = f"https://res.cloudinary.com/djydkcx01/raw/upload/fl_attachment/{public_id}.{format}"
+    try:
+        data = request.get_json(silent=True) or {}
+        title = data.get('Title')
+        is_active_id = data.get('IsActiveID')
+        filename = data.get('FileName')
+        size = data.get('SizeBytes')
 
-        # Save in DB
-        new_resource = Resources(
-            Title=title,
-            FilePath=file_url,
-            IsActiveID=is_active_id
-        )
-        db.session.add(new_resource)
-        db.session.commit()
+        if not title or not is_active_id or not filename or not size:
+            return jsonify({'message': '❌ Title, IsActiveID, FileName and SizeBytes are required!'}), 400
+        try:
+            size = int(size)
+            if size <= 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            return jsonify({'message': '❌ SizeBytes must be a positive integer.'}), 400
+        if size > upload_jobs.MAX_BYTES:
+            return jsonify({'message': f'❌ Files may be at most {upload_jobs.MAX_BYTES} bytes.'}), 413
 
+        try:
+            job = upload_jobs.open_chunked(filename, size, 'resource', target=('Resources', 'FilePath'),
+                                           values={'Title': title, 'IsActiveID': is_active_id})
+        except upload_jobs.SpoolFull:
+            return jsonify({'message': '❌ Too many uploads in progress. Try again later.'}), 503
         return jsonify({
-            'message': '✅ Resource uploaded successfully!',
-            'file_url': file_url
+            'message': '✅ Upload started. PUT the file in parts to upload_url.',
+            'job_id': job.JobID,
+            'upload_url': url_for('routes.upload_status', job_id=job.JobID),
+            'part_size': upload_jobs.PART_BYTES,
+            'offset': 0,
         }), 201
 
     except Exception as e:
-        import traceback
         traceback.print_exc()
-        return jsonify({'message': '❌ Failed to upload resource.', 'error': str(e)}), 500
+        return jsonify({'message': '❌ Failed to start upload.', 'error': str(e)}), 500
+
+
+_CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+# Receive one part: Content-Range: bytes <start>-<end>/<total>, raw body.
+# A part that does not start at the current offset gets 409 with the
+# offset to resume from.
+@routes.route('/uploads/<job_id>', methods=['PUT'])
+@jwt_required()
+def receive_upload_part(job_id):
+    current_user = get_jwt_identity()
+    if current_user['role'].lower() != 'admin':
+        return jsonify({'message': '❌ Access denied. Admins only!'}), 403
+
+    try:
+        job = db.session.get(UploadJob, job_id)
+        if not job:
+            return jsonify({'message': '❌ Upload job not found.'}), 404
+
+        match = _CONTENT_RANGE.match(request.headers.get('Content-Range', ''))
+        if not match:
+            return jsonify({'message': '❌ Content-Range: bytes <start>-<end>/<total> is required.'}), 400
+        start, end, total = (int(g) for g in match.groups())
+        length = end - start + 1
+        if total != job.SizeBytes or end < start or end >= total or request.content_length != length:
+            return jsonify({'message': '❌ Content-Range does not match the upload or the body.'}), 400
+        if length > upload_jobs.PART_BYTES:
+            return jsonify({'message': f'❌ Parts may be at most {upload_jobs.PART_BYTES} bytes.'}), 413
+
+        try:
+            job = upload_jobs.receive_chunk(job, start, length, request.stream)
+        except upload_jobs.OffsetMismatch as e:
+            return jsonify({'message': '❌ Part does not start at the current offset.',
+                            'offset': e.offset, 'status': job.Status}), 409
+
+        if job.Status == 'receiving':
+            return jsonify({'offset': job.ReceivedBytes, 'status': job.Status}), 200
+        if job.Status == 'done':      # UPLOAD_JOBS_ENABLED=False: uploaded inline
+            return jsonify({'message': '✅ File uploaded successfully!', 'file_url': job.ResultURL}), 201
+        return jsonify({'message': '⏳ File received; uploading.', 'offset': job.ReceivedBytes,
+                        **_upload_accepted(job)}), 202
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'message': '❌ Failed to receive upload part.', 'error': str(e)}), 500
+
 
 # Viewing resources with download links
 
 
 @routes.route('/resources', methods=['GET'])
+@cached_response('resources', ttl=300)
 def list_resources():
     try:
         resources = Resources.query.filter_by(
@@ -400,6 +508,7 @@ def download_resource(resource_id):
 # ✅ Admin-only route to create FAQ
 @routes.route('/faqs/create', methods=['POST'])
 @jwt_required()
+@invalidates('faqs')
 def create_faq():
     try:
         current_user = get_jwt_identity()
@@ -436,6 +545,7 @@ def create_faq():
 
 
 @routes.route('/faqs', methods=['GET'])
+@cached_response('faqs', ttl=3600)
 def list_faqs():
     try:
         # Fetch FAQs where IsActiveID = 1 (Active)
@@ -459,6 +569,55 @@ def list_faqs():
         return jsonify({'message': '❌ Failed to fetch FAQs.', 'error': str(e)}), 500
 
 # Route for viewing the feedbacks for the admin only
+# Inbox API: newest first, filtered by ?status= (name or ID), ?email=,
+# ?from= / ?to= (YYYY-MM-DD, inclusive) and paged by ?cursor= (keyset on
+# SubmittedAt, FeedbackID) or ?page= (numbered, with totals).
+FEEDBACK_PAGE_SIZE = 25
+FEEDBACK_MAX_PAGE_SIZE = 100
+# mark-read IDs per request: one IN (...) parameter each, and SQL Server
+# allows 2100 parameters per statement
+FEEDBACK_MAX_BULK_IDS = 1000
+
+
+def _feedback_filters(args, with_status=True):
+    """SQL criteria for the inbox query string; ValueError on bad input."""
+    criteria = []
+
+    status = (args.get('status') or '').strip()
+    if with_status and status:
+        if status.isdigit():
+            criteria.append(Feedback.StatusID == int(status))
+        else:
+            status_row = FeedbackStatus.query.filter_by(StatusName=status).first()
+            if not status_row:
+                raise ValueError(f'Unknown status: {status}')
+            criteria.append(Feedback.StatusID == status_row.StatusID)
+
+    email = (args.get('email') or '').strip()
+    if email:
+        escaped = email.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        criteria.append(Feedback.Email.like(f'%{escaped}%', escape='\\'))
+
+    try:
+        if args.get('from'):
+            criteria.append(Feedback.SubmittedAt >= datetime.strptime(args['from'], '%Y-%m-%d'))
+        if args.get('to'):
+            day_after = datetime.strptime(args['to'], '%Y-%m-%d') + timedelta(days=1)
+            criteria.append(Feedback.SubmittedAt < day_after)
+    except ValueError:
+        raise ValueError('Dates must be YYYY-MM-DD')
+
+    return criteria
+
+
+def _feedback_status_counts(criteria):
+    """{StatusName: count} for the filtered inbox, in one GROUP BY."""
+    rows = db.session.query(FeedbackStatus.StatusName, db.func.count(Feedback.FeedbackID))\
+        .select_from(Feedback)\
+        .outerjoin(FeedbackStatus, Feedback.StatusID == FeedbackStatus.StatusID)\
+        .filter(*criteria)\
+        .group_by(FeedbackStatus.StatusName).all()
+    return {(name or 'Unknown'): count for name, count in rows}
 
 
 @routes.route('/admin/feedbacks', methods=['GET'])
@@ -468,25 +627,262 @@ def get_all_feedbacks():
     if current_user['role'].lower() != 'admin':
         return jsonify({'message': '❌ Access denied. Admins only!'}), 403
 
-    feedbacks = Feedback.query.order_by(Feedback.SubmittedAt.desc()).all()
-    results = []
-
-    for fb in feedbacks:
-        results.append({
-            'FeedbackID': fb.FeedbackID,
-            'Email': fb.Email,
-            'Subject': fb.Subject,
-            'Message': fb.Message,
-            'Status': fb.status.StatusName if fb.status else 'Unknown',
-            'SubmittedAt': fb.SubmittedAt.strftime('%Y-%m-%d %H:%M:%S')
-        })
+    try:
+        try:
+            criteria = _feedback_filters(request.args)
+            limit = min(max(int(request.args.get('limit', FEEDBACK_PAGE_SIZE)), 1), FEEDBACK_MAX_PAGE_SIZE)
+            page = int(request.args['page']) if request.args.get('page') else None
+            cursor = request.args.get('cursor')
+            after = _decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return jsonify({'message': f'❌ {e}'}), 400
+
+        # status is read for every row: load it in the same query, not one per row
+        query = Feedback.query.options(joinedload(Feedback.status)).filter(*criteria)
+        order = (Feedback.SubmittedAt.desc(), Feedback.FeedbackID.desc())
+
+        pagination = {}
+        if page is not None:
+            page = max(page, 1)
+            total = query.order_by(None).count()
+            feedbacks = query.order_by(*order).offset((page - 1) * limit).limit(limit).all()
+            pagination = {'page': page, 'pages': (total + limit - 1) // limit, 'total': total}
+        else:
+            if after:
+                submitted, feedback_id = after
+                submitted = _cursor_timestamp(submitted)
+                query = query.filter(db.or_(
+                    Feedback.SubmittedAt < submitted,
+                    db.and_(Feedback.SubmittedAt == submitted, Feedback.FeedbackID < feedback_id)
+                ))
+            feedbacks = query.order_by(*order).limit(limit + 1).all()
+            has_more = len(feedbacks) > limit
+            feedbacks = feedbacks[:limit]
+            last = feedbacks[-1] if feedbacks else None
+            pagination = {
+                'next_cursor': _encode_cursor(last.SubmittedAt, last.FeedbackID) if has_more else None
+            }
+
+        results = []
+        for fb in feedbacks:
+            results.append({
+                'FeedbackID': fb.FeedbackID,
+                'Email': fb.Email,
+                'PhoneNumber': fb.PhoneNumber,
+                'Subject': fb.Subject,
+                'Message': fb.Message,
+                'Status': fb.status.StatusName if fb.status else 'Unknown',
+                'SubmittedAt': fb.SubmittedAt.strftime('%Y-%m-%d %H:%M:%S')
+            })
+
+        # counts honour every filter except status, so the tabs stay meaningful
+        counts = _feedback_status_counts(_feedback_filters(request.args, with_status=False))
+
+        return jsonify({'feedbacks': results, 'counts': counts, **pagination}), 200
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'message': '❌ Failed to fetch feedbacks.', 'error': str(e)}), 500
+
 
-    return jsonify({'feedbacks': results}), 200
+# Bulk mark-as-read: {"FeedbackIDs": [..]} in one UPDATE (admin only)
+@routes.route('/admin/feedbacks/mark-read', methods=['POST'])
+@jwt_required()
+def mark_feedbacks_read():
+    current_user = get_jwt_identity()
+    if current_user['role'].lower() != 'admin':
+        return jsonify({'message': '❌ Access denied. Admins only!'}), 403
+
+    data = request.get_json(silent=True) or {}
+    ids = data.get('FeedbackIDs')
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) for i in ids):
+        return jsonify({'message': '❌ FeedbackIDs must be a non-empty list of IDs.'}), 400
+    if len(ids) > FEEDBACK_MAX_BULK_IDS:
+        return jsonify({'message': f'❌ At most {FEEDBACK_MAX_BULK_IDS} FeedbackIDs per request.'}), 400
+    ids = list(set(ids))
+
+    try:
+        read = FeedbackStatus.query.filter_by(StatusName='Read').first()
+        if not read:
+            return jsonify({'message': "❌ 'Read' feedback status is not configured."}), 500
+
+        updated = Feedback.query.filter(
+            Feedback.FeedbackID.in_(ids),
+            db.or_(Feedback.StatusID.is_(None), Feedback.StatusID != read.StatusID)
+        ).update({Feedback.StatusID: read.StatusID}, synchronize_session=False)
+        db.session.commit()
+
+        return jsonify({'message': f'✅ {updated} feedback(s) marked as read.', 'updated': updated}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        traceback.print_exc()
+        return jsonify({'message': '❌ Failed to update feedbacks.', 'error': str(e)}), 500
+
+
+# Outbound mail queue: counts by status + dead letters (admin only)
+@routes.route('/admin/mail-queue', methods=['GET'])
+@jwt_required()
+def view_mail_queue():
+    current_user = get_jwt_identity()
+    if current_user['role'].lower() != 'admin':
+        return jsonify({'message': '❌ Access denied. Admins only!'}), 403
+
+    try:
+        dead = OutboundEmail.query.filter_by(Status='dead')\
+            .order_by(OutboundEmail.CreatedAt.desc()).limit(100).all()
+
+        return jsonify({
+            'counts': mail_queue.status_counts(),
+            'dead_letters': [{
+                'EmailID': row.EmailID,
+                'Subject': row.Subject,
+                'Recipients': row.Recipients,
+                'Attempts': row.Attempts,
+                'LastError': row.LastError,
+                'CreatedAt': row.CreatedAt.strftime('%Y-%m-%d %H:%M:%S') if row.CreatedAt else None
+            } for row in dead]
+        }), 200
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'message': '❌ Failed to fetch mail queue.', 'error': str(e)}), 500
+
+
+# Put a dead-lettered email back on the queue (admin only)
+@routes.route('/admin/mail-queue/<int:email_id>/retry', methods=['POST'])
+@jwt_required()
+def retry_mail(email_id):
+    current_user = get_jwt_identity()
+    if current_user['role'].lower() != 'admin':
+        return jsonify({'message': '❌ Access denied. Admins only!'}), 403
+
+    try:
+        if not mail_queue.requeue(email_id):
+            return jsonify({'message': '❌ Email not found or not dead-lettered.'}), 404
+        return jsonify({'message': '✅ Email re-queued.'}), 200
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'message': '❌ Failed to re-queue email.', 'error': str(e)}), 500
+
+
+# Newsletter campaigns: list, create, start/resume, retry failures (admin only)
+@routes.route('/admin/newsletter/campaigns', methods=['GET'])
+@jwt_required()
+def list_newsletter_campaigns():
+    current_user = get_jwt_identity()
+    if current_user['role'].lower() != 'admin':
+        return jsonify({'message': '❌ Access denied. Admins only!'}), 403
+
+    try:
+        campaigns = NewsletterCampaign.query.order_by(NewsletterCampaign.CreatedAt.desc()).all()
+        return jsonify({
+            'subscribers': NewsletterSubscription.query.count(),
+            'campaigns': [newsletter.progress(c) for c in campaigns]
+        }), 200
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'message': '❌ Failed to fetch campaigns.', 'error': str(e)}), 500
+
+
+@routes.route('/admin/newsletter/campaigns', methods=['POST'])
+@jwt_required()
+def create_newsletter_campaign():
+    current_user = get_jwt_identity()
+    if current_user['role'].lower() != 'admin':
+        return jsonify({'message': '❌ Access denied. Admins only!'}), 403
+
+    data = request.get_json(silent=True) or {}
+    subject = (data.get('Subject') or '').strip()
+    body = (data.get('Body') or '').strip()
+    if not subject or not body:
+        return jsonify({'message': '❌ Subject and Body are required.'}), 400
+
+    try:
+        campaign = NewsletterCampaign(Subject=subject, Body=body, Html=data.get('Html'))
+        db.session.add(campaign)
+        db.session.commit()
+        return jsonify({
+            'message': '✅ Campaign created.',
+            'campaign': newsletter.progress(campaign)
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        traceback.print_exc()
+        return jsonify({'message': '❌ Failed to create campaign.', 'error': str(e)}), 500
+
+
+@routes.route('/admin/newsletter/campaigns/<int:campaign_id>', methods=['GET'])
+@jwt_required()
+def view_newsletter_campaign(campaign_id):
+    current_user = get_jwt_identity()
+    if current_user['role'].lower() != 'admin':
+        return jsonify({'message': '❌ Access denied. Admins only!'}), 403
+
+    campaign = NewsletterCampaign.query.get(campaign_id)
+    if not campaign:
+        return jsonify({'message': '❌ Campaign not found.'}), 404
+    return jsonify({'campaign': newsletter.progress(campaign)}), 200
+
+
+# Starts a draft campaign, or resumes an interrupted one from its cursor
+@routes.route('/admin/newsletter/campaigns/<int:campaign_id>/send', methods=['POST'])
+@jwt_required()
+def send_newsletter_campaign(campaign_id):
+    current_user = get_jwt_identity()
+    if current_user['role'].lower() != 'admin':
+        return jsonify({'message': '❌ Access denied. Admins only!'}), 403
+
+    campaign = NewsletterCampaign.query.get(campaign_id)
+    if not campaign:
+        return jsonify({'message': '❌ Campaign not found.'}), 404
+
+    if campaign.Status == 'completed':
+        return jsonify({'message': 'ℹ️ Campaign already completed. Use retry-failed to resend failures.'}), 409
+
+    try:
+        if not newsletter.start(campaign_id):
+            return jsonify({'message': 'ℹ️ Campaign is already sending.'}), 409
+        db.session.refresh(campaign)
+        return jsonify({
+            'message': '✅ Campaign sending started.',
+            'campaign': newsletter.progress(campaign)
+        }), 202
+
+    except Exception as e:
+        db.session.rollback()
+        traceback.print_exc()
+        return jsonify({'message': '❌ Failed to start campaign.', 'error': str(e)}), 500
+
+
+# Clears failed deliveries so the next /send retries those subscribers
+@routes.route('/admin/newsletter/campaigns/<int:campaign_id>/retry-failed', methods=['POST'])
+@jwt_required()
+def retry_newsletter_failures(campaign_id):
+    current_user = get_jwt_identity()
+    if current_user['role'].lower() != 'admin':
+        return jsonify({'message': '❌ Access denied. Admins only!'}), 403
+
+    if not NewsletterCampaign.query.get(campaign_id):
+        return jsonify({'message': '❌ Campaign not found.'}), 404
+
+    try:
+        count = newsletter.retry_failed(campaign_id)
+        return jsonify({'message': f'✅ {count} failed deliveries reset.', 'reset': count}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        traceback.print_exc()
+        return jsonify({'message': '❌ Failed to reset deliveries.', 'error': str(e)}), 500
 
 
 # Admin creating a route for creating mobile banking details
 @routes.route('/mobile-banking/create', methods=['POST'])
 @jwt_required()
+@invalidates('mobile_banking')
 def create_mobile_banking_info():
     try:
         current_user = get_jwt_identity()
@@ -528,6 +924,7 @@ def create_mobile_banking_info():
 
 # Route for viewing mobile banking information
 @routes.route('/mobile-banking', methods=['GET'])
+@cached_response('mobile_banking', ttl=3600)
 def view_mobile_banking_info():
     try:
         # Only fetch active entries (IsActiveID = 1)
@@ -554,6 +951,7 @@ def view_mobile_banking_info():
 
 @routes.route('/operation-hours/create', methods=['POST'])
 @jwt_required()
+@invalidates('operation_hours')
 def create_operation_hours():
     try:
         current_user = get_jwt_identity()
@@ -594,6 +992,7 @@ def create_operation_hours():
 
 # View operational Hours
 @routes.route('/operation-hours', methods=['GET'])
+@cached_response('operation_hours', ttl=3600)
 def get_operation_hours():
     try:
         timelines = OperationTimeline.query.order_by(
@@ -616,6 +1015,7 @@ def get_operation_hours():
 # Creating partners linking with the sacco
 @routes.route('/partnerships/create', methods=['POST'])
 @jwt_required()
+@invalidates('partnerships')
 def create_partnership():
     try:
         current_user = get_jwt_identity()
@@ -667,6 +1067,7 @@ def create_partnership():
 
 # Route for fetching active partners
 @routes.route('/partnerships', methods=['GET'])
+@cached_response('partnerships', ttl=3600)
 def get_partnerships():
     try:
         # Fetch partnerships that are marked as active (IsActiveID = 1)
@@ -692,42 +1093,164 @@ def get_partnerships():
 
 
 #Fetching the posts in the news page
+# List mode is keyset-paginated on (DatePosted, PostID) and, unless asked
+# for with ?fields=...,Content, leaves out the Content column; cards get a
+# short plain-text Excerpt and the full post comes from /news/posts/<id>.
+NEWS_PAGE_SIZE = 12
+NEWS_MAX_PAGE_SIZE = 50
+NEWS_EXCERPT_CHARS = 200
+NEWS_LIST_FIELDS = ('PostID', 'Title', 'Excerpt', 'CoverImage', 'DatePosted', 'Category')
+NEWS_ALLOWED_FIELDS = NEWS_LIST_FIELDS + ('Content',)
+
+_TAG_RE = re.compile(r'<[^>]*>')
+
+
+def _excerpt(html):
+    text = ' '.join(_TAG_RE.sub(' ', html or '').split())
+    if len(text) <= NEWS_EXCERPT_CHARS:
+        return text
+    return text[:NEWS_EXCERPT_CHARS].rsplit(' ', 1)[0] + '…'
+
+
+def _encode_cursor(timestamp, row_id):
+    """Opaque keyset cursor for (timestamp, id) ordered lists."""
+    raw = f"{timestamp.strftime('%Y-%m-%dT%H:%M:%S.%f')}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor):
+    """(timestamp, id) from an opaque cursor; ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        timestamp, row_id = raw.split('|')
+        return datetime.strptime(timestamp, '%Y-%m-%dT%H:%M:%S.%f'), int(row_id)
+    except Exception:
+        raise ValueError('invalid cursor')
+
+
+def _cursor_timestamp(value):
+    """
+    A cursor's timestamp as a SQL parameter comparable with a DATETIME
+    column. SQL Server sends a Python datetime as datetime2, which never
+    equals DATETIME values ending in .xx3/.xx7 ms, so ties on the
+    timestamp would be skipped between pages; CAST it to DATETIME there.
+    """
+    if db.session.get_bind().dialect.name == 'mssql':
+        return db.cast(value, db.DateTime)
+    return value
+
+
+def _post_fields():
+    """Requested projection (?fields=Title,CoverImage); PostID/DatePosted always kept for the cursor."""
+    requested = request.args.get('fields')
+    if not requested:
+        return NEWS_LIST_FIELDS
+    fields = [f.strip() for f in requested.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in NEWS_ALLOWED_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(['PostID', 'DatePosted'] + fields))
+
+
 @routes.route('/news/posts', methods=['GET'])
+@cached_response('posts', ttl=300, query_args=('category', 'cursor', 'limit', 'fields'))
 def get_posts():
     try:
+        try:
+            fields = _post_fields()
+            limit = min(max(int(request.args.get('limit', NEWS_PAGE_SIZE)), 1), NEWS_MAX_PAGE_SIZE)
+            cursor = request.args.get('cursor')
+            after = _decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return jsonify({'message': f'❌ {e}'}), 400
+
         # Get category from query parameters (e.g., ?category=Financial Reports)
         category_name = request.args.get('category')
-        
+
+        # Only the columns the response needs: never the Content Text column
+        # unless requested (the Excerpt reads just its first characters)
+        columns = [Posts.PostID, Posts.DatePosted]
+        if 'Title' in fields:
+            columns.append(Posts.Title)
+        if 'CoverImage' in fields:
+            columns.append(Posts.CoverImage)
+        if 'Category' in fields:
+            columns.append(PostsCategory.Category)
+        if 'Content' in fields:
+            columns.append(Posts.Content)
+        if 'Excerpt' in fields:
+            columns.append(db.func.substring(Posts.Content, 1, NEWS_EXCERPT_CHARS * 4).label('ExcerptSource'))
+
         # 1. Start query and join with Categories
-        query = Posts.query.join(PostsCategory)
-        
+        query = db.session.query(*columns).join(PostsCategory, Posts.PostsCategoryID == PostsCategory.PostsCategoryID)
+
         # 2. MANDATORY FILTER: Only fetch Categories 1 through 4
         # This explicitly excludes 'HeroImage' and any other high-ID categories
         query = query.filter(PostsCategory.PostsCategoryID.between(1, 4))
-        
+
         # 3. OPTIONAL FILTER: If user clicked a specific tab (e.g., 'Financial Reports')
         if category_name:
             query = query.filter(PostsCategory.Category == category_name)
-        
-        # 4. Order and execute
-        posts = query.order_by(Posts.DatePosted.desc()).all()
 
-        posts_data = [{
+        # 4. Keyset: rows strictly after the last one of the previous page
+        if after:
+            posted, post_id = after
+            posted = _cursor_timestamp(posted)
+            query = query.filter(db.or_(
+                Posts.DatePosted < posted,
+                db.and_(Posts.DatePosted == posted, Posts.PostID < post_id)
+            ))
+
+        # 5. Order and fetch one extra row to know whether another page exists
+        rows = query.order_by(Posts.DatePosted.desc(), Posts.PostID.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        posts_data = []
+        for row in rows:
+            item = {}
+            for field in fields:
+                if field == 'Excerpt':
+                    item['Excerpt'] = _excerpt(row.ExcerptSource)
+                elif field == 'DatePosted':
+                    item['DatePosted'] = row.DatePosted.strftime('%Y-%m-%d %H:%M:%S')
+                else:
+                    item[field] = getattr(row, field)
+            posts_data.append(item)
+
+        next_cursor = _encode_cursor(rows[-1].DatePosted, rows[-1].PostID) if has_more else None
+
+        return jsonify({'posts': posts_data, 'next_cursor': next_cursor}), 200
+
+    except Exception as e:
+        return jsonify({'message': '❌ Failed to fetch posts.', 'error': str(e)}), 500
+
+
+#Fetching a single post (full Content) for the news detail view
+@routes.route('/news/posts/<int:post_id>', methods=['GET'])
+@cached_response('posts', ttl=300)
+def get_post(post_id):
+    try:
+        p = Posts.query.options(joinedload(Posts.category)).get(post_id)
+        if not p:
+            return jsonify({'message': '❌ Post not found.'}), 404
+
+        return jsonify({'post': {
             'PostID': p.PostID,
             'Title': p.Title,
             'Content': p.Content,
             'CoverImage': p.CoverImage,
             'DatePosted': p.DatePosted.strftime('%Y-%m-%d %H:%M:%S'),
-            'Category': p.category.Category 
-        } for p in posts]
-
-        return jsonify({'posts': posts_data}), 200
+            'Category': p.category.Category
+        }}), 200
 
     except Exception as e:
-        return jsonify({'message': '❌ Failed to fetch posts.', 'error': str(e)}), 500
-    
+        return jsonify({'message': '❌ Failed to fetch post.', 'error': str(e)}), 500
+
+
 #Fetching the hero image in the News pages  
 @routes.route('/posts/hero', methods=['GET'])
+@cached_response('posts', ttl=300)
 def get_hero_posts():
     try:
         # Fetch the top 5 most recent posts in the 'HeroImage' category
@@ -749,6 +1272,7 @@ def get_hero_posts():
 # Route for creating the products offered by a sacco
 @routes.route('/products/create', methods=['POST'])
 @jwt_required()
+@invalidates('products', 'bootstrap_home')
 def create_product():
     try:
         # Authenticate user
@@ -788,26 +1312,30 @@ def create_product():
 # View products
 
 
+def _product_list_data():
+    # Fetch all products ordered by newest first
+    products = Product.query.order_by(Product.CreatedAt.desc()).all()
+
+    # Prepare list to return
+    product_list = []
+    for product in products:
+        product_list.append({
+            'ProductID': product.ProductID,
+            'ProductName': product.ProductName,
+            'Intro': product.Intro,
+            'Features': product.Features,
+            'Benefits': product.Benefits,
+            'ImageURL': product.ImageURL,
+            'CreatedAt': product.CreatedAt.strftime('%Y-%m-%d %H:%M:%S')
+        })
+    return product_list
+
+
 @routes.route('/products', methods=['GET'])
+@cached_response('products', ttl=3600)
 def view_products():
     try:
-        # Fetch all products ordered by newest first
-        products = Product.query.order_by(Product.CreatedAt.desc()).all()
-
-        # Prepare list to return
-        product_list = []
-        for product in products:
-            product_list.append({
-                'ProductID': product.ProductID,
-                'ProductName': product.ProductName,
-                'Intro': product.Intro,
-                'Features': product.Features,
-                'Benefits': product.Benefits,
-                'ImageURL': product.ImageURL,
-                'CreatedAt': product.CreatedAt.strftime('%Y-%m-%d %H:%M:%S')
-            })
-
-        return jsonify({'products': product_list}), 200
+        return jsonify({'products': _product_list_data()}), 200
 
     except Exception as e:
         import traceback
@@ -817,6 +1345,7 @@ def view_products():
 
 # Viewing a particular product
 @routes.route('/products/<int:product_id>', methods=['GET'])
+@cached_response('products', ttl=3600)
 def view_product(product_id):
     try:
         product = Product.query.get(product_id)
@@ -842,6 +1371,7 @@ def view_product(product_id):
 # Route for creating a sacco branch
 @routes.route('/branches/create', methods=['POST'])
 @jwt_required()
+@invalidates('branches')
 def create_branch():
     try:
         current_user = get_jwt_identity()
@@ -882,6 +1412,7 @@ def create_branch():
 
 
 @routes.route('/branches', methods=['GET'])
+@cached_response('branches', ttl=3600)
 def view_all_branches():
     try:
         branches = SaccoBranch.query.order_by(
@@ -909,6 +1440,7 @@ def view_all_branches():
 # Creating a sacco profile
 @routes.route('/sacco-profile/create', methods=['POST'])
 @jwt_required()
+@invalidates('sacco_profile', 'bootstrap_home')
 def create_sacco_profile():
     try:
         current_user = get_jwt_identity()
@@ -957,32 +1489,39 @@ def create_sacco_profile():
 # Viewing Sacco_Profile
 
 
+def _sacco_profile_data():
+    # Get the most recent SACCO profile (or the first one if only one exists)
+    sacco_profile = SaccoProfile.query.order_by(
+        SaccoProfile.SaccoID.desc()).first()
+
+    if not sacco_profile:
+        return None
+
+    return {
+        "SaccoName": sacco_profile.SaccoName,
+        "LogoURL": sacco_profile.LogoURL,
+        "Slogan": sacco_profile.Slogan,
+        "PhysicalAddress": sacco_profile.PhysicalAddress,
+        "ContactNumber": sacco_profile.ContactNumber,
+        "FacebookURL": sacco_profile.FacebookURL,
+        "TwitterURL": sacco_profile.TwitterURL,
+        "InstagramURL": sacco_profile.InstagramURL,
+        "LinkedInURL": sacco_profile.LinkedInURL,
+        "SaccoHistory": sacco_profile.SaccoHistory,
+        "MissionStatement": sacco_profile.MissionStatement,
+        "VisionStatement": sacco_profile.VisionStatement,
+
+    }
+
+
 @routes.route('/sacco-profile', methods=['GET'])
+@cached_response('sacco_profile', ttl=3600)
 def view_sacco_profile():
     try:
-        # Get the most recent SACCO profile (or the first one if only one exists)
-        sacco_profile = SaccoProfile.query.order_by(
-            SaccoProfile.SaccoID.desc()).first()
-
-        if not sacco_profile:
+        profile_data = _sacco_profile_data()
+        if not profile_data:
             return jsonify({'message': '❌ No SACCO profile found.'}), 404
 
-        profile_data = {
-            "SaccoName": sacco_profile.SaccoName,
-            "LogoURL": sacco_profile.LogoURL,
-            "Slogan": sacco_profile.Slogan,
-            "PhysicalAddress": sacco_profile.PhysicalAddress,
-            "ContactNumber": sacco_profile.ContactNumber,
-            "FacebookURL": sacco_profile.FacebookURL,
-            "TwitterURL": sacco_profile.TwitterURL,
-            "InstagramURL": sacco_profile.InstagramURL,
-            "LinkedInURL": sacco_profile.LinkedInURL,
-            "SaccoHistory": sacco_profile.SaccoHistory,
-            "MissionStatement": sacco_profile.MissionStatement,
-            "VisionStatement": sacco_profile.VisionStatement,
-
-        }
-
         return jsonify(profile_data), 200
 
     except Exception as e:
@@ -994,6 +1533,7 @@ def view_sacco_profile():
 # Create a service
 @routes.route('/services/create', methods=['POST'])
 @jwt_required()
+@invalidates('services')
 def create_service():
     try:
         current_user = get_jwt_identity()
@@ -1003,12 +1543,13 @@ def create_service():
             return jsonify({'message': '❌ Unauthorized. Admins only.'}), 403
 
         # Accept either form-data or JSON
+        data = request.get_json(silent=True) or {}
         service_name = request.form.get(
-            'ServiceName') or request.json.get('ServiceName')
+            'ServiceName') or data.get('ServiceName')
         description = request.form.get(
-            'Description') or request.json.get('Description')
+            'Description') or data.get('Description')
         image_file = request.files.get('ImageFile')  # if uploaded
-        image_url = request.form.get('ImageURL') or request.json.get(
+        image_url = request.form.get('ImageURL') or data.get(
             'ImageURL')  # if directly linked
 
         if not service_name or not description:
@@ -1017,22 +1558,24 @@ def create_service():
         if not image_file and not image_url:
             return jsonify({'message': '❌ Either ImageFile or ImageURL must be provided!'}), 400
 
-        # Upload file to cloudinary if it's sent
-        if image_file:
-            upload_result = cloudinary.uploader.upload(image_file)
-            final_image_url = upload_result['secure_url']
-        else:
-            final_image_url = image_url
-
         new_service = Service(
             ServiceName=service_name,
             Description=description,
-            ImageURL=final_image_url
+            ImageURL=None if image_file else image_url
         )
 
         db.session.add(new_service)
         db.session.commit()
 
+        # Upload file to cloudinary if it's sent; ImageURL is filled in
+        # by the upload worker
+        if image_file:
+            job = upload_jobs.submit(image_file, 'image', target=('Services', 'ImageURL'),
+                                     target_id=new_service.ServiceID)
+            if job.Status != 'done':
+                return jsonify({'message': '✅ Service created successfully! Image upload started.',
+                                'ServiceID': new_service.ServiceID, **_upload_accepted(job)}), 202
+
         return jsonify({'message': '✅ Service created successfully!'}), 201
 
     except Exception as e:
@@ -1044,6 +1587,7 @@ def create_service():
 
 
 @routes.route('/services', methods=['GET'])
+@cached_response('services', ttl=3600)
 def view_services():
     try:
         services = Service.query.order_by(Service.CreatedAt.desc()).all()
@@ -1073,6 +1617,7 @@ def view_services():
 # Creating sacco clients
 @routes.route('/clients/create', methods=['POST'])
 @jwt_required()
+@invalidates('clients', 'bootstrap_home')
 def create_client():
     try:
         current_user = get_jwt_identity()
@@ -1117,24 +1662,28 @@ def create_client():
 # Route for viewing the SACCO Clients
 
 
+def _client_list_data():
+    # Get only active clients (IsActiveID = 1)
+    clients = SaccoClient.query.filter_by(IsActiveID=1).order_by(
+        SaccoClient.CreatedAt.desc()).all()
+
+    client_list = []
+    for client in clients:
+        client_list.append({
+            'ClientID': client.ClientID,
+            'ClientName': client.ClientName,
+            'ClientStatistic': client.ClientStatistic,
+            'LogoURL': client.LogoURL,
+            'CreatedAt': client.CreatedAt.strftime('%Y-%m-%d %H:%M:%S')
+        })
+    return client_list
+
+
 @routes.route('/clients', methods=['GET'])
+@cached_response('clients', ttl=3600)
 def get_clients():
     try:
-        # Get only active clients (IsActiveID = 1)
-        clients = SaccoClient.query.filter_by(IsActiveID=1).order_by(
-            SaccoClient.CreatedAt.desc()).all()
-
-        client_list = []
-        for client in clients:
-            client_list.append({
-                'ClientID': client.ClientID,
-                'ClientName': client.ClientName,
-                'ClientStatistic': client.ClientStatistic,
-                'LogoURL': client.LogoURL,
-                'CreatedAt': client.CreatedAt.strftime('%Y-%m-%d %H:%M:%S')
-            })
-
-        return jsonify({'clients': client_list}), 200
+        return jsonify({'clients': _client_list_data()}), 200
 
     except Exception as e:
         import traceback
@@ -1146,6 +1695,7 @@ def get_clients():
 
 @routes.route('/statistics/create', methods=['POST'])
 @jwt_required()
+@invalidates('statistics', 'bootstrap_home')
 def create_statistics():
     try:
         current_user = get_jwt_identity()
@@ -1181,24 +1731,31 @@ def create_statistics():
 
 
 # Route for viewing the Statistics
+def _latest_statistics_data():
+    # Get the most recently created statistics entry
+    latest_stats = SaccoStatistics.query.order_by(
+        SaccoStatistics.LastUpdated.desc()).first()
+
+    if not latest_stats:
+        return None
+
+    return {
+        'ActiveMembers': latest_stats.ActiveMembers,
+        'MobileBankingUsers': latest_stats.MobileBankingUsers,
+        'BranchCount': latest_stats.BranchCount,
+        'YearsOfService': latest_stats.YearsOfService,
+        'LastUpdated': latest_stats.LastUpdated.strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
 @routes.route('/statistics', methods=['GET'])
+@cached_response('statistics', ttl=3600)
 def get_latest_statistics():
     try:
-        # Get the most recently created statistics entry
-        latest_stats = SaccoStatistics.query.order_by(
-            SaccoStatistics.LastUpdated.desc()).first()
-
-        if not latest_stats:
+        stats_data = _latest_statistics_data()
+        if not stats_data:
             return jsonify({'message': 'ℹ️ No statistics found.'}), 404
 
-        stats_data = {
-            'ActiveMembers': latest_stats.ActiveMembers,
-            'MobileBankingUsers': latest_stats.MobileBankingUsers,
-            'BranchCount': latest_stats.BranchCount,
-            'YearsOfService': latest_stats.YearsOfService,
-            'LastUpdated': latest_stats.LastUpdated.strftime('%Y-%m-%d %H:%M:%S')
-        }
-
         return jsonify({'statistics': stats_data}), 200
 
     except Exception as e:
@@ -1211,6 +1768,7 @@ def get_latest_statistics():
 
 @routes.route('/slider/create', methods=['POST'])
 @jwt_required()
+@invalidates('slider', 'bootstrap_home')
 def create_homepage_slider():
     try:
         # ✅ Authenticate admin
@@ -1252,33 +1810,38 @@ def create_homepage_slider():
         }), 500
 
 
+def _homepage_slider_data():
+    # Define specific IDs in custom order
+    ordered_ids = [1, 3, 2, 4]
+
+    # Query for only the selected IDs
+    sliders = HomepageSlider.query.filter(
+        HomepageSlider.ImageID.in_(ordered_ids),
+        HomepageSlider.IsActiveID == 1
+    ).all()
+
+    # Maintain custom order
+    slider_dict = {slide.ImageID: slide for slide in sliders}
+    slider_list = []
+    for id in ordered_ids:
+        if id in slider_dict:
+            slide = slider_dict[id]
+            slider_list.append({
+                'Title': slide.Title,
+                'Description': slide.Description,
+                'ImagePath': slide.ImagePath,
+                'srcset': srcset(slide.ImagePath, HERO),
+                'Timestamp': slide.Timestamp.strftime('%Y-%m-%d %H:%M:%S')
+            })
+    return slider_list
+
+
 # Viewing selected homepage sliders (ImageID 1, 3, 2, 4 in that order)
 @routes.route('/slider/view', methods=['GET'])
+@cached_response('slider', ttl=3600)
 def view_homepage_sliders():
     try:
-        # Define specific IDs in custom order
-        ordered_ids = [1, 3, 2, 4]
-
-        # Query for only the selected IDs
-        sliders = HomepageSlider.query.filter(
-            HomepageSlider.ImageID.in_(ordered_ids),
-            HomepageSlider.IsActiveID == 1
-        ).all()
-
-        # Maintain custom order
-        slider_dict = {slide.ImageID: slide for slide in sliders}
-        slider_list = []
-        for id in ordered_ids:
-            if id in slider_dict:
-                slide = slider_dict[id]
-                slider_list.append({
-                    'Title': slide.Title,
-                    'Description': slide.Description,
-                    'ImagePath': slide.ImagePath,
-                    'Timestamp': slide.Timestamp.strftime('%Y-%m-%d %H:%M:%S')
-                })
-
-        return jsonify({'sliders': slider_list}), 200
+        return jsonify({'sliders': _homepage_slider_data()}), 200
 
     except Exception as e:
         return jsonify({'message': '❌ Failed to fetch sliders.', 'error': str(e)}), 500
@@ -1363,7 +1926,7 @@ def register_membership():
         db.session.add(member)
         db.session.commit()
 
-        # ===== EMAIL NOTIFICATIONS =====
+        # ===== EMAIL NOTIFICATIONS (queued) =====
         email_errors = None
         try:
             # Notify admin
@@ -1386,7 +1949,7 @@ Next step: Await KES 1,500 registration payment confirmation (M-PESA Paybill 506
 """
             )
             if mail:
-                mail.send(admin_msg)
+                mail_queue.enqueue(admin_msg)
 
             # Acknowledge applicant (only if email provided)
             if member.Email:
@@ -1411,7 +1974,7 @@ MUFA​TE G SACCO Team
 """
                 )
                 if mail:
-                    mail.send(user_msg)
+                    mail_queue.enqueue(user_msg)
 
         except Exception as e:
             traceback.print_exc()
@@ -1444,6 +2007,7 @@ MUFA​TE G SACCO Team
 
 
 @routes.route('/bod/view', methods=['GET'])
+@cached_response('bod', ttl=3600)
 def view_bod():
     bod_list = BOD.query.all()
     result = [
@@ -1451,7 +2015,8 @@ def view_bod():
             "BODID": member.BODID,
             "Name": member.Name,
             "Designation": member.Designation,
-            "ImageURL": member.ImageURL
+            "ImageURL": member.ImageURL,
+            "srcset": srcset(member.ImageURL, PORTRAIT)
         }
         for member in bod_list
     ]
@@ -1461,6 +2026,7 @@ def view_bod():
 
 
 @routes.route('/management/view', methods=['GET'])
+@cached_response('management', ttl=3600)
 def view_management():
     management_list = Management.query.all()
     result = [
@@ -1468,7 +2034,8 @@ def view_management():
             "MGTID": member.MGTID,
             "MGTName": member.MGTName,
             "Designation": member.Designation,
-            "ImageURL": member.ImageURL
+            "ImageURL": member.ImageURL,
+            "srcset": srcset(member.ImageURL, PORTRAIT)
         }
         for member in management_list
     ]
@@ -1477,6 +2044,7 @@ def view_management():
 
 # view active resources (recent first)
 @routes.route('/resources/recent', methods=['GET'])
+@cached_response('resources', ttl=300)
 def get_recent_resources():
     try:
         resources = (
@@ -1509,6 +2077,7 @@ def get_recent_resources():
 
 # Route to fetch career hero image
 @routes.route('/career-hero', methods=['GET'])
+@cached_response('slider', ttl=3600)
 def get_career_hero_image():
     try:
         # Query the image with ImageID = 6
@@ -1535,6 +2104,7 @@ def get_career_hero_image():
 
 # Route to fetch second career hero image (ImageID = 7)
 @routes.route('/career-hero-2', methods=['GET'])
+@cached_response('slider', ttl=3600)
 def get_career_hero_image_2():
     try:
         # Query the image with ImageID = 7
@@ -1564,9 +2134,7 @@ def get_career_hero_image_2():
 # Return the holiday
 
 
-@routes.route('/holiday/message', methods=['GET'])
-def get_holiday_message():
-    from datetime import datetime
+def _holiday_message_data():
     today = datetime.today()
     holiday = HolidayMessage.query.filter_by(
         Month=today.month,
@@ -1575,12 +2143,41 @@ def get_holiday_message():
     ).first()
 
     if holiday:
-        return jsonify({
+        return {
             'holiday': holiday.HolidayName,
             'message': holiday.Message
+        }
+    return {'message': None}
+
+
+@routes.route('/holiday/message', methods=['GET'])
+def get_holiday_message():
+    return jsonify(_holiday_message_data()), 200
+
+
+# ✅ Homepage bootstrap: everything above the fold in one request
+@routes.route('/bootstrap/home', methods=['GET'])
+@cached_response('bootstrap_home', ttl=600, vary=lambda: date.today().isoformat())
+def bootstrap_home():
+    """
+    Composite of /sacco-profile, /slider/view, /statistics, /products,
+    /clients and /holiday/message. All reads share the request's session
+    (one pooled connection); the document is cached per day because the
+    holiday banner depends on today's date.
+    """
+    try:
+        return jsonify({
+            'sacco_profile': _sacco_profile_data(),
+            'sliders': _homepage_slider_data(),
+            'statistics': _latest_statistics_data(),
+            'products': _product_list_data(),
+            'clients': _client_list_data(),
+            'holiday': _holiday_message_data(),
         }), 200
-    else:
-        return jsonify({'message': None}), 200
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'message': '❌ Failed to load homepage data.', 'error': str(e)}), 500
 
 #  ✅ Public route to submit feedback
 
@@ -1629,16 +2226,16 @@ def submit_feedback():
             body=f"Dear Member,\n\nWe have successfully received your message regarding: \"{subject}\".\n\nWarm regards,\nGolden Generation DT SACCO"
         )
 
-        # 4️⃣ SAFE SEND LOGIC
-        # We wrap this in a separate try-except so a slow mail server 
-        # doesn't trigger a 502 Bad Gateway for the user.
+        # 4️⃣ QUEUE FOR BACKGROUND SEND
+        # The mail queue worker talks to SMTP, so a slow mail server
+        # no longer holds this request (see services/mail_queue.py).
         if mail:
             try:
-                mail.send(admin_msg)
-                mail.send(user_msg)
+                mail_queue.enqueue(admin_msg)
+                mail_queue.enqueue(user_msg)
             except Exception as email_err:
-                # Log the error to Render console so you can debug Safaricom SMTP
-                print(f"📧 SMTP Error (Non-critical): {email_err}")
+                # Log the error to Render console so you can debug the queue
+                print(f"📧 Mail queue error (Non-critical): {email_err}")
                 # We do NOT return an error here; the DB save was already successful.
 
         # 5️⃣ Return success response
@@ -1660,6 +2257,7 @@ def submit_feedback():
 
 # ✅Route to fetch active gallery photos
 @routes.route('/gallery', methods=['GET'])
+@cached_response('gallery', ttl=300, query_args=('page', 'per_page'))
 def get_gallery_photos():
     try:
         # 1. Get pagination parameters from the URL 
@@ -1681,6 +2279,7 @@ def get_gallery_photos():
                 'Title': photo.Title,
                 'Description': photo.Description,
                 'ImageURL': photo.ImageURL,
+                'srcset': srcset(photo.ImageURL),
                 'UploadedAt': photo.UploadedAt.strftime('%Y-%m-%d %H:%M:%S')
             })
 
@@ -1766,26 +2365,10 @@ def _round_unit(x, unit):
     return round(float(x) / unit) * unit
 
 
-def _product_to_dict(p: LoanProduct):
-    return {
-        "ProductKey": p.ProductKey,
-        "LoanName": p.LoanName,
-        "InterestType": p.InterestType,
-        "MonthlyInterestRate": float(p.MonthlyInterestRate),
-        "DefaultTermMonths": p.DefaultTermMonths,
-        "MinTermMonths": p.MinTermMonths,
-        "MaxTermMonths": p.MaxTermMonths,
-        "MinPrincipal": float(p.MinPrincipal) if p.MinPrincipal is not None else None,
-        "MaxPrincipal": float(p.MaxPrincipal) if p.MaxPrincipal is not None else None,
-        "RepaymentPeriod": p.RepaymentPeriod,
-        "FirstDueRule": p.FirstDueRule,
-        "HolidayRule": p.HolidayRule,
-        "RoundingUnit": float(p.RoundingUnit),
-        "MaximumGuarantors": p.MaximumGuarantors,
-        "IsActive": bool(p.IsActive),
-    }
-
 # ---- schedules (reducing-balance engines) ----
+# Row-by-row reference engines. /loan/calc now uses services.loan_engine
+# (or services.loan_cents, LOAN_ENGINE=cents); these stay as the
+# reference output.
 
 
 def _schedule_equal_principal(P, r_m, n, start_date, unit, first_due_rule, holiday_rule):
@@ -1858,10 +2441,9 @@ def _schedule_emi(P, r_m, n, start_date, unit, first_due_rule, holiday_rule):
 @routes.route('/loan/products', methods=['GET'])
 def loan_list_products():
     try:
-        items = LoanProduct.query.filter_by(IsActive=True)\
-                                 .order_by(LoanProduct.LoanName.asc())\
-                                 .all()
-        return jsonify({"items": [_product_to_dict(p) for p in items]}), 200
+        # served from the in-process catalogue (services/loan_catalogue.py)
+        items = loan_catalogue.active_products()
+        return jsonify({"items": [p.to_dict() for p in items]}), 200
     except Exception as e:
         traceback.print_exc()
         return jsonify({"message": "❌ Failed to list products.", "error": str(e)}), 500
@@ -1872,21 +2454,110 @@ def loan_list_products():
 @routes.route('/loan/products/<product_key>', methods=['GET'])
 def loan_get_product(product_key):
     try:
-        p = LoanProduct.query.filter_by(
-            ProductKey=product_key, IsActive=True).first()
+        p = loan_catalogue.get_product(product_key)
         if not p:
             return jsonify({"message": "❌ Product not found or inactive."}), 404
-        return jsonify(_product_to_dict(p)), 200
+        return jsonify(p.to_dict()), 200
     except Exception as e:
         traceback.print_exc()
         return jsonify({"message": "❌ Failed to fetch product.", "error": str(e)}), 500
 
+# Shared validation + calculation for /loan/calc and /loan/calc/batch
+
+
+def _calc_for_product(p, principal, start, term_override, with_schedule=True):
+    """
+    Validate one (product, principal, term) request and compute it.
+    Returns (payload, None) on success or (None, error_message).
+    """
+    # numpy-backed engines, imported on the first calculation (APP_LAZY_INIT):
+    # LOAN_ENGINE (env) numpy (default, services/loan_engine.py) | cents
+    # (services/loan_cents.py: exact ties, see its header before switching)
+    if os.getenv("LOAN_ENGINE", "numpy").lower() == "cents":
+        from services.loan_cents import build_schedule, build_summary
+    else:
+        from services.loan_engine import build_schedule, build_summary
+    from services.due_dates import public_holidays
+    from services import loan_tables
+
+    if principal <= 0:
+        return None, "❌ 'principal' must be > 0."
+
+    # Principal bounds
+    if p.MinPrincipal is not None and principal < float(p.MinPrincipal):
+        return None, f"❌ Principal below minimum ({float(p.MinPrincipal):,.2f})."
+    if p.MaxPrincipal is not None and principal > float(p.MaxPrincipal):
+        return None, f"❌ Principal exceeds maximum ({float(p.MaxPrincipal):,.2f})."
+
+    # Term
+    n = int(term_override) if term_override else int(
+        p.DefaultTermMonths or 0)
+    if n <= 0:
+        return None, "❌ 'term_months' must be > 0."
+    if p.MinTermMonths is not None and n < int(p.MinTermMonths):
+        return None, f"❌ term_months below minimum ({p.MinTermMonths})."
+    if p.MaxTermMonths is not None and n > int(p.MaxTermMonths):
+        return None, f"❌ term_months exceeds maximum ({p.MaxTermMonths})."
+
+    # Rate & method
+    r = float(p.MonthlyInterestRate)          # monthly nominal
+    method = (p.InterestType or "equal_principal").lower()
+    unit = float(p.RoundingUnit or 1)
+    first_due_rule = (p.FirstDueRule or "same_day_next_month").lower()
+    holiday_rule = (p.HolidayRule or "next_business_day").lower()
+
+    # Build schedule (integer-cents or vectorised float engine, see above)
+    if with_schedule:
+        rows, total_p, total_i = build_schedule(
+            method, principal, r, n, start, unit, first_due_rule, holiday_rule,
+            public_holidays())
+        first_total = rows[0]["total"] if rows else 0
+        first_interest = rows[0]["interest"] if rows else 0
+    else:
+        rows = None
+        # per-product payment factors scaled by the principal (services/loan_tables.py)
+        first_total, first_interest, total_p, total_i = (
+            loan_tables.summary(p, principal, n) or build_summary(method, principal, r, n))
+        first_total = _round_unit(first_total, unit)
+        first_interest = _round_unit(first_interest, unit)
+
+    if method == "emi":
+        emi_value = first_total
+        monthly_principal = None
+    else:
+        # default to constant-principal reducing balance (your CBS style)
+        emi_value = None
+        monthly_principal = _round_unit(principal / n, unit)
+
+    summary = {
+        "ProductKey": p.ProductKey,
+        "LoanName": p.LoanName,
+        "Method": method,
+        "MonthlyInterestRate": r,
+        "TermMonths": n,
+        "Principal": _round_unit(principal, unit),
+        "MonthlyPrincipal": monthly_principal,
+        "EMI": emi_value,
+        "FirstMonthInterest": first_interest,
+        "TotalInterest": _round_unit(total_i, unit),
+        "TotalPrincipal": _round_unit(total_p, unit),
+        "TotalPayable": _round_unit(total_p + total_i, unit)
+    }
+
+    payload = {"summary": summary}
+    if with_schedule:
+        payload["schedule"] = rows
+    return payload, None
+
 # Calculate repayment schedule (reducing balance)
 
 
 @routes.route('/loan/calc', methods=['POST'])
 def loan_calc_schedule():
-
+    """
+    Body: {"product_key", "principal", "term_months"?, "start_date"?,
+           "summary_only"?}   # summary_only: true skips the schedule rows
+    """
     try:
         data = request.get_json(force=True)
 
@@ -1894,76 +2565,93 @@ def loan_calc_schedule():
         principal = float(data.get("principal", 0))
         start = _parse_date(data.get("start_date"))
         term_override = data.get("term_months")
+        summary_only = data.get("summary_only") is True
 
         if not product_key:
             return jsonify({"message": "❌ 'product_key' is required."}), 400
         if principal <= 0:
             return jsonify({"message": "❌ 'principal' must be > 0."}), 400
 
-        # Load product
-        p = LoanProduct.query.filter_by(
-            ProductKey=product_key, IsActive=True).first()
+        # Load product (cached, pre-converted snapshot)
+        p = loan_catalogue.get_product(product_key)
         if not p:
             return jsonify({"message": "❌ Product not found or inactive."}), 404
 
-        # Principal bounds
-        if p.MinPrincipal is not None and principal < float(p.MinPrincipal):
-            return jsonify({"message": f"❌ Principal below minimum ({float(p.MinPrincipal):,.2f})."}), 400
-        if p.MaxPrincipal is not None and principal > float(p.MaxPrincipal):
-            return jsonify({"message": f"❌ Principal exceeds maximum ({float(p.MaxPrincipal):,.2f})."}), 400
-
-        # Term
-        n = int(term_override) if term_override else int(
-            p.DefaultTermMonths or 0)
-        if n <= 0:
-            return jsonify({"message": "❌ 'term_months' must be > 0."}), 400
-        if p.MinTermMonths is not None and n < int(p.MinTermMonths):
-            return jsonify({"message": f"❌ term_months below minimum ({p.MinTermMonths})."}), 400
-        if p.MaxTermMonths is not None and n > int(p.MaxTermMonths):
-            return jsonify({"message": f"❌ term_months exceeds maximum ({p.MaxTermMonths})."}), 400
-
-        # Rate & method
-        r = float(p.MonthlyInterestRate)          # monthly nominal
-        method = (p.InterestType or "equal_principal").lower()
-        unit = float(p.RoundingUnit or 1)
-        first_due_rule = (p.FirstDueRule or "same_day_next_month").lower()
-        holiday_rule = (p.HolidayRule or "next_business_day").lower()
-
-        # Build schedule
-        if method == "emi":
-            rows, total_p, total_i = _schedule_emi(
-                principal, r, n, start, unit, first_due_rule, holiday_rule)
-            emi_value = rows[0]["total"] if rows else 0
-            monthly_principal = None
-        else:
-            # default to constant-principal reducing balance (your CBS style)
-            rows, total_p, total_i = _schedule_equal_principal(
-                principal, r, n, start, unit, first_due_rule, holiday_rule)
-            emi_value = None
-            monthly_principal = _round_unit(principal / n, unit)
-
-        summary = {
-            "ProductKey": p.ProductKey,
-            "LoanName": p.LoanName,
-            "Method": method,
-            "MonthlyInterestRate": r,
-            "TermMonths": n,
-            "Principal": _round_unit(principal, unit),
-            "MonthlyPrincipal": monthly_principal,
-            "EMI": emi_value,
-            "FirstMonthInterest": rows[0]["interest"] if rows else 0,
-            "TotalInterest": _round_unit(total_i, unit),
-            "TotalPrincipal": _round_unit(total_p, unit),
-            "TotalPayable": _round_unit(total_p + total_i, unit)
-        }
+        payload, error = _calc_for_product(
+            p, principal, start, term_override, with_schedule=not summary_only)
+        if error:
+            return jsonify({"message": error}), 400
 
-        return jsonify({"summary": summary, "schedule": rows}), 200
+        return jsonify(payload), 200
 
     except Exception as e:
         traceback.print_exc()
         return jsonify({"message": "❌ Failed to calculate schedule.", "error": str(e)}), 500
 
 
+# Calculate many scenarios in one request (comparison grids, slider previews)
+MAX_BATCH_SCENARIOS = 200
+
+
+@routes.route('/loan/calc/batch', methods=['POST'])
+def loan_calc_batch():
+    """
+    Body:
+      {
+        "scenarios": [{"product_key", "principal", "term_months"?, "start_date"?}, ...],
+        "summary_only": true      # default; false adds each full schedule
+      }
+    Products come from the in-process catalogue. Bad scenarios get an "error" entry
+    instead of failing the whole batch.
+    """
+    try:
+        data = request.get_json(force=True) or {}
+        scenarios = data.get("scenarios")
+        summary_only = data.get("summary_only", True) is not False
+
+        if not isinstance(scenarios, list) or not scenarios:
+            return jsonify({"message": "❌ 'scenarios' must be a non-empty list."}), 400
+        if len(scenarios) > MAX_BATCH_SCENARIOS:
+            return jsonify({"message": f"❌ At most {MAX_BATCH_SCENARIOS} scenarios per request."}), 400
+
+
+        results = []
+        for i, s in enumerate(scenarios):
+            if not isinstance(s, dict):
+                results.append({"index": i, "error": "❌ Scenario must be an object."})
+                continue
+
+            product_key = (s.get("product_key") or "").strip()
+            if not product_key:
+                results.append({"index": i, "error": "❌ 'product_key' is required."})
+                continue
+            p = loan_catalogue.get_product(product_key)
+            if not p:
+                results.append({"index": i, "error": "❌ Product not found or inactive."})
+                continue
+
+            try:
+                principal = float(s.get("principal", 0))
+                start = _parse_date(s.get("start_date"))
+                term_override = int(s["term_months"]) if s.get("term_months") else None
+            except (TypeError, ValueError):
+                results.append({"index": i, "error": "❌ Invalid principal, term_months or start_date."})
+                continue
+
+            payload, error = _calc_for_product(
+                p, principal, start, term_override, with_schedule=not summary_only)
+            if error:
+                results.append({"index": i, "error": error})
+            else:
+                results.append({"index": i, **payload})
+
+        return jsonify({"count": len(results), "results": results}), 200
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"message": "❌ Failed to calculate scenarios.", "error": str(e)}), 500
+
+
 # =========================
 # SUPPORT TICKET ROUTES
 # =========================
@@ -2055,12 +2743,12 @@ MUFATE G SACCO Support Team
 maderumoyia@mudetesacco.co.ke"""
             )
 
-        # ✅ Try sending emails
+        # ✅ Queue emails (sent in the background)
         try:
             if mail:
-                mail.send(admin_msg)
+                mail_queue.enqueue(admin_msg)
                 if user_msg:
-                    mail.send(user_msg)
+                    mail_queue.enqueue(user_msg)
         except Exception as email_error:
             traceback.print_exc()
             return jsonify({
@@ -2119,7 +2807,7 @@ Subscription Date: {new_sub.SubscribedAt.strftime('%Y-%m-%d %H:%M:%S')}
             )
 
             if mail:
-                mail.send(admin_msg)
+                mail_queue.enqueue(admin_msg)
 
                 # send acknowledgement only if email
                 if "@" in contact:
@@ -2138,7 +2826,7 @@ Warm regards,
 Golden Generation DT SACCO
 """
                     )
-                    mail.send(user_msg)
+                    mail_queue.enqueue(user_msg)
 
         except Exception as email_error:
             # ✅ Subscription already saved; email failed only
@@ -2165,6 +2853,7 @@ Golden Generation DT SACCO
 
 # ✅ Public Route to View All Active SaccoVideos
 @routes.route('/videos', methods=['GET'])
+@cached_response('videos', ttl=300)
 def view_videos():
     try:
        
@@ -2211,6 +2900,7 @@ def view_videos():
 #routes for fetching asset-financing 
 
 @routes.route('/asset-financing', methods=['GET'])
+@cached_response('asset_financing', ttl=300)
 def get_asset_financing():
    
     try:
@@ -0,0 +1,97 @@
+# =========================
+# DATABASE ENGINE OPTIONS
+# =========================
+# Pool settings for the SQL Server (pyodbc) engine, read from the env so
+# each deployment can size them to its gunicorn workers. Every worker
+# process has its own pool, so the server sees up to
+# workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+#
+# Env:
+#   DB_POOL_SIZE          connections kept open per process (default 5)
+#   DB_MAX_OVERFLOW       extra connections under burst (default 5)
+#   DB_POOL_TIMEOUT       seconds to wait for a free connection (default 30)
+#   DB_POOL_RECYCLE       reconnect connections older than this, in seconds,
+#                         before the hosted server's idle cut-off (default 280)
+#   DB_POOL_PRE_PING      "True" tests a connection before handing it out
+#   DB_CONNECT_TIMEOUT    login timeout in seconds (default 15)
+#   DB_FAST_EXECUTEMANY   "True" batches executemany on pyodbc (default True)
+#   DB_WARMUP_CONNECTIONS connections opened at startup (default 1, 0 = off)
+
+import os
+import time
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+
+def _flag(name, default):
+    return os.getenv(name, default) == "True"
+
+
+def engine_options(database_url):
+    """SQLALCHEMY_ENGINE_OPTIONS for database_url (None -> no options)."""
+    if not database_url:
+        return {}
+
+    url = make_url(database_url)
+    options = {
+        "pool_pre_ping": _flag("DB_POOL_PRE_PING", "True"),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "280")),
+    }
+    connect_timeout = int(os.getenv("DB_CONNECT_TIMEOUT", "15"))
+
+    if url.get_backend_name() == "sqlite":
+        # local/bench databases: default SQLite pool, no server to time out
+        return options
+
+    options.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "5")),
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
+    )
+
+    if url.get_backend_name() == "mssql" and url.get_driver_name() == "pyodbc":
+        options["fast_executemany"] = _flag("DB_FAST_EXECUTEMANY", "True")
+        options["connect_args"] = {"timeout": connect_timeout}
+    elif url.get_backend_name() == "mysql":
+        options["connect_args"] = {"connect_timeout": connect_timeout}
+
+    return options
+
+
+def warm_up(app, connections=None):
+    """
+    Open `connections` pooled connections (SELECT 1 on each) and return
+    them to the pool, so the first requests don't pay for TCP + TLS +
+    login. Failures are logged, not raised: the app still starts and
+    connects lazily.
+    """
+    if connections is None:
+        connections = int(os.getenv("DB_WARMUP_CONNECTIONS", "1"))
+    if connections <= 0 or not app.config.get("SQLALCHEMY_DATABASE_URI"):
+        return 0
+
+    from models.models import db
+
+    started = time.perf_counter()
+    opened = []
+    try:
+        with app.app_context():
+            engine = db.engine
+            # connections past pool_size would be closed again on return
+            if hasattr(engine.pool, "size"):
+                connections = min(connections, engine.pool.size())
+            for _ in range(connections):
+                conn = engine.connect()
+                opened.append(conn)
+                conn.execute(text("SELECT 1"))
+    except Exception as e:
+        print(f"⚠️ Database warm-up failed after {len(opened)} connection(s): {e}")
+    finally:
+        for conn in opened:
+            conn.close()            # back to the pool, still logged in
+
+    if opened:
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"🔌 Database pool warmed: {len(opened)} connection(s) in {elapsed:.0f} ms")
+    return len(opened)
@@ -0,0 +1,136 @@
+# =========================
+# DUE-DATE CALENDAR
+# =========================
+# Whole due-date sequences for loan schedules, memoised on
+# (start_date, n, first_due_rule, holiday_rule, holidays). Calculator
+# traffic shares a small set of start dates and product rules, so most
+# requests are a dictionary hit.
+#
+# Business-day rules skip weekends and the active rows of PublicHoliday
+# (recurring rows repeat every year on their month/day). The holiday set
+# is cached like the loan catalogue: PUBLIC_HOLIDAY_TTL seconds (env,
+# default 3600) or until this process writes a PublicHoliday.
+
+import os
+import threading
+import time
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.models import db, PublicHoliday
+
+HOLIDAY_TTL = float(os.getenv("PUBLIC_HOLIDAY_TTL", "3600"))
+DUE_DATE_CACHE_SIZE = int(os.getenv("DUE_DATE_CACHE_SIZE", "4096"))
+
+# numpy weekday: 1970-01-01 was a Thursday -> (days + 3) % 7 gives Mon=0..Sun=6
+_EPOCH_WEEKDAY_OFFSET = 3
+
+NO_HOLIDAYS = (frozenset(), frozenset())   # (fixed dates, recurring (month, day))
+
+
+# ---- public holidays ----
+
+_lock = threading.RLock()
+_version = 0
+_state = {"version": -1, "loaded_at": 0.0, "holidays": NO_HOLIDAYS}
+
+
+def bump_version():
+    """Invalidate the holiday set (called on every PublicHoliday write)."""
+    global _version
+    with _lock:
+        _version += 1
+
+
+def public_holidays():
+    """
+    Active public holidays as a hashable (fixed_dates, recurring_month_days)
+    pair, suitable as part of the due-date cache key.
+    """
+    if (_state["version"] == _version
+            and time.monotonic() - _state["loaded_at"] < HOLIDAY_TTL):
+        return _state["holidays"]
+
+    with _lock:
+        version = _version
+        try:
+            rows = PublicHoliday.query.filter_by(IsActive=True).all()
+        except SQLAlchemyError as e:
+            # Table not created yet on this database: weekends only
+            db.session.rollback()
+            print(f"⚠️ PublicHolidays unavailable, using weekends only: {e}")
+            rows = []
+        fixed = frozenset(h.HolidayDate for h in rows if not h.IsRecurring)
+        recurring = frozenset(
+            (h.HolidayDate.month, h.HolidayDate.day) for h in rows if h.IsRecurring)
+        _state.update(version=version, loaded_at=time.monotonic(),
+                      holidays=(fixed, recurring))
+        return _state["holidays"]
+
+
+@event.listens_for(PublicHoliday, "after_insert")
+@event.listens_for(PublicHoliday, "after_update")
+@event.listens_for(PublicHoliday, "after_delete")
+def _public_holiday_changed(mapper, connection, target):
+    bump_version()
+
+
+def _holiday_array(holidays, first_year, last_year):
+    fixed, recurring = holidays
+    days = [d for d in fixed if first_year <= d.year <= last_year]
+    for year in range(first_year, last_year + 1):
+        for month, day in recurring:
+            try:
+                days.append(date(year, month, day))
+            except ValueError:     # 29 Feb in a non-leap year
+                continue
+    return np.array(days, dtype="datetime64[D]")
+
+
+# ---- due dates ----
+
+def due_date_array(start_date, n, first_due_rule="same_day_next_month",
+                   holiday_rule="next_business_day", holidays=NO_HOLIDAYS):
+    """
+    Due dates for periods 1..n as a datetime64[D] array.
+    Same rules as routes._add_months + _adjust_business_day, plus holidays.
+    """
+    start_month = np.datetime64(start_date, "M")
+    months = start_month + np.arange(1, n + 1)
+    month_start = months.astype("datetime64[D]")
+    next_month_start = (months + 1).astype("datetime64[D]")
+    days_in_month = (next_month_start - month_start).astype(np.int64)
+
+    if first_due_rule == "end_of_month":
+        due = next_month_start - 1
+    else:
+        day = np.minimum(start_date.day, days_in_month)
+        due = month_start + (day - 1)
+
+    if holiday_rule not in ("next_business_day", "previous_business_day"):
+        return due
+
+    step = 1 if holiday_rule == "next_business_day" else -1
+    # every year the schedule touches, +1 for a December roll-over
+    closed = _holiday_array(holidays, start_date.year, start_date.year + n // 12 + 2)
+    while True:
+        wd = (due.astype(np.int64) + _EPOCH_WEEKDAY_OFFSET) % 7
+        shut = wd >= 5
+        if closed.size:
+            shut |= np.isin(due, closed)
+        if not shut.any():
+            return due
+        due = due + np.where(shut, step, 0)
+
+
+@lru_cache(maxsize=DUE_DATE_CACHE_SIZE)
+def due_dates(start_date, n, first_due_rule="same_day_next_month",
+              holiday_rule="next_business_day", holidays=NO_HOLIDAYS):
+    """Memoised ISO due-date strings for periods 1..n (a tuple)."""
+    arr = due_date_array(start_date, n, first_due_rule, holiday_rule, holidays)
+    return tuple(np.datetime_as_string(arr, unit="D").tolist())
+
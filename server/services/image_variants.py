@@ -0,0 +1,66 @@
+# =========================
+# RESPONSIVE IMAGE VARIANTS
+# =========================
+# Images are stored as the original upload, so a phone rendering a 360px
+# gallery card downloaded the full-resolution photo. For Cloudinary URLs
+# srcset() returns width-bucketed variants built from a transformation
+# inserted into the delivery URL:
+#
+#   .../image/upload/v123/photo.jpg
+#   .../image/upload/c_limit,w_640,f_auto,q_auto/v123/photo.jpg
+#
+# f_auto serves AVIF or WebP to browsers that accept them (JPEG/PNG to the
+# rest), q_auto picks the quality, c_limit never upscales past the
+# original. Cloudinary renders each variant on its first request and
+# serves it from the CDN afterwards, so nothing is generated per upload
+# and existing images get variants too. URLs from anywhere else (external
+# links, the local storage backend) get an empty srcset and the client
+# falls back to the original URL.
+#
+# Width buckets per use (env overrides, comma-separated):
+#   IMAGE_WIDTHS_CARD      gallery cards            (default 320,640,960,1280)
+#   IMAGE_WIDTHS_HERO      full-width slider images (default 640,960,1280,1920)
+#   IMAGE_WIDTHS_PORTRAIT  BOD/management photos    (default 160,320,480,640)
+
+import os
+import re
+
+
+def _widths(name, default):
+    return tuple(int(w) for w in os.getenv(name, default).split(",") if w.strip())
+
+
+CARD = _widths("IMAGE_WIDTHS_CARD", "320,640,960,1280")
+HERO = _widths("IMAGE_WIDTHS_HERO", "640,960,1280,1920")
+PORTRAIT = _widths("IMAGE_WIDTHS_PORTRAIT", "160,320,480,640")
+
+_CLOUDINARY_IMAGE = re.compile(r"^(https?://res\.cloudinary\.com/[^/]+/image/upload/)(.+)$")
+# a transformation path segment such as c_fill,w_300 (not v123 or a folder)
+_PARAM = re.compile(r"^(a|ac|af|ar|b|bo|br|c|co|cs|d|dl|dn|dpr|du|e|eo|f|fl|fn|fps|g|h|if|"
+                    r"ki|l|o|p|pg|q|r|so|sp|t|u|vc|vs|w|x|y|z)_[^/]+$")
+
+
+def _is_transformation(segment):
+    return all(_PARAM.match(part) for part in segment.split(","))
+
+
+def variant_url(url, width):
+    """The Cloudinary URL resized to `width` in the best format; None if not Cloudinary."""
+    match = _CLOUDINARY_IMAGE.match(url or "")
+    if not match:
+        return None
+    prefix, rest = match.groups()
+    segments = rest.split("/")
+    # keep any transformation already in the URL and resize its result
+    keep = 0
+    while keep < len(segments) - 1 and _is_transformation(segments[keep]):
+        keep += 1
+    segments.insert(keep, f"c_limit,w_{width},f_auto,q_auto")
+    return prefix + "/".join(segments)
+
+
+def srcset(url, widths=CARD):
+    """[{'width': w, 'url': ...}, ...] for an <img srcset>; [] if url is not a Cloudinary image."""
+    if not _CLOUDINARY_IMAGE.match(url or ""):
+        return []
+    return [{'width': width, 'url': variant_url(url, width)} for width in widths]
@@ -0,0 +1,345 @@
+# =========================
+# REQUEST INSTRUMENTATION
+# =========================
+# Where a slow request spent its time: every request records its wall
+# time, the SQL statements it ran (count and time, from the engine's
+# before/after_cursor_execute events) and the time spent in outbound
+# calls wrapped in timed() - Cloudinary uploads (media_storage) and SMTP
+# connects/sends (mail_pool). Per request that becomes
+#
+#   - a Server-Timing header, shown in the browser's network panel:
+#       Server-Timing: app;dur=41.2, db;dur=12.8;desc="9 queries", smtp;dur=20.1
+#   - one JSON log line on stdout:
+#       {"method": "GET", "path": "/gallery", "endpoint": "/gallery",
+#        "status": 200, "ms": 41.2, "db_queries": 9, "db_ms": 12.8, ...}
+#
+# and process-wide it feeds Prometheus histograms served at /_metrics:
+#
+#   http_request_duration_seconds{endpoint,method}   request latency
+#   http_requests_total{endpoint,method,status}
+#   db_query_duration_seconds{endpoint}              per statement
+#   outbound_duration_seconds{service}               cloudinary / smtp
+#
+# endpoint is the URL rule ("/news/posts/<int:post_id>"), not the raw
+# path, so the label set stays bounded. Statements and outbound calls made
+# by the mail queue / upload workers are counted under endpoint
+# "background".
+#
+# Each gunicorn worker keeps its own numbers. With METRICS_DIR set every
+# worker writes a snapshot there (at most every METRICS_FLUSH_SECONDS and
+# on exit) and /_metrics sums all snapshots, so a scrape that lands on any
+# worker sees the whole server. gunicorn.conf.py sets it up.
+#
+# Env:
+#   METRICS_ENABLED        record anything at all (default True)
+#   METRICS_TOKEN          /_metrics requires "Authorization: Bearer <token>";
+#                          unset, /_metrics refuses every scrape (401)
+#   METRICS_DIR            shared snapshot directory for multi-worker servers
+#   METRICS_FLUSH_SECONDS  snapshot interval (default 5)
+#   REQUEST_LOG            all | slow | off (default all)
+#   REQUEST_LOG_SLOW_MS    threshold for REQUEST_LOG=slow (default 500)
+
+import hmac
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+ENABLED = os.getenv("METRICS_ENABLED", "True") == "True"
+TOKEN = os.getenv("METRICS_TOKEN")
+METRICS_DIR = os.getenv("METRICS_DIR")
+FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+REQUEST_LOG = os.getenv("REQUEST_LOG", "all").lower()
+SLOW_MS = float(os.getenv("REQUEST_LOG_SLOW_MS", "500"))
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# name -> (type, help, buckets)
+METRICS = {
+    "http_request_duration_seconds": ("histogram", "Request latency by endpoint.", BUCKETS),
+    "http_requests_total": ("counter", "Requests by endpoint and status.", None),
+    "db_query_duration_seconds": ("histogram", "SQL statement latency by endpoint.", DB_BUCKETS),
+    "outbound_duration_seconds": ("histogram", "Cloudinary and SMTP call latency.", BUCKETS),
+}
+
+BACKGROUND = "background"
+
+
+# ---- registry ----
+
+class Registry:
+    """
+    Counters and histograms keyed by (name, labels). A histogram sample is
+    [count per bucket..., +Inf count, sum]; a counter sample is [value].
+    """
+
+    def __init__(self):
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, labels, amount=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            sample = self._samples.setdefault(key, [0])
+            sample[0] += amount
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        index = next((i for i, bound in enumerate(buckets) if value <= bound), len(buckets))
+        with self._lock:
+            sample = self._samples.get(key)
+            if sample is None:
+                sample = self._samples[key] = [0] * (len(buckets) + 1) + [0.0]
+            sample[index] += 1
+            sample[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return [[name, list(labels), list(sample)]
+                    for (name, labels), sample in self._samples.items()]
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+
+registry = Registry()
+
+
+def _merge(snapshots):
+    merged = {}
+    for snapshot in snapshots:
+        for name, labels, sample in snapshot:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            total = merged.get(key)
+            if total is None:
+                merged[key] = list(sample)
+            elif len(total) == len(sample):
+                merged[key] = [a + b for a, b in zip(total, sample)]
+    return merged
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs):
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}" if pairs else ""
+
+
+def render(merged):
+    """Prometheus text exposition (format 0.0.4) of merged samples."""
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        series = sorted((labels, sample) for (n, labels), sample in merged.items() if n == name)
+        if not series:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, sample in series:
+            if kind == "counter":
+                lines.append(f"{name}{_labels(labels)} {sample[0]:g}")
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets + ("+Inf",), sample):
+                cumulative += count
+                le = bound if bound == "+Inf" else f"{bound:g}"
+                lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {sample[-1]:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+# ---- shared snapshots (multi-worker) ----
+
+_last_flush = 0.0
+
+
+def _snapshot_path():
+    return os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+
+
+def flush():
+    """Write this process's samples to METRICS_DIR (no-op without it)."""
+    global _last_flush
+    if not METRICS_DIR:
+        return
+    _last_flush = time.monotonic()
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = _snapshot_path()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(registry.snapshot(), f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️ Could not write metrics snapshot: {e}")
+
+
+def _maybe_flush():
+    if METRICS_DIR and time.monotonic() - _last_flush >= FLUSH_SECONDS:
+        flush()
+
+
+def collect():
+    """Merged samples of this process, plus every worker's snapshot in METRICS_DIR."""
+    if not METRICS_DIR:
+        return _merge([registry.snapshot()])
+    flush()
+    snapshots = []
+    for name in os.listdir(METRICS_DIR):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(METRICS_DIR, name), encoding="utf-8") as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            continue   # being replaced right now; picked up next scrape
+    return _merge(snapshots)
+
+
+def reset_dir(directory):
+    """Drop snapshots left by a previous server run (gunicorn on_starting)."""
+    if not directory or not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        if name.endswith((".json", ".tmp")):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+# ---- per request ----
+
+class RequestTimings:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.outbound = {}   # service -> seconds
+
+    def add_outbound(self, service, seconds):
+        self.outbound[service] = self.outbound.get(service, 0.0) + seconds
+
+
+def _current():
+    if has_request_context():
+        return g.get("_timings")
+    return None
+
+
+def _endpoint():
+    if not has_request_context():
+        return BACKGROUND
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+@contextmanager
+def timed(service):
+    """Time an outbound call (e.g. timed("cloudinary")) into the request and the histogram."""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        registry.observe("outbound_duration_seconds", {"service": service}, elapsed)
+        timings = _current()
+        if timings is not None:
+            timings.add_outbound(service, elapsed)
+
+
+# The start time lives on the statement's execution context, not on the
+# (pooled) connection: a statement that raises never reaches
+# after_cursor_execute, and its context is simply dropped.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    registry.observe("db_query_duration_seconds", {"endpoint": _endpoint()}, elapsed)
+    timings = _current()
+    if timings is not None:
+        timings.db_queries += 1
+        timings.db_seconds += elapsed
+
+
+def _start_request():
+    g._timings = RequestTimings()
+
+
+def server_timing(timings, total):
+    parts = [f"app;dur={total * 1000:.1f}",
+             f'db;dur={timings.db_seconds * 1000:.1f};desc="{timings.db_queries} queries"']
+    parts += [f"{service};dur={seconds * 1000:.1f}"
+              for service, seconds in sorted(timings.outbound.items())]
+    return ", ".join(parts)
+
+
+def _log(timings, total, response):
+    ms = total * 1000
+    if REQUEST_LOG == "off" or (REQUEST_LOG == "slow" and ms < SLOW_MS):
+        return
+    record = {
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "method": request.method,
+        "path": request.path,
+        "endpoint": _endpoint(),
+        "status": response.status_code,
+        "ms": round(ms, 1),
+        "db_queries": timings.db_queries,
+        "db_ms": round(timings.db_seconds * 1000, 1),
+    }
+    for service, seconds in sorted(timings.outbound.items()):
+        record[f"{service}_ms"] = round(seconds * 1000, 1)
+    print(json.dumps(record), flush=True)
+
+
+def _finish_request(response):
+    timings = g.pop("_timings", None)
+    if timings is None:
+        return response
+    total = time.perf_counter() - timings.start
+    endpoint = _endpoint()
+    registry.observe("http_request_duration_seconds",
+                     {"endpoint": endpoint, "method": request.method}, total)
+    registry.inc("http_requests_total", {"endpoint": endpoint, "method": request.method,
+                                         "status": str(response.status_code)})
+    response.headers["Server-Timing"] = server_timing(timings, total)
+    if request.path != "/_metrics":
+        _log(timings, total, response)
+    _maybe_flush()
+    return response
+
+
+def init_app(app):
+    """Register the request hooks and SQL listeners (once per process for the listeners)."""
+    if not ENABLED:
+        return
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+def authorized(header):
+    """Whether an Authorization header may read /_metrics (never without METRICS_TOKEN)."""
+    if not TOKEN or not header:
+        return False
+    return hmac.compare_digest(header.encode("utf-8"), f"Bearer {TOKEN}".encode("utf-8"))
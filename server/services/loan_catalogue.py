@@ -0,0 +1,144 @@
+# =========================
+# LOAN PRODUCT CATALOGUE CACHE
+# =========================
+# LoanProduct rows almost never change, but the calculator reads them on
+# every request. This keeps the active catalogue in process memory,
+# already converted from Decimal to float, keyed by ProductKey casefolded:
+# SQL Server compares ProductKey under a case-insensitive collation, so
+# "Development" and "development" must keep finding the same product.
+#
+# Entries expire after LOAN_CATALOGUE_TTL seconds (env, default 300) or
+# as soon as this process writes a LoanProduct (version bump from the
+# mapper events below). Other gunicorn workers pick changes up on TTL.
+
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+
+from sqlalchemy import event
+
+from models.models import LoanProduct
+
+CATALOGUE_TTL = float(os.getenv("LOAN_CATALOGUE_TTL", "300"))
+
+
+@dataclass(frozen=True)
+class LoanProductSnapshot:
+    """Pre-converted LoanProduct; same attribute names as the model."""
+    ProductKey: str
+    LoanName: str
+    InterestType: str
+    MonthlyInterestRate: float
+    DefaultTermMonths: int
+    MinTermMonths: int
+    MaxTermMonths: int
+    MinPrincipal: float
+    MaxPrincipal: float
+    RepaymentPeriod: str
+    FirstDueRule: str
+    HolidayRule: str
+    RoundingUnit: float
+    MaximumGuarantors: int
+    IsActive: bool
+    UpdatedAt: datetime = None
+
+    def to_dict(self):
+        # public JSON shape of /loan/products (no timestamps)
+        d = asdict(self)
+        d.pop("UpdatedAt")
+        return d
+
+
+def snapshot_from_model(p: LoanProduct):
+    return LoanProductSnapshot(
+        ProductKey=p.ProductKey,
+        LoanName=p.LoanName,
+        InterestType=p.InterestType,
+        MonthlyInterestRate=float(p.MonthlyInterestRate),
+        DefaultTermMonths=p.DefaultTermMonths,
+        MinTermMonths=p.MinTermMonths,
+        MaxTermMonths=p.MaxTermMonths,
+        MinPrincipal=float(p.MinPrincipal) if p.MinPrincipal is not None else None,
+        MaxPrincipal=float(p.MaxPrincipal) if p.MaxPrincipal is not None else None,
+        RepaymentPeriod=p.RepaymentPeriod,
+        FirstDueRule=p.FirstDueRule,
+        HolidayRule=p.HolidayRule,
+        RoundingUnit=float(p.RoundingUnit),
+        MaximumGuarantors=p.MaximumGuarantors,
+        IsActive=bool(p.IsActive),
+        UpdatedAt=p.UpdatedAt,
+    )
+
+
+# ---- cache state ----
+
+_lock = threading.RLock()  # re-entrant: a load can autoflush a LoanProduct write
+_version = 0
+_state = {
+    "version": -1,        # version the current entries were loaded at
+    "loaded_at": 0.0,
+    "by_key": {},         # ProductKey.casefold() -> LoanProductSnapshot
+    "ordered": [],        # active products ordered by LoanName
+}
+
+
+def bump_version():
+    """Invalidate the catalogue (called on every LoanProduct write)."""
+    global _version
+    with _lock:
+        _version += 1
+
+
+def _is_fresh():
+    return (
+        _state["version"] == _version
+        and time.monotonic() - _state["loaded_at"] < CATALOGUE_TTL
+    )
+
+
+def _load():
+    with _lock:
+        if _is_fresh():
+            return
+        version = _version
+        items = LoanProduct.query.filter_by(IsActive=True)\
+                                 .order_by(LoanProduct.LoanName.asc())\
+                                 .all()
+        ordered = [snapshot_from_model(p) for p in items]
+        _state.update(
+            version=version,
+            loaded_at=time.monotonic(),
+            by_key={_fold(s.ProductKey): s for s in ordered},
+            ordered=ordered,
+        )
+
+
+def _fold(product_key):
+    return (product_key or "").casefold()
+
+
+# ---- read-through API ----
+
+def active_products():
+    """All active products ordered by LoanName."""
+    if not _is_fresh():
+        _load()
+    return _state["ordered"]
+
+
+def get_product(product_key):
+    """Active product snapshot for ProductKey (any case), or None."""
+    if not _is_fresh():
+        _load()
+    return _state["by_key"].get(_fold(product_key))
+
+
+# ---- invalidation on write ----
+
+@event.listens_for(LoanProduct, "after_insert")
+@event.listens_for(LoanProduct, "after_update")
+@event.listens_for(LoanProduct, "after_delete")
+def _loan_product_changed(mapper, connection, target):
+    bump_version()
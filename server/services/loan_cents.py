@@ -0,0 +1,210 @@
+# =========================
+# FIXED-POINT LOAN SCHEDULES
+# =========================
+# Integer versions of the reducing-balance engines. Money enters as
+# integer cents (principal, RoundingUnit) and the rate as integer
+# millionths (MonthlyInterestRate is Numeric(9, 6)), so nothing is
+# rounded through float(unit) per cell and every displayed figure is the
+# exact value rounded half-to-even to the unit, once:
+#
+#   equal_principal  every amount is a multiple of 1 / (n * 10^6) cent,
+#                    so columns are exact integer numerators over that
+#                    denominator (one vectorised pass, no loop)
+#   emi              the installment is not a finite decimal in general;
+#                    the balance recurrence runs in integers with enough
+#                    digits to stay within 10^-4 cent of exact (10^-6
+#                    cent for typical products, more for long expensive
+#                    ones); 0% loans take the exact equal_principal path
+#
+# Same contract as services/loan_engine.py (rows, total_principal,
+# total_interest; due dates from services/due_dates.py); routes use it
+# with LOAN_ENGINE=cents (env; default numpy).
+#
+# Opt-in because it changes published figures: where the exact amount
+# is a half-unit tie, the float engines round whichever way their drift
+# leans and this engine rounds to even, so about 15% of schedules in the
+# bench grid differ by one rounding unit in some cell (e.g. a balance of
+# 200 instead of 300 at unit 100). Confirm against the CBS before
+# switching. bench/loan_engines.py --reference exact checks it against
+# the exact arithmetic; against the default (rows) reference it reports
+# those ties as mismatches.
+
+import math
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from services.due_dates import NO_HOLIDAYS, due_dates
+
+RATE_SCALE = 10 ** 6          # rate in millionths
+_INT64_LIMIT = 2 ** 62        # headroom for sums of two numerators
+
+SCHEDULE_CACHE_SIZE = int(os.getenv("LOAN_SCHEDULE_CACHE_SIZE", "256"))
+
+
+def to_cents(amount):
+    return int(round(float(amount) * 100))
+
+
+def rate_millionths(rate):
+    return int(round(float(rate) * RATE_SCALE))
+
+
+def unit_cents(unit):
+    """RoundingUnit in cents, read like routes._round_unit (0/None -> 1, negative -> 2 dp)."""
+    try:
+        unit = float(unit or 1)
+    except (TypeError, ValueError):
+        unit = 1.0
+    if unit <= 0:
+        return 1
+    return max(1, int(round(unit * 100)))
+
+
+# ---- exact integer rounding ----
+
+def _round_half_even(numerators, denominator):
+    """numerators / denominator rounded half-to-even, element-wise (integer arrays)."""
+    q = numerators // denominator        # np.divmod has no object-dtype loop
+    twice = 2 * (numerators - q * denominator)
+    return q + ((twice > denominator) | ((twice == denominator) & (q % 2 == 1)))
+
+
+def _array(values, fits):
+    return np.array(values, dtype=np.int64 if fits else object)
+
+
+# ---- amount columns (integer numerators over a common denominator) ----
+
+def equal_principal_columns(P_cents, rate, n):
+    """
+    (principal, interest, balance) numerators, their denominator and the
+    exact total interest numerator, in cents.
+    """
+    fits = P_cents * n * max(RATE_SCALE, rate) < _INT64_LIMIT
+    remaining = np.arange(n, 0, -1, dtype=np.int64 if fits else object)  # periods left
+    principal = np.full(n, P_cents * RATE_SCALE, dtype=remaining.dtype)
+    interest = P_cents * rate * remaining
+    balance = P_cents * RATE_SCALE * (remaining - 1)
+    total_interest = P_cents * rate * n * (n + 1) // 2
+    return principal, interest, balance, n * RATE_SCALE, total_interest
+
+
+FACTOR_SCALE = 10 ** 30
+
+
+@lru_cache(maxsize=4096)
+def _emi_factor(rate, n):
+    """r / (1 - (1 + r)^-n) in units of 10^-30, from the exact rational."""
+    if rate == 0:
+        return (FACTOR_SCALE + n // 2) // n
+    growth = (RATE_SCALE + rate) ** n
+    numerator = rate * growth * FACTOR_SCALE
+    denominator = RATE_SCALE * (growth - RATE_SCALE ** n)
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+def _emi_scale(rate, n):
+    """
+    Fixed point (per cent) for the balance recurrence. A rounding error
+    in the balance grows by (1 + r) a month, so long, expensive loans need
+    more digits to stay within 10^-4 cent of exact; typical products fit
+    10^6 and stay in int64.
+    """
+    r = rate / RATE_SCALE
+    growth = (1 + r) ** n
+    amplification = (growth - 1) / r
+    return 10 ** max(6, math.ceil(math.log10(5000 * amplification)))
+
+
+def emi_columns(P_cents, rate, n):
+    """
+    (principal, interest, balance) numerators, their denominator and the
+    total interest numerator, in 1/_emi_scale() cent.
+    """
+    scale = _emi_scale(rate, n)
+    opening = P_cents * scale
+    installment = (opening * _emi_factor(rate, n) + FACTOR_SCALE // 2) // FACTOR_SCALE
+    growth, half = RATE_SCALE + rate, RATE_SCALE // 2
+    bal = opening
+    balances = [bal]
+    append = balances.append
+    for _ in range(n):
+        bal = (bal * growth + half) // RATE_SCALE - installment   # + interest - installment
+        append(bal)
+
+    balances = _array(balances, opening * 4 < _INT64_LIMIT)
+    principal = balances[:-1] - balances[1:]
+    interest = installment - principal
+    principal[-1] = balances[-2]                       # last row clears residue
+    balance = balances[1:]
+    balance[-1] = 0
+    return principal, interest, balance, scale, n * installment + bal - opening
+
+
+def schedule_columns(method, P_cents, rate, n):
+    # at 0% the installment is the constant principal: exact like equal_principal
+    if method == "emi" and rate:
+        return emi_columns(P_cents, rate, n)
+    return equal_principal_columns(P_cents, rate, n)
+
+
+@lru_cache(maxsize=SCHEDULE_CACHE_SIZE)
+def rounded_columns(method, P_cents, rate, n, step):
+    """
+    Memoised ((principal, interest, total, balance) rounded to `step`
+    cents, as floats, total interest in cents unrounded). Calculator
+    traffic repeats round principals and default terms, so most
+    schedules are a dictionary hit.
+    """
+    principal, interest, balance, denominator, total_interest = schedule_columns(
+        method, P_cents, rate, n)
+    # one rounding pass over all four columns; whole units * unit cents
+    # / 100 is the nearest float to the decimal amount
+    units = _round_half_even(np.stack((principal, interest, principal + interest, balance)),
+                             denominator * step)
+    cells = units.astype(np.float64) if step == 100 else units * step / 100
+    return tuple(map(tuple, cells.tolist())), total_interest / denominator
+
+
+# ---- public engine ----
+
+def build_schedule(method, P, r_m, n, start_date, unit, first_due_rule,
+                   holiday_rule, holidays=NO_HOLIDAYS):
+    """
+    Same contract as loan_engine.build_schedule: (rows, total_principal,
+    total_interest), totals unrounded (exact, as floats).
+    """
+    P_cents = to_cents(P)
+    columns, total_interest = rounded_columns(
+        "emi" if method == "emi" else "equal_principal",
+        P_cents, rate_millionths(r_m), n, unit_cents(unit))
+    dates = due_dates(start_date, n, first_due_rule, holiday_rule, holidays)
+
+    rows = [
+        {
+            "period": k,
+            "date": d,
+            "principal": pr,
+            "interest": it,
+            "total": tt,
+            "balance": bl,
+        }
+        for k, d, pr, it, tt, bl in zip(range(1, n + 1), dates, *columns)
+    ]
+    return rows, P_cents / 100, total_interest / 100
+
+
+def build_summary(method, P, r_m, n):
+    """Unrounded (first_total, first_interest, total_principal, total_interest)."""
+    P_cents = to_cents(P)
+    principal, interest, _, denominator, total_interest = schedule_columns(
+        method, P_cents, rate_millionths(r_m), n)
+    scale = denominator * 100
+    return (
+        int(principal[0] + interest[0]) / scale,
+        int(interest[0]) / scale,
+        P_cents / 100,
+        total_interest / scale,
+    )
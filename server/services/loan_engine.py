@@ -0,0 +1,123 @@
+# =========================
+# VECTORISED LOAN SCHEDULES
+# =========================
+# Column-wise (NumPy) versions of the reducing-balance engines in
+# routes.py. Every column (interest, principal, balance) is computed as
+# one array instead of row by row, so a 120-month schedule costs a
+# handful of array operations rather than 120 Python iterations. Due
+# dates come from the memoised calendar in services/due_dates.py.
+
+import numpy as np
+
+from services.due_dates import NO_HOLIDAYS, due_dates
+
+
+# ---- rounding ----
+
+def round_unit_array(x, unit):
+    """Array version of routes._round_unit (half-to-even, like round())."""
+    try:
+        unit = float(unit or 1)
+    except Exception:
+        unit = 1.0
+    if unit <= 0:
+        return np.round(x, 2)
+    return np.round(x / unit) * unit
+
+
+# ---- amount columns ----
+
+def equal_principal_columns(P, r_m, n):
+    """Unrounded (principal, interest, balance) columns, constant principal."""
+    P = float(P)
+    fixed_pr = round(P / n, 10)  # same precision as the row engine
+
+    principal = np.full(n, fixed_pr)
+    # subtract.accumulate keeps the row engine's ((P - a) - a) - ... order
+    running = np.subtract.accumulate(np.concatenate(([P], principal[:-1])))
+    opening = running                      # balance before each period
+    principal[-1] = opening[-1]            # last row clears residue
+    interest = opening * r_m
+    balance = np.maximum(0.0, opening - principal)
+    return principal, interest, balance
+
+
+def emi_columns(P, r_m, n):
+    """Unrounded (principal, interest, balance) columns, fixed installment."""
+    P = float(P)
+    emi = P / n if r_m == 0 else P * r_m / (1 - (1 + r_m) ** (-n))
+    # The balance recurrence is a plain float loop, in the row engine's
+    # operation order: the closed form P(1+r)^k - emi((1+r)^k - 1)/r
+    # rounds differently and moves published balances by a unit.
+    opening = []
+    append = opening.append
+    bal = P
+    for _ in range(n):
+        append(bal)
+        bal = max(0.0, bal - (emi - bal * r_m))
+    opening = np.array(opening)
+
+    interest = opening * r_m
+    principal = emi - interest
+    principal[-1] = opening[-1]            # last row clears residue
+    balance = np.maximum(0.0, opening - principal)
+    return principal, interest, balance
+
+
+def schedule_columns(method, P, r_m, n):
+    if method == "emi":
+        return emi_columns(P, r_m, n)
+    return equal_principal_columns(P, r_m, n)
+
+
+# ---- public engine ----
+
+def build_schedule(method, P, r_m, n, start_date, unit, first_due_rule,
+                   holiday_rule, holidays=NO_HOLIDAYS):
+    """
+    Same contract as routes._schedule_emi / _schedule_equal_principal:
+    returns (rows, total_principal, total_interest). `holidays` is the
+    pair returned by services.due_dates.public_holidays().
+    """
+    principal, interest, balance = schedule_columns(method, P, r_m, n)
+    # add.accumulate sums left to right like the row engine's running
+    # totals (sum() is pairwise and can land on the other side of a .5)
+    total_p = float(np.add.accumulate(principal)[-1])
+    total_i = float(np.add.accumulate(interest)[-1])
+
+    dates = due_dates(start_date, n, first_due_rule, holiday_rule, holidays)
+
+    rows = [
+        {
+            "period": k,
+            "date": d,
+            "principal": pr,
+            "interest": it,
+            "total": tt,
+            "balance": bl,
+        }
+        for k, d, pr, it, tt, bl in zip(
+            range(1, n + 1),
+            dates,
+            round_unit_array(principal, unit).tolist(),
+            round_unit_array(interest, unit).tolist(),
+            round_unit_array(principal + interest, unit).tolist(),
+            round_unit_array(balance, unit).tolist(),
+        )
+    ]
+    return rows, total_p, total_i
+
+
+def build_summary(method, P, r_m, n):
+    """
+    Totals only, no rows or due dates (batch / summary-only requests).
+    Returns unrounded (first_total, first_interest, total_principal,
+    total_interest).
+    """
+    principal, interest, _ = schedule_columns(method, P, r_m, n)
+    return (
+        float(principal[0] + interest[0]),
+        float(interest[0]),
+        float(np.add.accumulate(principal)[-1]),
+        float(np.add.accumulate(interest)[-1]),
+    )
@@ -0,0 +1,133 @@
+# =========================
+# LOAN PAYMENT-FACTOR TABLES
+# =========================
+# Summary figures of a reducing-balance loan scale linearly with the
+# principal, so for each active LoanProduct we keep one row of
+# per-unit-principal factors for every term it allows:
+#
+#   terms MinTermMonths..MaxTermMonths ->
+#       (first_total, first_interest, total_principal, total_interest)
+#
+#   equal_principal  first_total = 1/n + r   total_interest = r (n + 1) / 2
+#   emi              first_total = r / (1 - (1 + r)^-n)   (1/n when r = 0)
+#                    total_interest = n * first_total - 1
+#
+# A summary-only /loan/calc (and /loan/calc/batch) is then principal *
+# one table row instead of building the schedule columns. The whole
+# table is a few array operations over all terms at once, so it is cheap
+# to rebuild: each table remembers the product's UpdatedAt (and the
+# inputs it was built from) and is rebuilt on the first lookup after the
+# catalogue snapshot (services/loan_catalogue.py) reports a change.
+# precompute() builds every active product's table up front (eager
+# start-up, see app.py and gunicorn.conf.py).
+#
+# Products without a MaxTermMonths get a table up to
+# max(DefaultTermMonths, LOAN_TABLE_MAX_TERM) (env, default 360); terms
+# outside a table fall back to services.loan_engine.build_summary.
+
+import os
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+MAX_TERM = int(os.getenv("LOAN_TABLE_MAX_TERM", "360"))
+
+# column order of PaymentTable.factors
+FIRST_TOTAL, FIRST_INTEREST, TOTAL_PRINCIPAL, TOTAL_INTEREST = range(4)
+
+
+@dataclass(frozen=True)
+class PaymentTable:
+    signature: tuple
+    min_term: int
+    factors: np.ndarray       # shape (terms, 4), per unit of principal
+
+    @property
+    def max_term(self):
+        return self.min_term + len(self.factors) - 1
+
+    def summary(self, principal, n):
+        """
+        Unrounded (first_total, first_interest, total_principal,
+        total_interest) for `principal` over `n` months, like
+        loan_engine.build_summary; None if n is outside the table.
+        """
+        if not self.min_term <= n <= self.max_term:
+            return None
+        row = self.factors[n - self.min_term]
+        return tuple(float(principal * f) for f in row)
+
+
+def _signature(p):
+    return (p.UpdatedAt, (p.InterestType or "equal_principal").lower(),
+            p.MonthlyInterestRate, p.MinTermMonths, p.MaxTermMonths,
+            p.DefaultTermMonths)
+
+
+def build_table(p):
+    """Factor table for a LoanProductSnapshot (or model) over its allowed terms."""
+    min_term = max(1, int(p.MinTermMonths or 1))
+    max_term = int(p.MaxTermMonths or max(int(p.DefaultTermMonths or 0), MAX_TERM))
+    terms = np.arange(min_term, max(min_term, max_term) + 1, dtype=np.float64)
+    r = float(p.MonthlyInterestRate)
+
+    factors = np.empty((terms.size, 4))
+    factors[:, TOTAL_PRINCIPAL] = 1.0
+    if (p.InterestType or "equal_principal").lower() == "emi":
+        installment = 1 / terms if r == 0 else r / (1 - (1 + r) ** (-terms))
+        factors[:, FIRST_TOTAL] = installment
+        factors[:, FIRST_INTEREST] = r
+        factors[:, TOTAL_INTEREST] = terms * installment - 1
+    else:
+        factors[:, FIRST_TOTAL] = 1 / terms + r
+        factors[:, FIRST_INTEREST] = r
+        factors[:, TOTAL_INTEREST] = r * (terms + 1) / 2
+    factors.setflags(write=False)
+    return PaymentTable(signature=_signature(p), min_term=min_term, factors=factors)
+
+
+# ---- cache ----
+
+_lock = threading.Lock()
+_tables = {}      # ProductKey -> PaymentTable
+
+
+def table_for(p):
+    """The product's table, rebuilt if the product changed since it was built."""
+    table = _tables.get(p.ProductKey)
+    if table is not None and table.signature == _signature(p):
+        return table
+    table = build_table(p)
+    with _lock:
+        _tables[p.ProductKey] = table
+    return table
+
+
+def summary(p, principal, n):
+    """Scaled table lookup for a product snapshot; None if n is outside its table."""
+    return table_for(p).summary(principal, n)
+
+
+def precompute():
+    """Build the table of every active product (needs an app context); returns the count."""
+    from services import loan_catalogue
+    products = loan_catalogue.active_products()
+    for p in products:
+        table_for(p)
+    active = {p.ProductKey for p in products}
+    with _lock:
+        for key in list(_tables):
+            if key not in active:
+                del _tables[key]
+    return len(products)
+
+
+def warm_up(app):
+    """precompute() at start-up; failures are logged, not raised."""
+    try:
+        with app.app_context():
+            count = precompute()
+        print(f"🧮 Loan payment tables built for {count} product(s)")
+    except Exception as e:
+        print(f"⚠️ Loan payment tables not precomputed: {e}")
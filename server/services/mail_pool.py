@@ -0,0 +1,173 @@
+# =========================
+# POOLED SMTP TRANSPORT
+# =========================
+# Flask-Mail opens a new SMTP connection (TCP + STARTTLS + AUTH) for
+# every mail.send(), so an admin + acknowledgement pair handshakes twice.
+# PooledMail wraps the Flask-Mail instance with the same send()/connect()
+# API but keeps up to MAIL_POOL_SIZE authenticated connections alive:
+#
+#   - a connection idle for more than MAIL_POOL_CHECK_AFTER seconds is
+#     probed with NOOP before reuse and replaced if the server dropped it
+#   - connections idle longer than MAIL_POOL_MAX_IDLE are closed
+#   - a send that hits a disconnected socket reconnects and retries once
+#   - each connection is recycled after MAIL_POOL_MAX_MESSAGES sends
+#
+# Works against any SMTP server, including a local debugging server
+# (python -m smtpd -n -c DebuggingServer localhost:1025 on 3.11, or
+# aiosmtpd) with MAIL_SERVER=localhost MAIL_PORT=1025 MAIL_USE_TLS=False.
+
+import os
+import smtplib
+import threading
+import time
+
+from flask import current_app
+from flask_mail import Connection, Message
+
+from services.instrumentation import timed
+
+POOL_ENABLED = os.getenv("MAIL_POOL_ENABLED", "True") == "True"
+POOL_SIZE = int(os.getenv("MAIL_POOL_SIZE", "2"))
+CHECK_AFTER = float(os.getenv("MAIL_POOL_CHECK_AFTER", "30"))
+MAX_IDLE = float(os.getenv("MAIL_POOL_MAX_IDLE", "240"))
+MAX_MESSAGES = int(os.getenv("MAIL_POOL_MAX_MESSAGES", "100"))
+
+_STALE_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError)
+
+
+class _PooledHost:
+    def __init__(self, host):
+        self.host = host
+        self.last_used = time.monotonic()
+        self.sent = 0
+
+
+def _close(host):
+    try:
+        host.quit()
+    except Exception:
+        try:
+            host.close()
+        except Exception:
+            pass
+
+
+class PooledConnection(Connection):
+    """Flask-Mail Connection that borrows its SMTP session from the pool."""
+
+    def __init__(self, pool, state):
+        super().__init__(state)
+        self.pool = pool
+        self._entry = None
+
+    def __enter__(self):
+        self.num_emails = 0
+        if self.mail.suppress:
+            self.host = None
+        else:
+            self._entry = self.pool.acquire(self)
+            self.host = self._entry.host
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if self._entry is not None:
+            self._entry.host = self.host
+            self.pool.release(self._entry, broken=exc_type is not None)
+            self._entry = None
+        self.host = None
+
+    def send(self, message, envelope_from=None):
+        with timed("smtp"):
+            try:
+                super().send(message, envelope_from)
+            except _STALE_ERRORS:
+                if self.host is None:
+                    raise
+                # server dropped us between the NOOP check and now: reconnect once
+                _close(self.host)
+                self.host = self.configure_host()
+                super().send(message, envelope_from)
+        if self._entry is not None:
+            self._entry.sent += 1
+
+
+class PooledMail:
+    """Drop-in for the Flask-Mail instance: send(), connect(), record_messages()."""
+
+    def __init__(self, mail, size=POOL_SIZE):
+        self.mail = mail
+        self.size = size
+        self._idle = []              # LIFO of _PooledHost
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.mail, name)
+
+    # ---- pool ----
+
+    def acquire(self, connection):
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                with timed("smtp"):   # TCP + STARTTLS + AUTH
+                    return _PooledHost(connection.configure_host())
+
+            idle = now - entry.last_used
+            if idle > MAX_IDLE:
+                _close(entry.host)
+                continue
+            if idle > CHECK_AFTER:
+                try:
+                    if entry.host.noop()[0] != 250:
+                        raise smtplib.SMTPServerDisconnected("NOOP failed")
+                except OSError:            # any SMTP/socket error
+                    _close(entry.host)
+                    continue
+            return entry
+
+    def release(self, entry, broken=False):
+        if broken or entry.host is None or entry.sent >= MAX_MESSAGES:
+            if entry.host is not None:
+                _close(entry.host)
+            return
+        entry.last_used = time.monotonic()
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(entry)
+                return
+        _close(entry.host)
+
+    def close_all(self):
+        """Close every idle connection (shutdown)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            _close(entry.host)
+
+    def after_fork(self):
+        """
+        Forget connections inherited from the parent process without
+        sending QUIT on them: closing the child's copy of the socket
+        leaves the parent's session intact.
+        """
+        self._lock = threading.Lock()
+        self._idle = []
+
+    # ---- Flask-Mail API ----
+
+    def connect(self):
+        try:
+            state = current_app.extensions["mail"]
+        except KeyError as err:
+            raise RuntimeError(
+                "The current application was not configured with Flask-Mail") from err
+        return PooledConnection(self, state)
+
+    def send(self, message):
+        with self.connect() as connection:
+            message.send(connection)
+
+    def send_message(self, *args, **kwargs):
+        self.send(Message(*args, **kwargs))
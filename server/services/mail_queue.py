@@ -0,0 +1,257 @@
+# =========================
+# OUTBOUND MAIL QUEUE
+# =========================
+# Route handlers used to call mail.send() inside the request, so a slow
+# SMTP server held a gunicorn worker for seconds. Handlers now call
+# enqueue(msg), which stores the message in the OutboundEmail table and
+# returns at once. A background thread in each worker process claims due
+# rows, sends them over one SMTP connection per batch, and retries
+# failures with exponential backoff. After MAIL_QUEUE_MAX_ATTEMPTS the
+# row is dead-lettered (Status='dead') for an admin to inspect or retry.
+#
+# Claiming is one UPDATE ... SET ClaimToken = <uuid>, NextAttemptAt =
+# <lease> WHERE the row is still due, then a SELECT of that token, so
+# several workers can poll the same table safely. The claim never
+# compares NextAttemptAt for equality: SQL Server DATETIME keeps 1/300 s
+# and a datetime2 parameter does not match values ending in .xx3/.xx7.
+# A claimed row carries a lease in NextAttemptAt; if its worker dies,
+# the row is picked up again when the lease runs out. Attempts is counted
+# at claim time, so a message that kills its worker every time is
+# dead-lettered after MAIL_QUEUE_MAX_ATTEMPTS leases instead of looping.
+#
+# Env:
+#   MAIL_QUEUE_ENABLED        "False" sends inline (old behaviour)
+#   MAIL_QUEUE_POLL_SECONDS   idle poll interval (default 5)
+#   MAIL_QUEUE_BATCH_SIZE     rows claimed per cycle (default 20)
+#   MAIL_QUEUE_MAX_ATTEMPTS   attempts before dead-lettering (default 5)
+#   MAIL_QUEUE_BACKOFF_SECONDS first retry delay, doubled each time (default 30)
+
+import json
+import os
+import threading
+import traceback
+import uuid
+from datetime import datetime, timedelta
+
+from flask_mail import Message
+from sqlalchemy import update
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.models import db, OutboundEmail
+
+QUEUE_ENABLED = os.getenv("MAIL_QUEUE_ENABLED", "True") == "True"
+POLL_SECONDS = float(os.getenv("MAIL_QUEUE_POLL_SECONDS", "5"))
+BATCH_SIZE = int(os.getenv("MAIL_QUEUE_BATCH_SIZE", "20"))
+MAX_ATTEMPTS = int(os.getenv("MAIL_QUEUE_MAX_ATTEMPTS", "5"))
+BACKOFF_SECONDS = float(os.getenv("MAIL_QUEUE_BACKOFF_SECONDS", "30"))
+MAX_BACKOFF_SECONDS = 6 * 3600
+LEASE_SECONDS = 300
+
+_app = None
+_mail = None
+_worker = None
+_worker_pid = None
+_wake = threading.Event()
+_start_lock = threading.Lock()
+
+
+def init_app(app, mail, start=True):
+    """
+    Remember the app and Flask-Mail instance; start this process's worker
+    unless start=False (gunicorn preload: started per worker after fork).
+    """
+    global _app, _mail
+    _app = app
+    _mail = mail
+    if QUEUE_ENABLED and start:
+        start_worker()
+
+
+# ---- (de)serialisation ----
+
+def _to_row(msg: Message):
+    return OutboundEmail(
+        Subject=msg.subject,
+        Sender=json.dumps(msg.sender),
+        Recipients=json.dumps(list(msg.recipients or [])),
+        Body=msg.body,
+        Html=msg.html,
+    )
+
+
+def _to_message(row: OutboundEmail):
+    sender = json.loads(row.Sender) if row.Sender else None
+    return Message(
+        subject=row.Subject,
+        sender=tuple(sender) if isinstance(sender, list) else sender,
+        recipients=json.loads(row.Recipients),
+        body=row.Body,
+        html=row.Html,
+    )
+
+
+# ---- enqueue ----
+
+def enqueue(msg: Message):
+    """
+    Persist msg for background delivery and return its EmailID.
+    Commits its own transaction; call after the handler's own commit.
+    Falls back to an inline send when the queue is disabled.
+    """
+    if not QUEUE_ENABLED:
+        if _mail:
+            _mail.send(msg)
+        return None
+
+    try:
+        row = _to_row(msg)
+        db.session.add(row)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        # queue table unavailable (e.g. not created yet): don't lose the mail
+        db.session.rollback()
+        print(f"📧 Mail queue unavailable, sending inline: {e}")
+        if _mail:
+            _mail.send(msg)
+        return None
+
+    start_worker()      # no-op unless this process has no worker yet
+    _wake.set()
+    return row.EmailID
+
+
+# ---- worker ----
+
+def _backoff(attempts):
+    return min(BACKOFF_SECONDS * (2 ** (attempts - 1)), MAX_BACKOFF_SECONDS)
+
+
+def _claim_batch():
+    """Claim up to BATCH_SIZE due rows; returns the claimed ORM rows."""
+    now = datetime.utcnow()
+    # a lease that ran out on its last attempt: the worker died mid-send
+    db.session.execute(
+        update(OutboundEmail)
+        .where(OutboundEmail.Status == "sending",
+               OutboundEmail.NextAttemptAt <= now,
+               OutboundEmail.Attempts >= MAX_ATTEMPTS)
+        .values(Status="dead", ClaimToken=None,
+                LastError="worker stopped while sending")
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    candidates = [email_id for (email_id,) in db.session.query(OutboundEmail.EmailID).filter(
+        OutboundEmail.Status.in_(("queued", "sending")),
+        OutboundEmail.NextAttemptAt <= now,
+    ).order_by(OutboundEmail.NextAttemptAt.asc()).limit(BATCH_SIZE).all()]
+    if not candidates:
+        return []
+
+    # rows another worker claimed meanwhile have a lease in the future
+    token = uuid.uuid4().hex
+    db.session.execute(
+        update(OutboundEmail)
+        .where(OutboundEmail.EmailID.in_(candidates),
+               OutboundEmail.Status.in_(("queued", "sending")),
+               OutboundEmail.NextAttemptAt <= now)
+        .values(Status="sending", ClaimToken=token,
+                Attempts=db.func.coalesce(OutboundEmail.Attempts, 0) + 1,
+                NextAttemptAt=now + timedelta(seconds=LEASE_SECONDS))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return OutboundEmail.query.filter(OutboundEmail.ClaimToken == token).all()
+
+
+def _record_failure(row, error):
+    # Attempts was already counted when the row was claimed
+    row.LastError = str(error)[:1000]
+    if row.Attempts >= MAX_ATTEMPTS:
+        row.Status = "dead"
+        print(f"📧 Mail #{row.EmailID} dead-lettered after {row.Attempts} attempts: {error}")
+    else:
+        row.Status = "queued"
+        row.NextAttemptAt = datetime.utcnow() + timedelta(seconds=_backoff(row.Attempts))
+
+
+def process_once():
+    """Claim and send one batch. Returns the number of rows processed."""
+    rows = _claim_batch()
+    if not rows:
+        return 0
+
+    try:
+        with _mail.connect() as conn:      # one SMTP session per batch
+            for row in rows:
+                try:
+                    conn.send(_to_message(row))
+                    row.Status = "sent"
+                    row.SentAt = datetime.utcnow()
+                    row.LastError = None
+                except Exception as e:
+                    _record_failure(row, e)
+                db.session.commit()
+    except Exception as e:
+        # could not connect/authenticate: every unsent row in the batch fails
+        for row in rows:
+            if row.Status == "sending":
+                _record_failure(row, e)
+        db.session.commit()
+
+    return len(rows)
+
+
+def _run():
+    failing = False
+    while True:
+        processed = 0
+        wait = POLL_SECONDS
+        try:
+            with _app.app_context():
+                processed = process_once()
+            failing = False
+        except Exception as e:
+            # log once per outage, then poll slowly until the DB is back
+            if not failing:
+                traceback.print_exc()
+            print(f"📧 Mail queue worker error: {e}")
+            failing = True
+            wait = max(POLL_SECONDS, 60)
+        if processed < BATCH_SIZE:
+            _wake.wait(wait)
+            _wake.clear()
+
+
+def start_worker():
+    """Start the worker thread for this process (again after a fork)."""
+    global _worker, _worker_pid
+    if _app is None or _mail is None or not QUEUE_ENABLED:
+        return
+    with _start_lock:
+        if _worker is not None and _worker_pid == os.getpid() and _worker.is_alive():
+            return
+        _worker = threading.Thread(target=_run, name="mail-queue", daemon=True)
+        _worker_pid = os.getpid()
+        _worker.start()
+
+
+# ---- admin helpers ----
+
+def status_counts():
+    rows = db.session.query(OutboundEmail.Status, db.func.count(OutboundEmail.EmailID))\
+        .group_by(OutboundEmail.Status).all()
+    return {status: count for status, count in rows}
+
+
+def requeue(email_id):
+    """Move a dead-lettered row back to the queue. Returns False if not dead."""
+    row = OutboundEmail.query.get(email_id)
+    if not row or row.Status != "dead":
+        return False
+    row.Status = "queued"
+    row.Attempts = 0
+    row.NextAttemptAt = datetime.utcnow()
+    db.session.commit()
+    _wake.set()
+    return True
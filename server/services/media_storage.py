@@ -0,0 +1,141 @@
+# =========================
+# MEDIA STORAGE BACKENDS
+# =========================
+# Where uploaded images and resource files end up. Each backend takes a
+# file on local disk and returns the public URL to store in the DB:
+#
+#   upload(path, kind, progress=None, resume=None) -> url
+#
+# kind is 'image' or 'resource'. Files larger than UPLOAD_LARGE_BYTES are
+# sent in UPLOAD_CHUNK_BYTES parts, read one at a time, so memory stays
+# bounded by the part size. After each part progress(offset, upload_id) is
+# called; passing resume=(upload_id, offset) back in after a failure
+# continues from that offset instead of starting over.
+#
+# Backend (env MEDIA_STORAGE_BACKEND):
+#   cloudinary - the production store (default)
+#   local      - copies into MEDIA_LOCAL_DIR and returns MEDIA_LOCAL_URL
+#                based URLs; a stand-in for tests, benches and offline dev
+#
+# set_backend() swaps the store at runtime (e.g. LocalStorage in tests).
+
+import os
+import tempfile
+import uuid
+
+from cloudinary_config import get_uploader
+from services.instrumentation import timed
+
+KINDS = ("image", "resource")
+
+# Cloudinary accepts parts of at least 5 MB (except the last one)
+CHUNK_BYTES = max(5 * 1024 * 1024, int(os.getenv("UPLOAD_CHUNK_BYTES", str(10 * 1024 * 1024))))
+LARGE_BYTES = int(os.getenv("UPLOAD_LARGE_BYTES", str(CHUNK_BYTES)))
+
+
+def _parts(path, offset, chunk_bytes):
+    """Yield (start, bytes) parts of the file from offset, one in memory at a time."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            chunk = f.read(chunk_bytes)
+            if not chunk:
+                return
+            yield offset, chunk
+            offset += len(chunk)
+
+
+class CloudinaryStorage:
+    def upload(self, path, kind, progress=None, resume=None):
+        uploader = get_uploader()
+        # resource_type auto keeps PDFs/DOCX as raw files; the spooled file
+        # carries the original name, so use_filename keeps it as public_id
+        options = {"resource_type": "image"} if kind == "image" else {
+            "resource_type": "auto",
+            "overwrite": True,
+            "use_filename": True,
+            "unique_filename": False,
+        }
+
+        size = os.path.getsize(path)
+        if size <= LARGE_BYTES and resume is None:
+            with timed("cloudinary"):
+                result = uploader.upload(path, **options)
+        else:
+            result = self._upload_parts(uploader, path, size, options, progress, resume)
+
+        if kind == "image":
+            return result["secure_url"]
+        return resource_url(result, path)
+
+    def _upload_parts(self, uploader, path, size, options, progress, resume):
+        # cloudinary.uploader.upload_large, with offsets we can report and resume
+        upload_id, offset = resume or (uuid.uuid4().hex, 0)
+        result = None
+        for start, chunk in _parts(path, offset, CHUNK_BYTES):
+            end = start + len(chunk) - 1
+            with timed("cloudinary"):
+                result = uploader.upload_large_part(
+                    (os.path.basename(path), chunk),
+                    http_headers={"Content-Range": f"bytes {start}-{end}/{size}",
+                                  "X-Unique-Upload-Id": upload_id},
+                    **options
+                )
+            if result.get("public_id"):
+                options["public_id"] = result["public_id"]
+            if progress:
+                progress(end + 1, upload_id)
+        return result or {}
+
+
+def resource_url(result, path):
+    """Forced-download URL for an uploaded resource file."""
+    if "public_id" not in result:
+        raise RuntimeError(f"Cloudinary upload failed: {result}")
+    extension = os.path.basename(path).split(".")[-1].lower()
+    format = result.get("format", extension)
+    return f"https://res.cloudinary.com/djydkcx01/raw/upload/fl_attachment/{result['public_id']}.{format}"
+
+
+class LocalStorage:
+    def __init__(self, directory, base_url=None):
+        self.directory = directory
+        self.base_url = (base_url or "file://" + os.path.abspath(directory)).rstrip("/")
+
+    def upload(self, path, kind, progress=None, resume=None):
+        upload_id, offset = resume or (uuid.uuid4().hex, 0)
+        name = f"{upload_id[:8]}_{os.path.basename(path)}"
+        target_dir = os.path.join(self.directory, kind)
+        os.makedirs(target_dir, exist_ok=True)
+        with open(os.path.join(target_dir, name), "r+b" if offset else "wb") as out:
+            out.truncate(offset)
+            out.seek(offset)
+            for start, chunk in _parts(path, offset, CHUNK_BYTES):
+                out.write(chunk)
+                if progress:
+                    progress(start + len(chunk), upload_id)
+        return f"{self.base_url}/{kind}/{name}"
+
+
+def _make_backend():
+    kind = os.getenv("MEDIA_STORAGE_BACKEND", "cloudinary").lower()
+    if kind == "local":
+        directory = os.getenv("MEDIA_LOCAL_DIR") or os.path.join(
+            tempfile.gettempdir(), "mufate_media")
+        return LocalStorage(directory, os.getenv("MEDIA_LOCAL_URL"))
+    return CloudinaryStorage()
+
+
+backend = _make_backend()
+
+
+def set_backend(new_backend):
+    """Swap the store (e.g. a LocalStorage in tests)."""
+    global backend
+    backend = new_backend
+
+
+def upload(path, kind, progress=None, resume=None):
+    if kind not in KINDS:
+        raise ValueError(f"Unknown upload kind: {kind}")
+    return backend.upload(path, kind, progress=progress, resume=resume)
@@ -0,0 +1,256 @@
+# =========================
+# NEWSLETTER CAMPAIGNS (bulk send)
+# =========================
+# An admin creates a NewsletterCampaign and starts it; the send runs in a
+# background thread so the request returns at once. Subscribers are read
+# in keyset pages (SubID > cursor ORDER BY SubID), never the whole table,
+# and each page is split into chunks of NEWSLETTER_CHUNK_SIZE sent by
+# NEWSLETTER_CONCURRENCY senders, each holding one pooled SMTP connection
+# for its chunk.
+#
+# Every recipient gets a NewsletterDelivery row ('sent', 'failed', or
+# 'skipped' for phone-only subscribers). Each chunk's rows are committed
+# as soon as it finishes, together with a fresh HeartbeatAt; the
+# campaign's LastSubID cursor moves once the whole page is recorded.
+# Starting a campaign that was interrupted (restart, crash) resumes after
+# the cursor and skips recipients that already have a delivery row. Like
+# the mail queue, starting is a conditional UPDATE, so only one gunicorn
+# worker sends a campaign; a 'running' campaign whose HeartbeatAt is
+# older than LEASE_SECONDS is treated as abandoned and can be claimed
+# again.
+#
+# Delivery is at least once, not exactly once: a crash (or a sender
+# stalled past the lease) can send the chunks that were in flight again,
+# at most NEWSLETTER_CONCURRENCY x NEWSLETTER_CHUNK_SIZE recipients.
+#
+# Env:
+#   NEWSLETTER_BATCH_SIZE    subscribers per keyset page (default 200)
+#   NEWSLETTER_CHUNK_SIZE    recipients per sender between commits (default 20)
+#   NEWSLETTER_CONCURRENCY   parallel SMTP senders (default MAIL_POOL_SIZE)
+
+import os
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from flask_mail import Message
+from sqlalchemy import update, or_
+
+from models.models import db, NewsletterCampaign, NewsletterDelivery, NewsletterSubscription
+from services.mail_pool import POOL_SIZE
+
+BATCH_SIZE = int(os.getenv("NEWSLETTER_BATCH_SIZE", "200"))
+CHUNK_SIZE = max(1, int(os.getenv("NEWSLETTER_CHUNK_SIZE", "20")))
+CONCURRENCY = max(1, int(os.getenv("NEWSLETTER_CONCURRENCY", str(POOL_SIZE))))
+LEASE_SECONDS = 300
+
+_app = None
+_mail = None
+_running = set()            # CampaignIDs with a live sender thread in this process
+_running_lock = threading.Lock()
+
+
+def init_app(app, mail):
+    """Remember the app and (pooled) Flask-Mail transport."""
+    global _app, _mail
+    _app = app
+    _mail = mail
+
+
+# ---- start / resume ----
+
+def start(campaign_id):
+    """
+    Start (or resume) a campaign in a background thread. Returns False if
+    it is already being sent by a live worker or has completed; a
+    completed campaign is only sent again after retry_failed() reopens it.
+    """
+    with _running_lock:
+        if campaign_id in _running:
+            return False
+        _running.add(campaign_id)
+
+    started = False
+    try:
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=LEASE_SECONDS)
+        result = db.session.execute(
+            update(NewsletterCampaign)
+            .where(NewsletterCampaign.CampaignID == campaign_id,
+                   NewsletterCampaign.Status != "completed",
+                   or_(NewsletterCampaign.Status != "running",
+                       NewsletterCampaign.HeartbeatAt.is_(None),
+                       NewsletterCampaign.HeartbeatAt < stale))
+            .values(Status="running", HeartbeatAt=now, CompletedAt=None,
+                    StartedAt=db.func.coalesce(NewsletterCampaign.StartedAt, now))
+        )
+        db.session.commit()
+        started = result.rowcount == 1
+        if started:
+            threading.Thread(target=_run, args=(campaign_id,),
+                             name=f"newsletter-{campaign_id}", daemon=True).start()
+    except Exception:
+        # the id must not stay in _running, or this worker refuses the campaign until restart
+        db.session.rollback()
+        if started:      # claimed but no thread: let the next start claim it at once
+            db.session.execute(update(NewsletterCampaign)
+                               .where(NewsletterCampaign.CampaignID == campaign_id)
+                               .values(HeartbeatAt=None))
+            db.session.commit()
+        with _running_lock:
+            _running.discard(campaign_id)
+        raise
+
+    if not started:
+        with _running_lock:
+            _running.discard(campaign_id)
+    return started
+
+
+def _run(campaign_id):
+    try:
+        with _app.app_context():
+            send_campaign(campaign_id)
+    except Exception as e:
+        # Status stays 'running'; starting the campaign again resumes it
+        traceback.print_exc()
+        print(f"📰 Newsletter campaign #{campaign_id} stopped: {e}")
+    finally:
+        with _running_lock:
+            _running.discard(campaign_id)
+
+
+# ---- sending ----
+
+def _next_page(cursor):
+    return db.session.query(NewsletterSubscription.SubID, NewsletterSubscription.ContactInfo)\
+        .filter(NewsletterSubscription.SubID > cursor)\
+        .order_by(NewsletterSubscription.SubID.asc())\
+        .limit(BATCH_SIZE).all()
+
+
+def _message(campaign, sender, recipient):
+    return Message(subject=campaign["Subject"], sender=sender,
+                   recipients=[recipient], body=campaign["Body"], html=campaign["Html"])
+
+
+def _send_chunk(campaign, sender, chunk):
+    """Send to each (SubID, email) over one pooled connection; returns results."""
+    results = []
+    with _app.app_context():
+        try:
+            with _mail.connect() as conn:
+                for sub_id, email in chunk:
+                    try:
+                        conn.send(_message(campaign, sender, email))
+                        results.append((sub_id, "sent", None))
+                    except Exception as e:
+                        results.append((sub_id, "failed", str(e)[:500]))
+        except Exception as e:
+            # could not connect/authenticate: the rest of the chunk fails
+            done = {sub_id for sub_id, _, _ in results}
+            results.extend((sub_id, "failed", str(e)[:500])
+                           for sub_id, _ in chunk if sub_id not in done)
+    return results
+
+
+def _record(row, results):
+    """Store (SubID, status, error) results and renew the campaign's lease."""
+    now = datetime.utcnow()
+    db.session.bulk_save_objects([
+        NewsletterDelivery(CampaignID=row.CampaignID, SubID=sub_id,
+                           Status=status, Error=error, AttemptedAt=now)
+        for sub_id, status, error in results
+    ])
+    row.SentCount += sum(1 for _, s, _ in results if s == "sent")
+    row.FailedCount += sum(1 for _, s, _ in results if s == "failed")
+    row.SkippedCount += sum(1 for _, s, _ in results if s == "skipped")
+    row.HeartbeatAt = now
+    db.session.commit()
+
+
+def send_campaign(campaign_id):
+    """Send every remaining page of a campaign (runs in the campaign thread)."""
+    row = NewsletterCampaign.query.get(campaign_id)
+    campaign = {"Subject": row.Subject, "Body": row.Body, "Html": row.Html}
+    sender = _app.config.get("MAIL_USERNAME") or "noreply@mufate-g-sacco.co.ke"
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY,
+                            thread_name_prefix=f"newsletter-{campaign_id}") as pool:
+        while True:
+            page = _next_page(row.LastSubID)
+            if not page:
+                break
+
+            # resume safety: skip anyone this campaign already reached
+            done = {sub_id for (sub_id,) in db.session.query(NewsletterDelivery.SubID)
+                    .filter(NewsletterDelivery.CampaignID == campaign_id,
+                            NewsletterDelivery.SubID.in_([s for s, _ in page]))}
+
+            emails, skipped = [], []
+            for sub_id, contact in page:
+                if sub_id in done:
+                    continue
+                contact = (contact or "").strip()
+                if "@" in contact:
+                    emails.append((sub_id, contact))
+                else:
+                    skipped.append((sub_id, "skipped", None))
+            _record(row, skipped)
+
+            # record (and heartbeat) each chunk as it finishes, so neither
+            # a slow page nor a crash costs more than the chunks in flight
+            chunks = [emails[i:i + CHUNK_SIZE] for i in range(0, len(emails), CHUNK_SIZE)]
+            futures = [pool.submit(_send_chunk, campaign, sender, c) for c in chunks]
+            for future in as_completed(futures):
+                _record(row, future.result())
+
+            row.LastSubID = page[-1][0]
+            row.HeartbeatAt = datetime.utcnow()
+            db.session.commit()
+
+    row.Status = "completed"
+    row.CompletedAt = datetime.utcnow()
+    db.session.commit()
+    print(f"📰 Newsletter campaign #{campaign_id} completed: "
+          f"{row.SentCount} sent, {row.FailedCount} failed, {row.SkippedCount} skipped")
+
+
+# ---- admin helpers ----
+
+def progress(campaign):
+    return {
+        'CampaignID': campaign.CampaignID,
+        'Subject': campaign.Subject,
+        'Status': campaign.Status,
+        'LastSubID': campaign.LastSubID,
+        'SentCount': campaign.SentCount,
+        'FailedCount': campaign.FailedCount,
+        'SkippedCount': campaign.SkippedCount,
+        'CreatedAt': campaign.CreatedAt.strftime('%Y-%m-%d %H:%M:%S') if campaign.CreatedAt else None,
+        'StartedAt': campaign.StartedAt.strftime('%Y-%m-%d %H:%M:%S') if campaign.StartedAt else None,
+        'CompletedAt': campaign.CompletedAt.strftime('%Y-%m-%d %H:%M:%S') if campaign.CompletedAt else None,
+    }
+
+
+def retry_failed(campaign_id):
+    """
+    Drop this campaign's failed deliveries and rewind the cursor to the
+    first of them, so the next start sends to those subscribers again
+    (a completed campaign is reopened as 'draft' for that).
+    Returns the number of deliveries reset.
+    """
+    campaign = NewsletterCampaign.query.get(campaign_id)
+    failed = NewsletterDelivery.query.filter_by(CampaignID=campaign_id, Status='failed')
+    first = failed.with_entities(db.func.min(NewsletterDelivery.SubID)).scalar()
+    if first is None:
+        return 0
+    count = failed.delete(synchronize_session=False)
+    campaign.FailedCount = max(0, campaign.FailedCount - count)
+    campaign.LastSubID = min(campaign.LastSubID, first - 1)
+    if campaign.Status == "completed":
+        campaign.Status = "draft"
+        campaign.CompletedAt = None
+    db.session.commit()
+    return count
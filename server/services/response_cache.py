@@ -0,0 +1,292 @@
+# =========================
+# RESPONSE CACHE (public GETs)
+# =========================
+# Public content endpoints rebuild the same JSON from SQL Server on every
+# page view although the data only changes when an admin posts to the
+# matching /create route. Views decorated with @cached_response keep their
+# 200 responses for a per-endpoint TTL; write handlers decorated with
+# @invalidates drop the matching namespaces once they succeed.
+#
+# Backend (env RESPONSE_CACHE_BACKEND):
+#   memory - per-process dict (default; single process only)
+#   file   - shared directory (RESPONSE_CACHE_DIR), so every gunicorn
+#            worker on the box sees the same entries and invalidations
+#            (gunicorn.conf.py selects it whenever workers > 1)
+#   none   - caching disabled
+#
+# Keys are the path plus only the query args the view declares
+# (query_args=), so junk parameters (?x=1, ?x=2, ...) share one entry.
+# Both backends hold at most RESPONSE_CACHE_MAX_ENTRIES entries
+# (default 1000): a write first drops expired entries, then the least
+# recently used ones.
+#
+# conditional_response() (registered as the blueprint's after_request)
+# adds a strong ETag to every 200 GET and answers If-None-Match with
+# 304 Not Modified, so repeat visitors skip the body entirely.
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import request, make_response, current_app
+from werkzeug.http import generate_etag
+
+DEFAULT_TTL = int(os.getenv("RESPONSE_CACHE_DEFAULT_TTL", "300"))
+MAX_ENTRIES = max(1, int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000")))
+SWEEP_SECONDS = 60      # file backend: expired entries are dropped at least this often
+
+
+class MemoryBackend:
+    """Process-local LRU store: {key: (expires_at, entry)}, oldest use first."""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if not item:
+                return None
+            expires_at, entry = item
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, entry, ttl):
+        now = time.time()
+        with self._lock:
+            self._data[key] = (now + ttl, entry)
+            self._data.move_to_end(key)
+            if len(self._data) > self.max_entries:
+                for stale in [k for k, (expires_at, _) in self._data.items() if expires_at < now]:
+                    del self._data[stale]
+                while len(self._data) > self.max_entries:
+                    self._data.popitem(last=False)
+
+    def delete_namespace(self, namespace):
+        prefix = namespace + ":"
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class FileBackend:
+    """
+    Directory store shared by all workers on the host. One file per key:
+    a JSON header line (expiry, status, mimetype) then the body. The
+    file's mtime is its expiry and its atime its last use, so sweeps
+    only need a stat per file.
+    """
+
+    def __init__(self, directory, max_entries=MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._swept_at = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        namespace, _, rest = key.partition(":")
+        digest = hashlib.sha1(rest.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{namespace}.{digest}.cache")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                header = json.loads(fh.readline())
+                if header["expires_at"] < time.time():
+                    return None
+                body = fh.read()
+            os.utime(path, (time.time(), header["expires_at"]))    # last use
+        except (OSError, ValueError, KeyError):
+            return None
+        return {**header["entry"], "body": body}
+
+    def set(self, key, entry, ttl):
+        now = time.time()
+        header = {
+            "expires_at": now + ttl,
+            "entry": {k: v for k, v in entry.items() if k != "body"},
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(json.dumps(header).encode("utf-8") + b"\n")
+                fh.write(entry["body"])
+            os.utime(tmp, (now, header["expires_at"]))
+            os.replace(tmp, self._path(key))    # atomic for other workers
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self._sweep(now)
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".cache"):
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_atime, st.st_mtime, path))
+        return entries
+
+    def _sweep(self, now):
+        """Drop expired entries, then the least recently used above max_entries."""
+        names = os.listdir(self.directory)
+        if len(names) <= self.max_entries and now - self._swept_at < SWEEP_SECONDS:
+            return
+        self._swept_at = now
+        live = []
+        for used_at, expires_at, path in self._entries():
+            if expires_at < now:
+                self._remove(path)
+            else:
+                live.append((used_at, path))
+        live.sort()
+        for _, path in live[:max(0, len(live) - self.max_entries)]:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def delete_namespace(self, namespace):
+        prefix = namespace + "."
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith(".cache"):
+                self._remove(os.path.join(self.directory, name))
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".cache"):
+                self._remove(os.path.join(self.directory, name))
+
+
+def _make_backend():
+    kind = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+    if kind == "none":
+        return None
+    if kind == "file":
+        directory = os.getenv("RESPONSE_CACHE_DIR") or os.path.join(
+            tempfile.gettempdir(), "mufate_response_cache")
+        return FileBackend(directory)
+    return MemoryBackend()
+
+
+backend = _make_backend()
+
+
+def set_backend(new_backend):
+    """Swap the store (e.g. a MemoryBackend in tests, None to disable)."""
+    global backend
+    backend = new_backend
+
+
+def _key(namespace, query_args=(), vary=None):
+    # only the query args the view reads: ?page=2 is its own entry, ?x=1 is not
+    query = urlencode([(name, request.args[name]) for name in query_args
+                       if name in request.args])
+    key = f"{namespace}:{request.path}?{query}"
+    if vary is not None:
+        key += f"|{vary()}"
+    return key
+
+
+def invalidate(*namespaces):
+    if backend is None:
+        return
+    for namespace in namespaces:
+        backend.delete_namespace(namespace)
+
+
+# ---- decorators ----
+
+def cached_response(namespace, ttl=None, vary=None, query_args=()):
+    """
+    Cache 200 responses of a public GET view under `namespace`.
+    `query_args` names the query args the view reads (the rest are left out of
+    the key); `vary` is an optional callable whose result is added to
+    the key (e.g. today's date for date-dependent documents).
+    """
+    ttl = DEFAULT_TTL if ttl is None else ttl
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if backend is None or request.method != "GET":
+                return view(*args, **kwargs)
+
+            key = _key(namespace, query_args, vary)
+            entry = backend.get(key)
+            if entry is not None:
+                resp = current_app.response_class(
+                    entry["body"], status=entry["status"],
+                    mimetype=entry["mimetype"])
+                resp.set_etag(entry["etag"])
+                resp.headers["X-Cache"] = "HIT"
+                return resp
+
+            resp = make_response(view(*args, **kwargs))
+            if resp.status_code == 200 and not resp.direct_passthrough:
+                body = resp.get_data()
+                etag = generate_etag(body)     # hashed once per entry
+                backend.set(key, {
+                    "status": resp.status_code,
+                    "mimetype": resp.mimetype,
+                    "etag": etag,
+                    "body": body,
+                }, ttl)
+                resp.set_etag(etag)
+                resp.headers["X-Cache"] = "MISS"
+            return resp
+        return wrapper
+    return decorator
+
+
+def invalidates(*namespaces):
+    """Drop the given namespaces after a write handler succeeds (< 400)."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            resp = make_response(view(*args, **kwargs))
+            if resp.status_code < 400:
+                invalidate(*namespaces)
+            return resp
+        return wrapper
+    return decorator
+
+
+# ---- conditional GET ----
+
+def conditional_response(resp):
+    """
+    after_request hook: strong ETag on 200 GET/HEAD responses (reusing the
+    cached one when present) and 304 when If-None-Match matches.
+    """
+    if (request.method not in ("GET", "HEAD") or resp.status_code != 200
+            or resp.direct_passthrough):
+        return resp
+    if not resp.get_etag()[0]:
+        resp.add_etag()
+    # let browsers keep the body but revalidate before reusing it
+    resp.headers.setdefault("Cache-Control", "no-cache")
+    return resp.make_conditional(request)
@@ -0,0 +1,495 @@
+# =========================
+# BACKGROUND UPLOAD JOBS
+# =========================
+# Upload handlers used to push the request's file to Cloudinary inside the
+# request, so a large PDF held the client and a gunicorn worker for the
+# whole transfer. Handlers now call submit(file, kind, ...), which spools
+# the file to local disk, stores an UploadJob row and returns at once with
+# its JobID; the uploader polls GET /uploads/<JobID>. UPLOAD_WORKERS
+# threads per process claim queued jobs, send the spooled file to the
+# media store (services/media_storage.py) and write the URL into the
+# target row - updating e.g. Services.ImageURL, or inserting the
+# Resources row from the job's Payload once its FilePath is known.
+#
+# Large files can also arrive in parts: open_chunked() creates a job in
+# 'receiving' and the client PUTs each part with a Content-Range; parts
+# are streamed to the spool file in small blocks, so memory stays bounded
+# whatever the file size. ReceivedBytes is the offset the next part must
+# start at, so an interrupted client asks GET /uploads/<JobID> and
+# resumes from there. Once the last byte arrives the job is queued like
+# any other. The worker sends big spooled files on in parts too
+# (services/media_storage.py) and records UploadedBytes after each, which
+# is both the progress shown to the admin UI and the offset a retry
+# resumes from.
+#
+# Claiming works like the mail queue: a conditional UPDATE that stamps a
+# ClaimToken and a lease in NextAttemptAt, retries with exponential backoff, and a job whose worker
+# died is picked up again when its lease runs out. The spooled file only
+# exists on the machine that received it, so workers only claim jobs
+# whose Host is their own. A redeploy or restart changes the hostname and
+# empties the temp dir, so an idle worker also fails orphans: jobs of
+# another host that are a lease overdue while that host shows no sign of
+# life (no live lease, nothing completed within a lease), and this
+# host's chunked uploads whose spool file is gone. Pollers then see
+# 'failed' and can upload the file again.
+#
+# Env:
+#   UPLOAD_JOBS_ENABLED      "False" uploads inline (old behaviour)
+#   UPLOAD_SPOOL_DIR         spool directory (default <tmp>/mufate_uploads)
+#   UPLOAD_WORKERS           upload threads per process (default 2)
+#   UPLOAD_POLL_SECONDS      idle poll interval (default 10)
+#   UPLOAD_MAX_ATTEMPTS      attempts before a job fails (default 3)
+#   UPLOAD_BACKOFF_SECONDS   first retry delay, doubled each time (default 30)
+#   UPLOAD_PART_BYTES        largest part a chunked upload may PUT (default 5 MB)
+#   UPLOAD_RECEIVE_HOURS     an unfinished chunked upload idle this long is
+#                            discarded (default 24)
+#   UPLOAD_MAX_BYTES         largest file a chunked upload may announce
+#                            (default 500 MB)
+#   UPLOAD_SPOOL_MAX_BYTES   new chunked uploads are refused while this
+#                            host's unfinished jobs add up to more (default 5 GB)
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import traceback
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, inspect, or_, update
+from werkzeug.utils import secure_filename
+
+from models.models import db, UploadJob, Resources, Service
+from services import media_storage
+from services.response_cache import invalidate
+
+ENABLED = os.getenv("UPLOAD_JOBS_ENABLED", "True") == "True"
+SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or os.path.join(tempfile.gettempdir(), "mufate_uploads")
+WORKERS = max(1, int(os.getenv("UPLOAD_WORKERS", "2")))
+POLL_SECONDS = float(os.getenv("UPLOAD_POLL_SECONDS", "10"))
+MAX_ATTEMPTS = int(os.getenv("UPLOAD_MAX_ATTEMPTS", "3"))
+BACKOFF_SECONDS = float(os.getenv("UPLOAD_BACKOFF_SECONDS", "30"))
+PART_BYTES = int(os.getenv("UPLOAD_PART_BYTES", str(5 * 1024 * 1024)))
+RECEIVE_HOURS = float(os.getenv("UPLOAD_RECEIVE_HOURS", "24"))
+MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(500 * 1024 * 1024)))
+SPOOL_MAX_BYTES = int(os.getenv("UPLOAD_SPOOL_MAX_BYTES", str(5 * 1024 * 1024 * 1024)))
+LEASE_SECONDS = 900
+COPY_BLOCK = 64 * 1024
+
+HOST = socket.gethostname()
+
+# TargetModel -> (model, response cache namespace to drop once the URL lands)
+TARGETS = {
+    "Resources": (Resources, "resources"),
+    "Services": (Service, "services"),
+}
+
+_app = None
+_workers = []
+_workers_pid = None
+_wake = threading.Event()
+_start_lock = threading.Lock()
+
+
+def init_app(app, start=True):
+    """
+    Remember the app; start this process's upload threads unless
+    start=False (gunicorn preload: started per worker after fork).
+    """
+    global _app
+    _app = app
+    if ENABLED and start:
+        start_workers()
+
+
+# ---- submit ----
+
+def submit(file, kind, target=None, target_id=None, values=None):
+    """
+    Spool a Werkzeug FileStorage and queue its upload; returns the UploadJob.
+
+    target is (TargetModel, column) of the row that receives the URL: the
+    row target_id, or a new row built from `values` when target_id is None.
+    With the queue disabled the upload runs inline and the returned job is
+    already 'done' (errors raise, as the old inline upload did).
+    """
+    job_id = uuid.uuid4().hex
+    filename = secure_filename(file.filename or "") or "upload"
+    spool_dir = os.path.join(SPOOL_DIR, job_id)
+    os.makedirs(spool_dir, exist_ok=True)
+    path = os.path.join(spool_dir, filename)
+    file.save(path)        # copied in chunks, never held in memory whole
+
+    size = os.path.getsize(path)
+    job = _new_job(job_id, kind, filename, path, size, target, target_id, values)
+    job.ReceivedBytes = size
+    db.session.add(job)
+    db.session.commit()
+
+    if not ENABLED:
+        process(job, raise_errors=True)
+        return job
+
+    _queued(job)
+    return job
+
+
+def _new_job(job_id, kind, filename, path, size, target, target_id, values):
+    model, column = target or (None, None)
+    return UploadJob(
+        JobID=job_id,
+        Kind=kind,
+        FileName=filename,
+        SizeBytes=size,
+        SpoolPath=path,
+        Host=HOST,
+        TargetModel=model,
+        TargetColumn=column,
+        TargetID=target_id,
+        Payload=json.dumps(values) if values else None,
+    )
+
+
+def _queued(job):
+    start_workers()      # no-op unless this process has no workers yet
+    _wake.set()
+
+
+# ---- chunked (resumable) receive ----
+
+class OffsetMismatch(Exception):
+    """A part did not start where the spooled file ends; .offset is where it does."""
+
+    def __init__(self, offset):
+        super().__init__(f"expected a part starting at byte {offset}")
+        self.offset = offset
+
+
+class SpoolFull(Exception):
+    """The spool directory has no room for another upload right now."""
+
+
+def spooled_bytes():
+    """Bytes reserved on this host's disk by unfinished jobs (their full SizeBytes)."""
+    return db.session.query(db.func.coalesce(db.func.sum(UploadJob.SizeBytes), 0)).filter(
+        UploadJob.Host == HOST,
+        UploadJob.Status.in_(("receiving", "queued", "uploading")),
+    ).scalar()
+
+
+def open_chunked(filename, size, kind, target=None, target_id=None, values=None):
+    """
+    Create a 'receiving' job for a file the client will PUT in parts.
+    Raises SpoolFull if its size would take the spool past SPOOL_MAX_BYTES.
+    """
+    if spooled_bytes() + size > SPOOL_MAX_BYTES:
+        raise SpoolFull(f"upload spool is full ({SPOOL_MAX_BYTES} bytes reserved)")
+    job_id = uuid.uuid4().hex
+    filename = secure_filename(filename or "") or "upload"
+    spool_dir = os.path.join(SPOOL_DIR, job_id)
+    os.makedirs(spool_dir, exist_ok=True)
+    path = os.path.join(spool_dir, filename)
+    open(path, "wb").close()
+
+    job = _new_job(job_id, kind, filename, path, size, target, target_id, values)
+    job.Status = "receiving"
+    job.NextAttemptAt = datetime.utcnow() + timedelta(hours=RECEIVE_HOURS)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def receive_chunk(job, start, length, stream):
+    """
+    Append `length` bytes read from `stream` at offset `start`. Raises
+    OffsetMismatch unless start is the current ReceivedBytes. Queues the
+    job once the file is complete (or uploads it inline when disabled).
+    """
+    if job.Status != "receiving" or start != job.ReceivedBytes:
+        raise OffsetMismatch(job.ReceivedBytes)
+
+    with open(job.SpoolPath, "r+b") as out:
+        out.truncate(start)          # drop the tail of an interrupted part
+        out.seek(start)
+        remaining = length
+        while remaining:
+            block = stream.read(min(COPY_BLOCK, remaining))
+            if not block:
+                raise OSError(f"part ended after {length - remaining} of {length} bytes")
+            out.write(block)
+            remaining -= len(block)
+
+    now = datetime.utcnow()
+    complete = start + length == job.SizeBytes
+    values = {"ReceivedBytes": start + length,
+              "NextAttemptAt": now if complete else now + timedelta(hours=RECEIVE_HOURS)}
+    if complete:
+        values["Status"] = "queued"
+    # the offset check again, atomically: a concurrent PUT of the same part loses
+    result = db.session.execute(
+        update(UploadJob)
+        .where(UploadJob.JobID == job.JobID,
+               UploadJob.Status == "receiving",
+               UploadJob.ReceivedBytes == start)
+        .values(**values)
+    )
+    db.session.commit()
+    db.session.refresh(job)
+    if result.rowcount != 1:
+        raise OffsetMismatch(job.ReceivedBytes)
+
+    if complete:
+        if not ENABLED:
+            process(job, raise_errors=True)
+        else:
+            _queued(job)
+    return job
+
+
+# ---- worker ----
+
+def _backoff(attempts):
+    return BACKOFF_SECONDS * (2 ** (attempts - 1))
+
+
+def _claim():
+    """Claim the next due job on this host; returns it or None."""
+    now = datetime.utcnow()
+    candidates = db.session.query(UploadJob.JobID).filter(
+        UploadJob.Host == HOST,
+        UploadJob.Status.in_(("queued", "uploading")),
+        UploadJob.NextAttemptAt <= now,
+    ).order_by(UploadJob.NextAttemptAt.asc()).limit(WORKERS).all()
+
+    lease = now + timedelta(seconds=LEASE_SECONDS)
+    for (job_id,) in candidates:
+        # a job another worker claimed meanwhile has a lease in the future
+        token = uuid.uuid4().hex
+        db.session.execute(
+            update(UploadJob)
+            .where(UploadJob.JobID == job_id,
+                   UploadJob.Status.in_(("queued", "uploading")),
+                   UploadJob.NextAttemptAt <= now)
+            .values(Status="uploading", NextAttemptAt=lease, ClaimToken=token)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        job = db.session.get(UploadJob, job_id, populate_existing=True)
+        if job is not None and job.ClaimToken == token:
+            return job
+    return None
+
+
+def _expire_receiving():
+    """Fail this host's chunked uploads whose client went away."""
+    stale = UploadJob.query.filter(
+        UploadJob.Host == HOST,
+        UploadJob.Status == "receiving",
+        UploadJob.NextAttemptAt <= datetime.utcnow(),
+    ).all()
+    for job in stale:
+        job.Status = "failed"
+        job.Error = f"upload abandoned after {job.ReceivedBytes} of {job.SizeBytes} bytes"
+        job.CompletedAt = datetime.utcnow()
+        _discard_spool(job)
+    db.session.commit()
+    return len(stale)
+
+
+def _fail_orphans():
+    """Fail jobs no live worker can finish (their host or spool file is gone)."""
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=LEASE_SECONDS)
+    orphans = []
+
+    overdue = UploadJob.query.filter(
+        UploadJob.Host != HOST,
+        UploadJob.Status.in_(("receiving", "queued", "uploading")),
+        UploadJob.NextAttemptAt <= cutoff,
+    ).all()
+    if overdue:
+        alive = {host for (host,) in db.session.query(UploadJob.Host).filter(
+            UploadJob.Host.in_({job.Host for job in overdue}),
+            or_(and_(UploadJob.Status == "uploading", UploadJob.NextAttemptAt > now),
+                UploadJob.CompletedAt >= cutoff),
+        ).distinct()}
+        for job in overdue:
+            if job.Host not in alive:
+                job.SpoolPath = None       # on the other machine's disk, if anywhere
+                orphans.append((job, f"host {job.Host} went away before the upload finished"))
+
+    for job in UploadJob.query.filter(UploadJob.Host == HOST,
+                                      UploadJob.Status == "receiving").all():
+        if not job.SpoolPath or not os.path.exists(job.SpoolPath):
+            orphans.append((job, "spooled file is gone (server restarted)"))
+
+    for job, error in orphans:
+        job.Status = "failed"
+        job.Error = f"{error}; upload the file again"
+        job.CompletedAt = now
+        _discard_spool(job)
+        print(f"📤 Upload {job.JobID} ({job.FileName}) failed: {error}")
+    db.session.commit()
+    return len(orphans)
+
+
+def _discard_spool(job):
+    if job.SpoolPath:
+        shutil.rmtree(os.path.dirname(job.SpoolPath), ignore_errors=True)
+        job.SpoolPath = None
+
+
+def _deliver(job, url):
+    """Write url into the job's target row; returns the cache namespace to drop."""
+    if not job.TargetModel:
+        return None
+    model, namespace = TARGETS[job.TargetModel]
+    if job.TargetID is not None:
+        row = db.session.get(model, job.TargetID)
+        if row is None:          # deleted while the file was uploading
+            return None
+    else:
+        row = model(**json.loads(job.Payload or "{}"))
+        db.session.add(row)
+    setattr(row, job.TargetColumn, url)
+    db.session.flush()
+    job.TargetID = inspect(row).identity[0]
+    return namespace
+
+
+def _record_failure(job, error, final=False):
+    job.Attempts = (job.Attempts or 0) + 1
+    job.Error = str(error)[:1000]
+    if final or job.Attempts >= MAX_ATTEMPTS or isinstance(error, FileNotFoundError):
+        job.Status = "failed"
+        job.CompletedAt = datetime.utcnow()
+        _discard_spool(job)
+        print(f"📤 Upload {job.JobID} ({job.FileName}) failed after {job.Attempts} attempt(s): {error}")
+    else:
+        job.Status = "queued"
+        job.NextAttemptAt = datetime.utcnow() + timedelta(seconds=_backoff(job.Attempts))
+
+
+def process(job, raise_errors=False):
+    """Upload one claimed job and deliver its URL."""
+    def progress(offset, upload_id):
+        # committed per part: the admin UI's progress and a retry's resume point
+        job.UploadedBytes = offset
+        job.RemoteUploadID = upload_id
+        if job.Status == "uploading":
+            job.NextAttemptAt = datetime.utcnow() + timedelta(seconds=LEASE_SECONDS)
+        db.session.commit()
+
+    resume = (job.RemoteUploadID, job.UploadedBytes) \
+        if job.RemoteUploadID and job.UploadedBytes else None
+    try:
+        url = media_storage.upload(job.SpoolPath, job.Kind, progress=progress, resume=resume)
+        namespace = _deliver(job, url)
+        job.Status = "done"
+        job.ResultURL = url
+        job.UploadedBytes = job.SizeBytes
+        job.Error = None
+        job.Attempts = (job.Attempts or 0) + 1
+        job.CompletedAt = datetime.utcnow()
+        spool_path, job.SpoolPath = job.SpoolPath, None
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        # an inline upload is not retried: the caller reports the error
+        _record_failure(job, e, final=raise_errors)
+        db.session.commit()
+        if raise_errors:
+            raise
+        return False
+
+    shutil.rmtree(os.path.dirname(spool_path), ignore_errors=True)
+    if namespace:
+        invalidate(namespace)
+    return True
+
+
+def process_once():
+    """Claim and upload one job. Returns False if nothing was due."""
+    job = _claim()
+    if job is None:
+        _expire_receiving()
+        _fail_orphans()
+        return False
+    process(job)
+    return True
+
+
+def _run():
+    failing = False
+    # first poll one interval after startup (or on the first submit), once
+    # the app has finished booting
+    wait = POLL_SECONDS
+    while True:
+        if wait:
+            _wake.wait(wait)
+            _wake.clear()
+        processed = False
+        wait = POLL_SECONDS
+        try:
+            with _app.app_context():
+                processed = process_once()
+            failing = False
+        except Exception as e:
+            # log once per outage, then poll slowly until the DB is back
+            if not failing:
+                traceback.print_exc()
+            print(f"📤 Upload worker error: {e}")
+            failing = True
+            wait = max(POLL_SECONDS, 60)
+        if processed:
+            wait = 0
+
+
+def start_workers():
+    """Start the upload threads for this process (again after a fork)."""
+    global _workers, _workers_pid
+    if _app is None or not ENABLED:
+        return
+    with _start_lock:
+        # after a fork the parent's threads do not exist here; otherwise
+        # keep the live ones and only replace threads that died
+        alive = [t for t in _workers if t.is_alive()] if _workers_pid == os.getpid() else []
+        names = {t.name for t in alive}
+        new = [threading.Thread(target=_run, name=name, daemon=True)
+               for name in (f"upload-{i}" for i in range(WORKERS)) if name not in names]
+        _workers = alive + new
+        _workers_pid = os.getpid()
+        for thread in new:
+            thread.start()
+
+
+# ---- status ----
+
+def _percent(job):
+    if job.Status == "done":
+        return 100
+    done = job.ReceivedBytes if job.Status == "receiving" else job.UploadedBytes
+    return round(100 * (done or 0) / job.SizeBytes, 1) if job.SizeBytes else 0
+
+
+def progress(job):
+    return {
+        'JobID': job.JobID,
+        'Kind': job.Kind,
+        'Status': job.Status,
+        'FileName': job.FileName,
+        'SizeBytes': job.SizeBytes,
+        'ReceivedBytes': job.ReceivedBytes,
+        'UploadedBytes': job.UploadedBytes,
+        # of the current phase: receiving from the client, then sending on
+        'Percent': _percent(job),
+        'ResultURL': job.ResultURL,
+        'Error': job.Error,
+        'Attempts': job.Attempts,
+        'TargetModel': job.TargetModel,
+        'TargetID': job.TargetID,
+        'CreatedAt': job.CreatedAt.strftime('%Y-%m-%d %H:%M:%S') if job.CreatedAt else None,
+        'CompletedAt': job.CompletedAt.strftime('%Y-%m-%d %H:%M:%S') if job.CompletedAt else None,
+    }